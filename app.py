@@ -1,32 +1,36 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
+import pandas as pd
 
-from thermo import Chemical, Mixture
 import warnings
 from pathlib import Path
-from fluids.friction import friction_factor
-try:
-    from fluids.core import roughness_Farshad
-except ImportError:
-    # Fallback se a função não estiver disponível
-    def roughness_Farshad(material):
-        # Valores padrão da biblioteca fluids
-        materials_db = {
-            "Steel, commercial": 0.000045,
-            "Cast iron": 0.00026,
-            "Brass": 0.0000015,
-            "Copper": 0.0000015,
-            "PVC": 0.00000015
-        }
-        return materials_db.get(material, 0.000045)
 warnings.filterwarnings('ignore')
 from app_modules.simulator import VenturiSimulator
+from app_modules.atrito import MATERIAIS_RUGOSIDADE, obter_rugosidade_material
+from app_modules.cache_quente import inicializar_cache_quente
+from app_modules.campo import resolver_campo
+from app_modules.cavitacao import analisar_cavitacao, envelope_vazao_segura, vazao_segura
+from app_modules.cenarios import PARAMETROS, ComparadorCenarios, tabela_comparacao
+from app_modules.compressivel import estado_gas
+from app_modules.fluidos import (
+    COMPONENTES_MISTURA, FLUIDOS, MISTURAS, eh_gas, eh_mistura, identificador_mistura, pre_calcular_tabela,
+    pressao_vapor, propriedades_fluido,
+)
+from app_modules.historico import (
+    PARAMETROS_MEDIDOR, SERIES, HistoricoMedidor, ler_telemetria, telemetria_exemplo,
+)
 from app_modules.plots import (
-    plotar_diagrama_venturi,
-    plotar_perfil_pressao,
-    plotar_linhas_energia,
+    FiguraCampoEscoamento,
+    FiguraComparacaoEnergia,
+    FiguraComparacaoPressao,
+    FiguraEnvelopeCavitacao,
+    FiguraHistorico,
+    figura_png,
+    figura_para_png,
 )
+from app_modules.perfilador import executar
+from app_modules.recursos import metricas
+from app_modules.validacao import PROPRIEDADES_INDISPONIVEIS, VALIDO, mensagens, validar
 
 
 
@@ -37,6 +41,11 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# Carrega o snapshot de caches (uma vez por processo) e o salva ao encerrar
+inicializar_cache_quente()
+
+OPCAO_MISTURA_PERSONALIZADA = "Mistura personalizada..."
+
 
 
 def render_sistema_tubulacoes():
@@ -339,7 +348,8 @@ def render_sobre_projeto():
     st.latex(r"h_{garganta} = f \frac{L_{garganta}}{D_{garganta}} \frac{V_{garganta}^2}{2g}")
 
     st.markdown("**3. Perda no Difusor (Saída):**")
-    st.caption("Baseada na eficiência de recuperação de pressão ($C_p$) para difusores cônicos (Fox & McDonald).")
+    st.caption("Baseada na eficiência de recuperação de pressão ($C_p$) para difusores cônicos (Fox & McDonald), "
+               "com a dependência do ângulo do difusor obtida de Crane (TP-410) e interpolada em tabela.")
     st.latex(r"C_{p,ideal} = 1 - \frac{1}{AR^2} \quad \text{onde } AR = \left(\frac{D_{saida}}{D_{garganta}}\right)^2")
     st.latex(r"h_{difusor} = (C_{p,ideal} - C_{p,real}) \frac{V_{garganta}^2}{2g}")
     
@@ -360,57 +370,251 @@ def render_sobre_projeto():
     3. Varie os parâmetros de entrada para analisar diferentes cenários de escoamento.
     """)
 
+    with st.expander("🩺 Diagnóstico do servidor", expanded=False):
+        medidas = metricas()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Figuras vivas", medidas['figuras_vivas'])
+        col2.metric("Figuras em cache", medidas['figuras_em_cache'],
+                    f"{medidas['bytes_figuras_em_cache'] / 2**20:.1f} MB")
+        col3.metric("Memória residente", f"{medidas['rss_bytes'] / 2**20:.0f} MB")
+
+
+def render_comparacao_cenarios(parametros_atuais, figuras_sessao):
+    """Renderiza a comparação de cenários nomeados guardados na sessão."""
+    st.subheader("Comparação de Cenários")
+    st.caption("Salve a configuração atual como cenário e compare vários medidores ou condições lado a lado. "
+               "Edite os cenários na tabela; apenas os cenários alterados são recalculados.")
+
+    comparador = st.session_state.setdefault('comparador', ComparadorCenarios())
+    versao = st.session_state.setdefault('versao_cenarios', 0)
+
+    col_nome, col_botao = st.columns([3, 1])
+    with col_nome:
+        nome = st.text_input("Nome do cenário", value=f"Cenário {len(comparador) + 1}")
+    with col_botao:
+        st.write("")
+        st.write("")
+        if st.button("➕ Salvar configuração atual", use_container_width=True):
+            comparador.definir(nome.strip() or f"Cenário {len(comparador) + 1}", parametros_atuais)
+            st.session_state['versao_cenarios'] += 1
+            st.rerun()
+
+    if not len(comparador):
+        st.info("Nenhum cenário salvo ainda. Ajuste os parâmetros acima e clique em **Salvar configuração atual**.")
+        return
+
+    # Tabela editável: edições e exclusões são aplicadas ao comparador
+    tabela_entradas = pd.DataFrame.from_dict(comparador.cenarios, orient='index', columns=list(PARAMETROS))
+    # Misturas personalizadas dos cenários salvos também precisam ser opções válidas
+    opcoes_fluido = list(dict.fromkeys([*FLUIDOS.values(), *MISTURAS.values(),
+                                        *(c['fluido'] for c in comparador.cenarios.values())]))
+    editada = st.data_editor(
+        tabela_entradas,
+        key=f"editor_cenarios_{versao}",
+        num_rows="dynamic",
+        use_container_width=True,
+        column_config={
+            'mode': st.column_config.SelectboxColumn("Modo", options=['Ideal', 'Realista'], required=True),
+            'fluido': st.column_config.SelectboxColumn("Fluido", options=opcoes_fluido, required=True),
+            'material': st.column_config.SelectboxColumn("Material", options=list(MATERIAIS_RUGOSIDADE),
+                                                         required=True),
+        },
+    )
+    alterado = False
+    for nome_cenario in list(comparador.cenarios):
+        if nome_cenario not in editada.index:
+            comparador.remover(nome_cenario)
+            alterado = True
+    for nome_cenario, linha in editada.dropna().iterrows():
+        parametros = {chave: (linha[chave] if chave in ('mode', 'fluido', 'material') else float(linha[chave]))
+                      for chave in PARAMETROS}
+        if comparador.cenarios.get(nome_cenario) != parametros:
+            comparador.definir(str(nome_cenario), parametros)
+            alterado = True
+    if alterado:
+        st.session_state['versao_cenarios'] += 1
+        st.rerun()
+
+    avaliacoes_antes = comparador.avaliacoes
+    resultados = comparador.avaliar()
+    st.caption(f"Cenários recalculados nesta execução: {comparador.avaliacoes - avaliacoes_antes} de {len(comparador)}")
+
+    for resultado in resultados:
+        if resultado.erro:
+            st.warning(f"⚠️ {resultado.nome}: {resultado.erro}")
+
+    validos = [(r.nome, r.sim) for r in resultados if r.sim is not None]
+    if not validos:
+        return
+
+    # Figuras sobrepostas, redesenhadas só quando algum cenário muda
+    chave = tuple((r.nome, tuple(r.parametros.items())) for r in resultados if r.sim is not None)
+    if st.session_state.get('png_cenarios', (None,))[0] != chave:
+        for nome_figura, classe in (('comparacao_pressao', FiguraComparacaoPressao),
+                                    ('comparacao_energia', FiguraComparacaoEnergia)):
+            if nome_figura not in figuras_sessao:
+                figuras_sessao[nome_figura] = classe()
+        st.session_state['png_cenarios'] = (
+            chave,
+            figura_para_png(figuras_sessao['comparacao_pressao'].atualizar(validos)),
+            figura_para_png(figuras_sessao['comparacao_energia'].atualizar(validos)),
+        )
+    _, png_pressao, png_energia = st.session_state['png_cenarios']
+
+    st.markdown("**Perfis de Pressão Sobrepostos**")
+    st.image(png_pressao, use_container_width=True)
+    st.markdown("**Linhas de Energia Sobrepostas**")
+    st.image(png_energia, use_container_width=True)
+
+    st.markdown("**Tabela de Diferenças**")
+    referencia = st.selectbox("Cenário de referência", options=[nome for nome, _ in validos])
+    st.dataframe(tabela_comparacao(resultados, referencia), use_container_width=True)
+
 
-def obter_rugosidade_material(material):
-    """
-    Retorna a rugosidade absoluta (em metros) do material.
+def render_cavitacao(sim, P_vapor, epsilon, figuras_sessao):
+    """Margem para a pressão de vapor no fim da garganta e envelope de vazão segura."""
+    cavitacao = analisar_cavitacao(sim, P_vapor)
+    Q_max = vazao_segura(sim.D1, sim.D2, sim.L_garganta, sim.rho, sim.mu, epsilon, sim.P1, P_vapor,
+                         sim.mode, sim.coeficientes)
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("P₂ (fim) absoluta", f"{cavitacao['P2_abs']/1000:.2f} kPa",
+                help="Menor pressão estática do medidor, em pressão absoluta")
+    col2.metric("Pressão de vapor", f"{P_vapor/1000:.2f} kPa",
+                help="Pressão de vapor do fluido na temperatura selecionada (bolha, para misturas)")
+    col3.metric("Número de cavitação σ", f"{cavitacao['sigma']:.2f}",
+                help="(P₂,abs − Pᵥ) / (½ρv₂²); o escoamento cavita para σ ≤ 0")
+    col4.metric("Vazão máxima sem cavitação", f"{Q_max:.4f} m³/s", f"{(Q_max - sim.Q)*3600:+.1f} m³/h",
+                help="Maior vazão desta geometria com P₂ (fim) acima da pressão de vapor")
+
+    # Envelope redesenhado só quando algo que o define muda
+    chave = (sim.mode, sim.coeficientes, sim.D1, sim.D2, sim.L_garganta, sim.rho, sim.mu, sim.P1, sim.Q,
+             P_vapor, epsilon)
+    if st.session_state.get('png_cavitacao', (None,))[0] != chave:
+        D2, Q_envelope = envelope_vazao_segura(sim.D1, sim.L_garganta, sim.rho, sim.mu, epsilon, sim.P1, P_vapor,
+                                               sim.mode, sim.coeficientes)
+        if 'envelope_cavitacao' not in figuras_sessao:
+            figuras_sessao['envelope_cavitacao'] = FiguraEnvelopeCavitacao()
+        figura = figuras_sessao['envelope_cavitacao'].atualizar(D2, Q_envelope, sim.D2, sim.Q)
+        st.session_state['png_cavitacao'] = (chave, figura_para_png(figura))
+    st.image(st.session_state['png_cavitacao'][1], use_container_width=True)
+    render_graph_explanation("""
+    **O que este gráfico mostra:**
     
-    Args:
-        material: Nome do material
+    Para o D₁, o comprimento da garganta, o fluido e a pressão de entrada atuais, a maior vazão que mantém a pressão no fim da garganta acima da pressão de vapor, em função de D₂.
     
-    Returns:
-        epsilon: Rugosidade absoluta (m)
-    """
-    try:
-        epsilon = roughness_Farshad(material)
-        return epsilon
-    except:
-        materials_db = {
-            "Steel, commercial": 0.000045,
-            "Cast iron": 0.00026,
-            "Brass": 0.0000015,
-            "Copper": 0.0000015,
-            "PVC": 0.00000015
-        }
-        return materials_db.get(material, 0.000045)
-
-
-def calcular_fator_atrito(Re, epsilon, D):
-    """
-    Calcula o fator de atrito de Darcy.
-    
-    Args:
-        Re: Número de Reynolds
-        epsilon: Rugosidade absoluta (m)
-        D: Diâmetro (m)
-    
-    Returns:
-        f: Fator de atrito de Darcy
-    """
-    if Re < 2300:
-        return 64.0 / Re if Re > 0 else 0.064
+    **Como interpretar:**
+    
+    - Pontos de operação acima da curva vermelha cavitam: bolhas de vapor se formam na garganta e colapsam no difusor, danificando o tubo e invalidando a medição.
+    - Gargantas menores aceleram mais o escoamento e cavitam com vazões menores.
+    - Fluidos quentes têm pressão de vapor maior e reduzem a região segura.
+    """)
+
+
+def render_campo_escoamento(sim, figuras_sessao):
+    """Contornos do campo potencial axissimétrico sobre a geometria atual."""
+    st.subheader("Campo de Escoamento Axissimétrico")
+    st.caption("Escoamento potencial (invíscido) resolvido na malha ajustada à parede. "
+               "A solução é calculada uma vez por geometria; mudar a vazão ou o fluido apenas a reescala.")
+
+    campo = resolver_campo(sim)
+    velocidade = campo.velocidade(sim.Q)
+    pressao = campo.pressao(sim.Q, sim.rho, sim.P1)
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Velocidade máxima no campo", f"{velocidade.max():.3f} m/s", f"{velocidade.max() - sim.v2:+.3f} m/s",
+                delta_color="off", help="Diferença em relação a v₂ do modelo unidimensional")
+    col2.metric("Pressão mínima no campo", f"{pressao.min()/1000:.2f} kPa",
+                f"{(pressao.min() - sim.P2)/1000:+.2f} kPa", delta_color="off",
+                help="Diferença em relação a P₂ (início da garganta) do modelo unidimensional")
+    col3.metric("Malha", f"{campo.psi.shape[0]} × {campo.psi.shape[1]}", help="Nós axiais × radiais")
+
+    chave = (sim.D1, sim.D2, sim.L_garganta, sim.angulo_convergente, sim.angulo_divergente,
+             sim.Q, sim.rho, sim.P1)
+    if st.session_state.get('png_campo', (None,))[0] != chave:
+        if 'campo_escoamento' not in figuras_sessao:
+            figuras_sessao['campo_escoamento'] = FiguraCampoEscoamento()
+        figura = figuras_sessao['campo_escoamento'].atualizar(campo, sim.Q, sim.rho, sim.P1)
+        st.session_state['png_campo'] = (chave, figura_para_png(figura))
+    st.image(st.session_state['png_campo'][1], use_container_width=True)
+    render_graph_explanation("""
+    **O que este gráfico mostra:**
     
-    rugosidade_relativa = epsilon / D
+    Velocidade (com linhas de corrente) e pressão estática em toda a seção do medidor, não apenas nas quatro tomadas do diagrama.
     
-    try:
-        f = friction_factor(Re=Re, eD=rugosidade_relativa)
-        return max(0.008, min(0.1, f))
-    except:
+    **Como interpretar:**
+    
+    - As linhas de corrente se aproximam no convergente: mesma vazão em área menor, maior velocidade.
+    - Próximo à parede, no início da garganta, a curvatura acelera o escoamento e a pressão fica abaixo da média da seção.
+    - O campo é invíscido: não inclui o atrito nem a separação no difusor, que o modo Realista contabiliza como perda de carga.
+    """)
+
+
+def render_historico(parametros_atuais, figuras_sessao):
+    """Reprodução da telemetria do medidor atual: séries no tempo e agregados da janela."""
+    st.subheader("Histórico do Medidor")
+    st.caption("Carregue exportações do historiador (CSV com tempo, delta_h em m e T_C em °C). "
+               "Só as leituras posteriores à última já processada são calculadas; os gráficos mostram "
+               "a janela selecionada reduzida à resolução da tela.")
+
+    # Um histórico por medidor: mudar a geometria, o fluido ou o modo recomeça
+    parametros = {chave: parametros_atuais[chave] for chave in PARAMETROS_MEDIDOR}
+    historico = st.session_state.get('historico')
+    if historico is None or historico.parametros != parametros:
+        historico = st.session_state['historico'] = HistoricoMedidor(parametros)
+
+    col_arquivo, col_exemplo = st.columns([3, 1])
+    with col_arquivo:
+        arquivo = st.file_uploader("Exportação do historiador", type=['csv'])
+    with col_exemplo:
+        st.write("")
+        st.write("")
+        avancar = st.button("▶️ Reproduzir 1 dia de exemplo", use_container_width=True)
+
+    novos = None
+    if arquivo is not None and st.session_state.get('historico_arquivo') != (arquivo.file_id, id(historico)):
         try:
-            f0 = 0.25 / (np.log10(rugosidade_relativa/3.7 + 5.74/(Re**0.9)))**2
-            return max(0.008, min(0.1, f0))
-        except:
-            return 0.02
+            novos = historico.acrescentar(*ler_telemetria(arquivo, parametros_atuais['T_C']))
+        except (ValueError, KeyError) as erro:
+            st.error(f"Arquivo inválido: {erro}")
+        st.session_state['historico_arquivo'] = (arquivo.file_id, id(historico))
+    if avancar:
+        inicio = historico.ultimo_tempo + np.timedelta64(1, 's') if len(historico) else np.datetime64('2024-01-01')
+        novos = historico.acrescentar(*telemetria_exemplo(inicio, semente=len(historico)))
+    if novos is not None:
+        st.caption(f"Leituras novas processadas: {novos:,}".replace(',', '.'))
+
+    if len(historico) < 2:
+        st.info("Nenhuma telemetria carregada ainda.")
+        return
+
+    tempo = historico.tempo
+    inicio_total, fim_total = (pd.Timestamp(t).to_pydatetime() for t in (tempo[0], tempo[-1]))
+    inicio, fim = st.slider("Janela visível", min_value=inicio_total, max_value=fim_total,
+                            value=(inicio_total, fim_total), format="DD/MM/YY HH:mm")
+
+    tabela, resumo = historico.agregados(inicio, fim)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Leituras na janela", f"{resumo['n']:,}".replace(',', '.'),
+                f"{resumo['n'] - resumo['validos']} inválidas", delta_color="off")
+    col2.metric("Volume escoado", f"{resumo['volume']:.1f} m³", help="Integral de Q no tempo na janela")
+    col3.metric("Vazão média", f"{tabela.loc['Q', 'media']:.4f} m³/s")
+
+    # Redesenho só quando chegam leituras ou a janela muda
+    chave = (id(historico), len(historico), inicio, fim)
+    if st.session_state.get('png_historico', (None,))[0] != chave:
+        if 'historico' not in figuras_sessao:
+            figuras_sessao['historico'] = FiguraHistorico()
+        series = {nome: historico.serie(nome, inicio, fim) for nome in SERIES}
+        figura = figuras_sessao['historico'].atualizar(series, tabela['media'].to_dict())
+        st.session_state['png_historico'] = (chave, figura_para_png(figura))
+    st.image(st.session_state['png_historico'][1], use_container_width=True)
+
+    st.markdown("**Agregados da Janela**")
+    st.dataframe(tabela.rename(index={'Q': 'Q (m³/s)', 'P2_fim': 'P₂ fim (Pa)', 'h_L': 'hₗ (m)'},
+                               columns={'media': 'Média', 'desvio': 'Desvio', 'minimo': 'Mínimo',
+                                        'maximo': 'Máximo'}),
+                 use_container_width=True)
 
 
 def render_graph_explanation(description: str):
@@ -420,6 +624,34 @@ def render_graph_explanation(description: str):
         st.markdown(description)
 
 
+def entrada_mistura_personalizada():
+    """Widgets de composição da mistura; retorna o identificador canônico."""
+    componentes = st.multiselect(
+        "Componentes",
+        options=list(COMPONENTES_MISTURA),
+        default=["Água", "Etilenoglicol"],
+        help="Componentes da mistura (propriedades pelas regras de mistura do thermo)"
+    )
+    if not componentes:
+        st.error("⚠️ Erro: Selecione ao menos um componente.")
+        st.stop()
+
+    base = st.radio("Base das frações", options=['massa', 'molar'], horizontal=True)
+    colunas = st.columns(len(componentes))
+    fracoes = [
+        coluna.number_input(f"{nome} (%)", min_value=0.0, max_value=100.0,
+                            value=round(100 / len(componentes), 1), step=5.0, key=f"fracao_{nome}")
+        for coluna, nome in zip(colunas, componentes)
+    ]
+    if sum(fracoes) <= 0:
+        st.error("⚠️ Erro: As frações devem somar mais que zero.")
+        st.stop()
+    if abs(sum(fracoes) - 100) > 1e-6:
+        st.caption(f"Frações somam {sum(fracoes):g}%; serão normalizadas para 100%.")
+
+    return identificador_mistura([COMPONENTES_MISTURA[nome] for nome in componentes], fracoes, base)
+
+
 # ========== INTERFACE STREAMLIT ==========
 
 def main():
@@ -483,24 +715,41 @@ def main():
                 step=0.1,
                 help="Comprimento da garganta do Venturi"
             )
+            
+            col_ang1, col_ang2 = st.columns(2)
+            with col_ang1:
+                angulo_convergente = st.slider(
+                    "Ângulo do convergente (°)",
+                    min_value=5,
+                    max_value=45,
+                    value=15,
+                    step=1,
+                    help="Ângulo total do cone de entrada (define o comprimento do convergente)"
+                )
+            with col_ang2:
+                angulo_divergente = st.slider(
+                    "Ângulo do difusor (°)",
+                    min_value=5,
+                    max_value=45,
+                    value=15,
+                    step=1,
+                    help="Ângulo total do cone de saída; ângulos maiores recuperam menos pressão"
+                )
         
         # Propriedades dos fluidos
         with st.expander("💧 Fluido", expanded=True):
-            lista_fluidos = {
-                "Água": "water",
-                "Ar": "air",
-                "Etanol": "ethanol",
-                "Glicerina": "glycerol",
-                "Óleo de Motor (n-Octano)": "n-octane"
-            }
+            lista_fluidos = {**FLUIDOS, **MISTURAS}
             
             fluid_name = st.selectbox(
                 "Selecione o Fluido:",
-                options=list(lista_fluidos.keys()),
+                options=[*lista_fluidos.keys(), OPCAO_MISTURA_PERSONALIZADA],
                 help="Escolha o fluido para a simulação"
             )
             
-            fluido_quimico = lista_fluidos[fluid_name]
+            if fluid_name == OPCAO_MISTURA_PERSONALIZADA:
+                fluido_quimico = entrada_mistura_personalizada()
+            else:
+                fluido_quimico = lista_fluidos[fluid_name]
             
             p1_input = st.number_input(
                 "Pressão de Entrada P₁ (Pa manométricos)",
@@ -514,21 +763,31 @@ def main():
             temp_c = st.slider("Temperatura (°C)", 0, 100, 20)
             temp_k = temp_c + 273.15
             
-            if fluido_quimico == 'air':
-                fluido = Mixture('air', T=temp_k, P=pressao_absoluta_para_thermo)
-            else:
-                fluido = Chemical(fluido_quimico, T=temp_k, P=pressao_absoluta_para_thermo)
+            if eh_mistura(fluido_quimico):
+                # Tabela densa da composição (uma vez por composição e pressão);
+                # depois disso mover o slider de temperatura é só consulta ao cache
+                with st.spinner("Calculando propriedades da mistura..."):
+                    pre_calcular_tabela(fluido_quimico, range(0, 101), pressao_absoluta_para_thermo)
             
-            rho = fluido.rho
-            mu = fluido.mu
+            rho, mu = propriedades_fluido(fluido_quimico, temp_k, pressao_absoluta_para_thermo)
             
             if rho is None or mu is None:
-                st.error("⚠️ Erro: Não foi possível calcular as propriedades para esta temperatura. Tente aumentar a temperatura.")
+                st.error(mensagens(PROPRIEDADES_INDISPONIVEIS, detalhada=True)[0])
                 st.stop()
             
             st.metric("Densidade ρ", f"{rho:.1f} kg/m³")
             st.metric("Viscosidade dinâmica μ", f"{mu:.2e} Pa·s")
             
+            # Gases: expansão isentrópica na garganta (Q nas condições de entrada)
+            gas = None
+            if eh_gas(fluido_quimico) and st.checkbox(
+                "Correção de compressibilidade (isentrópica)",
+                value=False,
+                help="Aplica o fator de expansibilidade ε da ISO 5167: ΔP, densidade, temperatura e "
+                     "viscosidade na garganta seguem a expansão do gás. Relevante acima de Mach ≈ 0,3."
+            ):
+                gas = estado_gas(fluido_quimico, temp_k, p1_input)
+            
             # Fluido manométrico (slider)
             st.markdown("**Fluido Manométrico**")
             rho_m = st.slider(
@@ -622,33 +881,28 @@ def main():
                 epsilon = obter_rugosidade_material(material_tubo)
                 st.info("ℹ️ No modo Ideal, as perdas são zero. O material do tubo não afeta os resultados.")
             
-    # Validação com feedback visual
-    razao_diametros = D1 / D2
-    if D2 >= D1:
-        st.error("⚠️ Ajuste necessário: D₂ precisa ser menor que D₁ para garantir aceleração do escoamento.")
-        st.stop()
-    elif razao_diametros < 1:
-        st.error(f"⚠️ Ajuste necessário: Razão entre diâmetros está muito baixa, D₁/D₂ = {razao_diametros:.3f} (mínimo recomendado: 1.0). D₂ está maior que D₁.")
-        st.stop()
-    elif razao_diametros > 2:
-        st.error(f"⚠️ Ajuste necessário: Razão entre os diâmetros está muito alta, D₁/D₂ = {razao_diametros:.3f} (máximo recomendado: 2.0). D₂ está muito pequeno em relação a D₁.")
-        st.stop()
-    elif rho_m < rho + rho*0.05: 
-        st.error(f"⚠️ Ajuste necessário: Densidade do fluido manométrico ρₘ " f"{rho_m:.1f} kg/m³ menor ou muito próxima da densidade do fluido ρ " f"{rho:.1f} kg/m³.")
-        st.stop()
-    
     # Calcular número de Reynolds e fator de atrito baseado no material
     area_garganta_calc = np.pi * (D2 / 2) ** 2
     v2_calc = Q / area_garganta_calc if Q > 0 else 1.0
     Re_calc = (rho * v2_calc * D2) / mu if mu > 0 else 10000
 
-    if mode == 'Realista' and Re_calc < 75000:
-        st.error(f"⚠️ Ajuste necessário: Para melhor análise das perdas de carga, mantenha o regime como turbulento, Re > 75000.")
+    # Validação com feedback visual (mesmos códigos usados nos lotes)
+    codigo_validacao = validar(D1, D2, rho, rho_m, Re_calc, mode)
+    if codigo_validacao != VALIDO:
+        for mensagem in mensagens(codigo_validacao, detalhada=True, razao=D1 / D2, rho=rho, rho_m=rho_m):
+            st.error(mensagem)
         st.stop()
     
-    # Calcular fator de atrito usando a rugosidade do material selecionado
+    # Criar simulador e calcular; o atrito é resolvido junto com o Reynolds
+    # da garganta, pela rugosidade do material selecionado (como nos lotes)
     epsilon = obter_rugosidade_material(material_tubo)
-    f = calcular_fator_atrito(Re_calc, epsilon, D2)
+    sim = VenturiSimulator()
+    sim.calcular(D1, D2, L, rho, rho_m, Q, 0, None, mode, mu, p1_input,
+                 angulo_convergente, angulo_divergente, epsilon=epsilon, gas=gas)
+    if gas is not None and np.isnan(sim.delta_h):
+        st.error("⚠️ Escoamento bloqueado: esta vazão exigiria Mach acima de 1 na garganta. "
+                 "Reduza a vazão, aumente D₂ ou a pressão de entrada.")
+        st.stop()
     
     # Exibir informações sobre o cálculo do atrito
     with st.expander("ℹ️ Informações do Cálculo de Atrito", expanded=True):
@@ -663,21 +917,18 @@ def main():
             }
             st.write(f"**Material selecionado:** {nomes_materiais.get(material_tubo, material_tubo)}")
             st.write(f"**Rugosidade absoluta:** ε = {epsilon*1000:.3f} mm")
-            st.write(f"**Rugosidade relativa:** ε/D = {epsilon/D1:.6f}")
-            st.write(f"**Número de Reynolds:** Re = {Re_calc:.0f}")
-            st.write(f"**Coeficiente de atrito calculado:** f = {f:.4f}")
-            if Re_calc < 2300:
+            st.write(f"**Rugosidade relativa (garganta):** ε/D₂ = {epsilon/D2:.6f}")
+            st.write(f"**Número de Reynolds (garganta):** Re = {sim.Re:.0f}")
+            st.write(f"**Coeficiente de atrito calculado:** f = {sim.f:.4f}")
+            if sim.Re < 2300:
                 st.caption("Regime laminar: f = 64/Re")
-            elif Re_calc < 4000:
+            elif sim.Re < 4000:
                 st.caption("Regime de transição: Equação de Colebrook-White")
             else:
                 st.caption("Regime turbulento: Equação de Colebrook-White")
         else:
             st.info("No modo Ideal, as perdas por atrito são zero. O fator de atrito não é utilizado nos cálculos.")
     
-    # Criar simulador e calcular
-    sim = VenturiSimulator()
-    sim.calcular(D1, D2, L, rho, rho_m, Q, 0, f, mode, mu, p1_input)
     
     # ========== LAYOUT PRINCIPAL ==========
     
@@ -725,22 +976,40 @@ def main():
     else:
         st.success(f"🔴 Regime TURBULENTO (Re = {Re:.0f} > 4000): Movimento caótico com redemoinhos", icon="🔴")
     
+    if gas is not None:
+        col1, col2, col3, col4, col5 = st.columns(5)
+        col1.metric("Expansibilidade ε", f"{sim.expansibilidade:.4f}",
+                    help="Razão entre a vazão real e a prevista por Bernoulli incompressível para o mesmo ΔP")
+        col2.metric("P₂/P₁ (absolutas)", f"{sim.razao_pressoes:.4f}")
+        col3.metric("Densidade ρ₂", f"{sim.rho2:.3f} kg/m³", f"{sim.rho2 - sim.rho:+.3f} kg/m³")
+        col4.metric("Temperatura T₂", f"{sim.T2 - 273.15:.1f} °C", f"{sim.T2 - temp_k:+.1f} K")
+        col5.metric("Mach na garganta", f"{sim.Mach2:.3f}")
+    
+    # Cavitação: pressão absoluta no fim da garganta × pressão de vapor
+    P_vapor = pressao_vapor(fluido_quimico, temp_k)
+    if P_vapor is not None and analisar_cavitacao(sim, P_vapor)['cavita']:
+        st.error("⚠️ Cavitação: a pressão no fim da garganta fica abaixo da pressão de vapor do fluido. "
+                 "Reduza a vazão, aumente D₂ ou a pressão de entrada (veja o envelope na Visão Geral).")
+    
     st.write("")
     st.markdown("---")
     st.write("")
     
     # Abas para organizar visualizações
-    tab1, tab2, tab3 = st.tabs([
+    tab1, tab_campo, tab2, tab_cenarios, tab_historico, tab3 = st.tabs([
         "📐 Visão Geral",
+        "🌊 Campo de Escoamento",
         "📊 Dados Completos",
+        "⚖️ Comparar Cenários",
+        "📈 Histórico",
         "ℹ️ Sobre o Projeto"
     ])
     
     with tab1:
+        # Figuras da sessão: persistem entre reexecuções e só têm os dados atualizados
+        figuras_sessao = st.session_state.setdefault('figuras', {})
         st.markdown("**Diagrama Esquemático do Venturi**")
-        fig = plotar_diagrama_venturi(sim)
-        st.pyplot(fig)
-        plt.close(fig)
+        st.image(figura_png('diagrama', sim, figuras_sessao), use_container_width=True)
         render_graph_explanation("""
         **O que este gráfico mostra:**
         
@@ -758,9 +1027,7 @@ def main():
         st.markdown("---")
         
         st.markdown("**Perfil de Pressão ao Longo do Tubo**")
-        fig = plotar_perfil_pressao(sim)
-        st.pyplot(fig)
-        plt.close(fig)
+        st.image(figura_png('perfil_pressao', sim, figuras_sessao), use_container_width=True)
         render_graph_explanation("""
         **O que este gráfico mostra:**
         
@@ -772,12 +1039,15 @@ def main():
         - No difusor, a pressão se recupera parcialmente; a diferença final corresponde à perda de carga total hₗ.
         """)
         
+        if P_vapor is not None:
+            st.markdown("---")
+            st.markdown("**Cavitação na Garganta**")
+            render_cavitacao(sim, P_vapor, epsilon, figuras_sessao)
+        
         st.markdown("---")
         
         st.markdown("**Linhas de Energia e Piezométrica**")
-        fig = plotar_linhas_energia(sim)
-        st.pyplot(fig)
-        plt.close(fig)
+        st.image(figura_png('linhas_energia', sim, figuras_sessao), use_container_width=True)
         render_graph_explanation("""
         **O que este gráfico mostra:**
         
@@ -791,6 +1061,9 @@ def main():
         - **Perda Total**: Valor indicado no final do gráfico mostra a diferença entre a energia inicial e final.
         """)
     
+    with tab_campo:
+        render_campo_escoamento(sim, figuras_sessao)
+    
     with tab2:
         st.subheader("Resultados Numéricos Completos")
         st.caption(f"Detalhe completo das propriedades calculadas - Modo: {mode}. Use para relatórios ou calibrações.")
@@ -812,7 +1085,9 @@ def main():
             if hasattr(sim, 'L_entrada') and hasattr(sim, 'L_saida'):
                 st.write(f"• L (entrada) = {sim.L_entrada:.3f} m")
                 st.write(f"• L (saída) = {sim.L_saida:.3f} m")
-                st.write(f"• L (total) = {sim.L:.3f} m")                                                                
+                st.write(f"• L (total) = {sim.L:.3f} m")
+            st.write(f"• Ângulo do convergente = {sim.angulo_convergente:.0f}°")
+            st.write(f"• Ângulo do difusor = {sim.angulo_divergente:.0f}°")
             
             st.markdown("")
             st.markdown("**PROPRIEDADES DO FLUIDO:**")
@@ -874,6 +1149,19 @@ def main():
             - Mais próximo das condições reais de operação
             """)
     
+    parametros_atuais = {
+        'mode': mode, 'fluido': fluido_quimico, 'T_C': float(temp_c), 'P1': float(p1_input),
+        'D1': float(D1), 'D2': float(D2), 'L': float(L), 'Q': float(Q), 'rho_m': float(rho_m),
+        'material': material_tubo, 'angulo_convergente': float(angulo_convergente),
+        'angulo_divergente': float(angulo_divergente),
+    }
+
+    with tab_cenarios:
+        render_comparacao_cenarios(parametros_atuais, st.session_state.setdefault('figuras', {}))
+
+    with tab_historico:
+        render_historico(parametros_atuais, st.session_state.setdefault('figuras', {}))
+
     with tab3:
         render_sobre_projeto()
     
@@ -884,4 +1172,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    executar(main)
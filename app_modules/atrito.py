@@ -0,0 +1,159 @@
+import numpy as np
+try:
+    from fluids.core import roughness_Farshad
+except ImportError:
+    # Fallback se a função não estiver disponível
+    def roughness_Farshad(material):
+        # Valores padrão da biblioteca fluids
+        return MATERIAIS_RUGOSIDADE.get(material, 0.000045)
+
+
+RE_LAMINAR = 2300.0
+RE_TRANSICAO = (2000.0, 4000.0)
+F_MIN = 0.008
+F_MAX = 0.1
+LN10 = 2.302585092994046
+
+MATERIAIS_RUGOSIDADE = {
+    "Steel, commercial": 0.000045,
+    "Cast iron": 0.00026,
+    "Brass": 0.0000015,
+    "Copper": 0.0000015,
+    "PVC": 0.00000015
+}
+
+
+def obter_rugosidade_material(material):
+    """
+    Retorna a rugosidade absoluta (em metros) do material.
+    
+    Args:
+        material: Nome do material
+    
+    Returns:
+        epsilon: Rugosidade absoluta (m)
+    """
+    try:
+        epsilon = roughness_Farshad(material)
+        return epsilon
+    except:
+        return MATERIAIS_RUGOSIDADE.get(material, 0.000045)
+
+
+def _colebrook(Re, eD, tol, max_iter):
+    """Resolve Colebrook-White por Newton em x = 1/√f, elemento a elemento."""
+    a = eD / 3.7
+    b = 2.51 / Re
+
+    # Chute inicial explícito de Swamee-Jain
+    x = -2.0 * np.log10(a + 5.74 / Re**0.9)
+
+    ativo = np.ones(x.shape, dtype=bool)
+    for _ in range(max_iter):
+        xa, aa, ba = x[ativo], a[ativo], b[ativo]
+        arg = aa + ba * xa
+        g = xa + 2.0 * np.log10(arg)
+        dg = 1.0 + 2.0 * ba / (LN10 * arg)
+        passo = g / dg
+        x[ativo] = xa - passo
+
+        convergido = np.abs(passo) <= tol * np.abs(xa)
+        idx = np.flatnonzero(ativo)
+        ativo[idx[convergido]] = False
+        if not ativo.any():
+            break
+
+    return 1.0 / x**2
+
+
+def fator_atrito(Re, eD, tol=1e-12, max_iter=50, interpolar_transicao=False):
+    """
+    Fator de atrito de Darcy vetorizado.
+
+    Regras do simulador: f = 64/Re no regime laminar e Colebrook-White
+    limitado a [0.008, 0.1] nos demais.
+
+    Args:
+        Re: Número de Reynolds (escalar ou array)
+        eD: Rugosidade relativa ε/D (escalar ou array)
+        interpolar_transicao: Se True, interpola f linearmente em Re entre
+            2000 e 4000, eliminando o salto laminar/turbulento (útil para
+            solvers de Newton, como o de redes)
+
+    Returns:
+        f: Fator de atrito de Darcy, com o formato de broadcast de Re e eD.
+            Entradas float32 são resolvidas em float32 (tolerância limitada
+            à precisão do tipo); as demais, em float64.
+    """
+    dtype = np.result_type(np.asarray(Re).dtype, np.asarray(eD).dtype, np.float32)
+    Re, eD = np.broadcast_arrays(np.asarray(Re, dtype=dtype), np.asarray(eD, dtype=dtype))
+    f = np.empty(Re.shape, dtype=dtype)
+    tol = max(tol, 4 * float(np.finfo(dtype).eps))
+
+    laminar = Re < RE_LAMINAR
+    f[laminar] = 0.064
+    np.divide(64.0, Re, out=f, where=laminar & (Re > 0))
+
+    turbulento = ~laminar
+    if turbulento.any():
+        f_turb = _colebrook(Re[turbulento], eD[turbulento], tol, max_iter)
+        f[turbulento] = np.clip(f_turb, F_MIN, F_MAX)
+
+    if interpolar_transicao:
+        re_ini, re_fim = RE_TRANSICAO
+        transicao = (Re >= re_ini) & (Re < re_fim)
+        if transicao.any():
+            t = (Re[transicao] - re_ini) / (re_fim - re_ini)
+            f_ini = 64.0 / re_ini
+            f_fim = fator_atrito(re_fim, eD[transicao], tol, max_iter)
+            f[transicao] = (1.0 - t) * f_ini + t * f_fim
+
+    return f[()]
+
+
+def resolver_atrito(velocidade, D, rho, mu, epsilon, tol=1e-10, max_iter=50):
+    """
+    Reynolds e fator de atrito autoconsistentes em uma seção, vetorizado.
+
+    Com a velocidade conhecida (array), Re e f saem de uma única avaliação.
+    Quando a velocidade depende do atrito (por exemplo, a vazão limitada por
+    uma perda de carga), `velocidade` é uma função f → v e o par é resolvido
+    por ponto fixo f → v(f) → Re → f; cada elemento para ao convergir e
+    mantém o próprio número de iterações.
+
+    Args:
+        velocidade: Velocidade (m/s, escalar ou array) ou função de f que a
+            devolve (vetorizada, com o formato do lote)
+        D: Diâmetro da seção (m); ε/D usa o mesmo diâmetro do Reynolds
+        rho, mu: Massa específica (kg/m³) e viscosidade (Pa·s)
+        epsilon: Rugosidade absoluta (m)
+        tol: Tolerância relativa em f
+        max_iter: Limite de iterações por elemento
+
+    Returns:
+        (Re, f, iteracoes): `iteracoes` é um array inteiro (max_iter + 1
+        nos elementos que não convergiram)
+    """
+    eD = epsilon / D
+    if not callable(velocidade):
+        Re = rho * velocidade * D / mu
+        f = fator_atrito(Re, eD)
+        return Re, f, np.ones(np.shape(f), dtype=np.int16)[()]
+
+    f = np.asarray(fator_atrito(rho * velocidade(0.02) * D / mu, eD))
+    forma = f.shape
+    f = f.copy()
+    Re = np.empty(forma, dtype=f.dtype)
+    iteracoes = np.full(forma, max_iter + 1, dtype=np.int16)
+    ativo = np.ones(forma, dtype=bool)
+    for i in range(1, max_iter + 1):
+        Re_novo = np.broadcast_to(rho * velocidade(f) * D / mu, forma)
+        f_novo = np.broadcast_to(fator_atrito(Re_novo, eD), forma)
+
+        convergido = ativo & (np.abs(f_novo - f) <= tol * f)
+        Re[ativo], f[ativo] = Re_novo[ativo], f_novo[ativo]
+        iteracoes[convergido] = i
+        ativo &= ~convergido
+        if not ativo.any():
+            break
+    return Re[()], f[()], iteracoes[()]
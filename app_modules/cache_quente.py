@@ -0,0 +1,202 @@
+"""
+Cache quente: snapshot dos caches de propriedades e figuras.
+
+Após um novo deploy, os primeiros acessos pagariam o thermo e a
+renderização das figuras do estado padrão. O snapshot é gravado ao encerrar
+o processo (ou gerado na construção da imagem) e carregado na inicialização;
+é descartado se as versões de thermo, fluids ou matplotlib mudaram. Uso na
+construção da imagem:
+
+    python -m app_modules.cache_quente --arquivo .cache/cache_quente.pkl
+"""
+import argparse
+import atexit
+import os
+import pickle
+import tempfile
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+
+import numpy as np
+
+from app_modules import atrito, fluidos, plots
+from app_modules.simulator import VenturiSimulator
+from app_modules.validacao import VALIDO, validar
+
+
+FORMATO = 3
+BIBLIOTECAS = ('thermo', 'fluids', 'matplotlib')
+
+ARQUIVO_PADRAO = Path(__file__).resolve().parent.parent / '.cache' / 'cache_quente.pkl'
+
+# Estado inicial dos widgets de main()
+ESTADO_PADRAO = {
+    'D1': 0.10,
+    'D2': 0.05,
+    'L': 1.0,
+    'Q': 0.01,
+    'P1': 0.0,
+    'T_C': 20,
+    'rho_m': 13600.0,
+    'material': 'Steel, commercial',
+    'angulo_convergente': 15,
+    'angulo_divergente': 15,
+}
+
+_inicializado = False
+
+
+def caminho_snapshot(caminho=None):
+    """Caminho do snapshot: argumento, variável VENTURI_CACHE_QUENTE ou o padrão."""
+    if caminho is not None:
+        return Path(caminho)
+    return Path(os.environ.get('VENTURI_CACHE_QUENTE', ARQUIVO_PADRAO))
+
+
+def versoes_bibliotecas():
+    """Versões que invalidam o snapshot quando mudam."""
+    versoes = {'formato': FORMATO}
+    for nome in BIBLIOTECAS:
+        try:
+            versoes[nome] = version(nome)
+        except PackageNotFoundError:
+            versoes[nome] = None
+    return versoes
+
+
+def salvar_cache_quente(caminho=None):
+    """
+    Grava os caches atuais no snapshot (escrita atômica).
+
+    Returns:
+        Caminho gravado
+    """
+    caminho = caminho_snapshot(caminho)
+    with plots._trava_figuras:
+        figuras = list(plots._cache_figuras.items())
+    conteudo = {
+        'versoes': versoes_bibliotecas(),
+        'propriedades': dict(fluidos._cache_propriedades),
+        'figuras': figuras,
+    }
+
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    # Temporário exclusivo deste processo: vários processos encerrando ao
+    # mesmo tempo não intercalam escritas; o último os.replace prevalece
+    with tempfile.NamedTemporaryFile('wb', dir=caminho.parent, prefix=caminho.name + '.',
+                                     suffix='.tmp', delete=False) as arquivo:
+        temporario = Path(arquivo.name)
+        try:
+            pickle.dump(conteudo, arquivo, protocol=pickle.HIGHEST_PROTOCOL)
+        except BaseException:
+            arquivo.close()
+            temporario.unlink(missing_ok=True)
+            raise
+    os.replace(temporario, caminho)
+    return caminho
+
+
+def carregar_cache_quente(caminho=None):
+    """
+    Carrega o snapshot nos caches dos módulos.
+
+    Snapshots ausentes, corrompidos ou de outras versões das bibliotecas são
+    ignorados (e os corrompidos/obsoletos, removidos).
+
+    Returns:
+        True se o snapshot foi carregado
+    """
+    caminho = caminho_snapshot(caminho)
+    if not caminho.exists():
+        return False
+
+    try:
+        with open(caminho, 'rb') as arquivo:
+            conteudo = pickle.load(arquivo)
+        valido = conteudo.get('versoes') == versoes_bibliotecas()
+    except Exception:
+        valido = False
+    if not valido:
+        caminho.unlink(missing_ok=True)
+        return False
+
+    fluidos._cache_propriedades.update(conteudo['propriedades'])
+    with plots._trava_figuras:
+        for chave, png in conteudo['figuras']:
+            plots._cache_figuras.setdefault(chave, png)
+        while len(plots._cache_figuras) > plots.MAX_FIGURAS_CACHE:
+            plots._cache_figuras.popitem(last=False)
+    return True
+
+
+def inicializar_cache_quente(caminho=None):
+    """
+    Carrega o snapshot e agenda sua gravação no encerramento do processo.
+
+    Idempotente: o Streamlit reexecuta o script a cada interação, mas o
+    carregamento ocorre só na primeira.
+    """
+    global _inicializado
+    if _inicializado:
+        return
+    _inicializado = True
+    carregar_cache_quente(caminho)
+    atexit.register(salvar_cache_quente, caminho)
+
+
+def _simular_estado(fluido_quimico, mode, estado=ESTADO_PADRAO):
+    """Mesma sequência de main() para um estado dos widgets; None se inválido."""
+    D1, D2, L, Q = estado['D1'], estado['D2'], estado['L'], estado['Q']
+    P1 = estado['P1']
+    rho, mu = fluidos.propriedades_fluido(fluido_quimico, estado['T_C'] + 273.15, P1 + 101325.0)
+    if rho is None or mu is None:
+        return None
+
+    Re = (rho * (Q / (np.pi * (D2 / 2) ** 2)) * D2) / mu
+    if validar(D1, D2, rho, estado['rho_m'], Re, mode) != VALIDO:
+        return None
+
+    sim = VenturiSimulator()
+    sim.calcular(D1, D2, L, rho, estado['rho_m'], Q, 0, None, mode, mu, P1,
+                 estado['angulo_convergente'], estado['angulo_divergente'],
+                 epsilon=atrito.obter_rugosidade_material(estado['material']))
+    return sim
+
+
+def aquecer(temperaturas=range(0, 101)):
+    """
+    Preenche os caches: propriedades de todos os fluidos e misturas
+    predefinidas em cada temperatura do slider (P₁ padrão) e as figuras do
+    estado padrão nos dois modos.
+
+    Returns:
+        dict com o tamanho de cada cache
+    """
+    for fluido_quimico in [*fluidos.FLUIDOS.values(), *fluidos.MISTURAS.values()]:
+        fluidos.pre_calcular_tabela(fluido_quimico, temperaturas, ESTADO_PADRAO['P1'] + 101325.0)
+
+        for mode in ('Ideal', 'Realista'):
+            sim = _simular_estado(fluido_quimico, mode)
+            if sim is not None:
+                for nome in plots.FIGURAS:
+                    plots.figura_png(nome, sim)
+
+    return {
+        'propriedades': len(fluidos._cache_propriedades),
+        'figuras': len(plots._cache_figuras),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera o snapshot do cache quente.")
+    parser.add_argument('--arquivo', default=None, help="Caminho do snapshot")
+    args = parser.parse_args()
+
+    carregar_cache_quente(args.arquivo)
+    tamanhos = aquecer()
+    caminho = salvar_cache_quente(args.arquivo)
+    print(f"Snapshot gravado em {caminho}: {tamanhos}")
+
+
+if __name__ == '__main__':
+    main()
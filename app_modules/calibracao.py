@@ -0,0 +1,127 @@
+"""
+Calibração dos coeficientes de perda a partir de ensaios de bancada.
+
+Ajusta, por mínimos quadrados vetorizados, o coeficiente de entrada (e o
+coeficiente de descarga equivalente) e, quando a perda permanente foi
+medida, um fator multiplicativo da perda no difusor. O resultado alimenta
+o `VenturiSimulator` por meio de `CoeficientesPerda`.
+"""
+import numpy as np
+
+from app_modules.atrito import fator_atrito, obter_rugosidade_material
+from app_modules.fluidos import propriedades_interpoladas
+from app_modules.simulator import ANGULO_DIVERGENTE, CoeficientesPerda, k_difusor
+
+
+G = 9.81
+
+
+class ResultadoCalibracao:
+    """Coeficientes ajustados por medidor (arrays alinhados a `medidores`)."""
+
+    def __init__(self, medidores, k_entrada, fator_difusor, Cd, n_pontos, erro_rms_delta_h):
+        self.medidores = medidores
+        self.k_entrada = k_entrada
+        self.fator_difusor = fator_difusor
+        self.Cd = Cd
+        self.n_pontos = n_pontos
+        self.erro_rms_delta_h = erro_rms_delta_h
+
+    def coeficientes(self, medidor=None):
+        """`CoeficientesPerda` de um medidor, pronto para o `VenturiSimulator`.
+
+        Sem fator de difusor calibrado (perda permanente não medida), mantém 1.
+        """
+        if medidor is None:
+            if len(self.medidores) != 1:
+                raise ValueError("Informe o medidor: a calibração contém vários medidores.")
+            i = 0
+        else:
+            i = int(np.flatnonzero(self.medidores == medidor)[0])
+
+        fator_difusor = self.fator_difusor[i]
+        return CoeficientesPerda(
+            k_entrada=float(self.k_entrada[i]),
+            fator_difusor=1.0 if np.isnan(fator_difusor) else float(fator_difusor),
+        )
+
+
+def calibrar(dados, fluido='water', rho_m=13600.0, material='Steel, commercial',
+             P_abs=101325.0):
+    """
+    Ajusta os coeficientes de perda do modelo Realista a dados de bancada.
+
+    Args:
+        dados: Mapeamento de colunas (dict de arrays, DataFrame, ...) com
+            Q (m³/s), delta_h (m), T_C (°C), D1, D2 e L (m). Colunas
+            opcionais: `medidor` (identificador, um ajuste por medidor),
+            `perda_permanente` (P₁ - P₃ medido, Pa) e `angulo_divergente`
+            (ângulo total do difusor, graus; padrão 15°).
+        fluido: Fluido de ensaio (identificador do thermo)
+        rho_m: Densidade do fluido manométrico (kg/m³)
+        material: Material do tubo (rugosidade para o atrito na garganta)
+        P_abs: Pressão absoluta de ensaio para as propriedades (Pa)
+
+    Returns:
+        ResultadoCalibracao
+    """
+    Q = np.asarray(dados['Q'], dtype=float)
+    delta_h = np.asarray(dados['delta_h'], dtype=float)
+    T = np.asarray(dados['T_C'], dtype=float) + 273.15
+    D1 = np.asarray(dados['D1'], dtype=float)
+    D2 = np.asarray(dados['D2'], dtype=float)
+    L = np.asarray(dados['L'], dtype=float)
+
+    if 'medidor' in dados:
+        medidores, grupo = np.unique(np.asarray(dados['medidor']), return_inverse=True)
+    else:
+        medidores, grupo = np.array(['medidor']), np.zeros(Q.shape, dtype=np.intp)
+    n_grupos = len(medidores)
+
+    rho, mu = propriedades_interpoladas(fluido, T, P_abs)
+
+    A1 = np.pi * (D1 / 2) ** 2
+    A2 = np.pi * (D2 / 2) ** 2
+    v1 = Q / A1
+    v2 = Q / A2
+    carga_dinamica = 0.5 * rho * v2**2
+
+    delta_P = (rho_m - rho) * G * delta_h
+    validos = (Q > 0) & (delta_P > 0)
+
+    def somar(valores):
+        return np.bincount(grupo, weights=np.where(validos, valores, 0.0), minlength=n_grupos)
+
+    n_pontos = somar(np.ones_like(Q)).astype(int)
+
+    # ΔP - ½ρ(v₂² - v₁²) = k·½ρv₂², ponderado pelo erro relativo em ΔP
+    with np.errstate(divide='ignore', invalid='ignore'):
+        peso = 1.0 / delta_P**2
+        residuo_bernoulli = delta_P - 0.5 * rho * (v2**2 - v1**2)
+        k_entrada = somar(peso * carga_dinamica * residuo_bernoulli) / somar(peso * carga_dinamica**2)
+
+        # Coeficiente de descarga equivalente: Q = Cd·A₂·√(2ΔP / ρ(1 - β⁴))
+        beta4 = somar((D2 / D1) ** 4) / n_pontos
+        Cd = np.sqrt((1 - beta4) / (1 + k_entrada - beta4))
+
+        delta_h_previsto = (carga_dinamica * (1 + k_entrada[grupo]) - 0.5 * rho * v1**2) / ((rho_m - rho) * G)
+        erro_relativo = (delta_h_previsto - delta_h) / delta_h
+        erro_rms = np.sqrt(somar(erro_relativo**2) / n_pontos)
+
+    fator_difusor = np.full(n_grupos, np.nan)
+    if 'perda_permanente' in dados:
+        perda = np.asarray(dados['perda_permanente'], dtype=float)
+        epsilon = obter_rugosidade_material(material)
+        f = fator_atrito(rho * v2 * D2 / mu, epsilon / D2)
+
+        # P₁ - P₃ = (k + f·L/D₂ + b·K_difusor)·½ρv₂²; ajusta b com k já calibrado
+        medida = np.isfinite(perda) & (perda > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            peso = np.where(medida, 1.0 / np.where(medida, perda, 1.0)**2, 0.0)
+            angulo = np.asarray(dados['angulo_divergente'], dtype=float) \
+                if 'angulo_divergente' in dados else ANGULO_DIVERGENTE
+            regressor = k_difusor(D1, D2, angulo) * carga_dinamica
+            alvo = np.where(medida, perda - (k_entrada[grupo] + f * L / D2) * carga_dinamica, 0.0)
+            fator_difusor = somar(peso * regressor * alvo) / somar(peso * regressor**2)
+
+    return ResultadoCalibracao(medidores, k_entrada, fator_difusor, Cd, n_pontos, erro_rms)
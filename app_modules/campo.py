@@ -0,0 +1,166 @@
+"""
+Campo de escoamento potencial axissimétrico sobre a geometria do Venturi.
+
+A função de corrente de Stokes ψ do escoamento potencial satisfaz
+
+    E²ψ = ψ_xx + ψ_rr − ψ_r / r = 0
+
+com ψ = 0 no eixo e ψ = Q/2π na parede. O domínio (a parede suavizada de
+`plots.raio_parede`, com um D₁ de tubo reto antes e depois) é mapeado no
+retângulo (x, η = r/R(x)), onde a malha estruturada se ajusta à parede; o
+operador transformado é discretizado por diferenças centradas e resolvido
+como sistema esparso (scipy.sparse, fatoração LU).
+
+Como as condições de contorno são proporcionais a Q, o campo de Q = 1 m³/s
+é resolvido uma vez por geometria e malha e guardado em cache; mudar a vazão
+(ou o fluido e P₁, que só entram no pós-processamento) apenas reescala a
+solução. O escoamento é invíscido: as pressões seguem Bernoulli a partir de
+P₁, sem as perdas do modo Realista.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+
+from app_modules.plots import raio_parede
+
+
+PONTOS_AXIAIS = 241
+PONTOS_RADIAIS = 41
+
+MAX_CAMPOS_CACHE = 32
+
+# Campos de Q = 1 por (geometria, malha)
+_cache_campos = OrderedDict()
+_trava_campos = threading.Lock()
+
+
+class CampoEscoamento:
+    """
+    Campo potencial de uma geometria para Q = 1 m³/s.
+
+    Atributos X e Rr são as coordenadas físicas (m) dos nós da malha
+    (eixos: axial × radial); ux, ur e psi são os valores de Q = 1.
+    """
+
+    def __init__(self, x, eta, R, psi):
+        self.x = x
+        self.eta = eta
+        self.R = R
+        self.X = np.broadcast_to(x[:, None], psi.shape)
+        self.Rr = R[:, None] * eta[None, :]
+        self.psi = psi
+        self.ux, self.ur = self._velocidades()
+
+    def _velocidades(self):
+        """u_x = ψ_r / r e u_r = −ψ_x|_r / r, com o limite ψ ≈ c·r² no eixo."""
+        x, eta, R, psi = self.x, self.eta, self.R, self.psi
+        dR = np.gradient(R, x)
+        psi_eta = np.gradient(psi, eta, axis=1, edge_order=2)
+        psi_x = np.gradient(psi, x, axis=0, edge_order=2)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ux = psi_eta / (eta[None, :] * R[:, None] ** 2)
+            ur = -(psi_x - eta[None, :] * (dR / R)[:, None] * psi_eta) / (eta[None, :] * R[:, None])
+        # No eixo: ψ_η/η → ψ_ηη ≈ 2ψ(η₁)/η₁²; u_r = 0 por simetria
+        ux[:, 0] = 2 * psi[:, 1] / (eta[1] ** 2 * R ** 2)
+        ur[:, 0] = 0.0
+        return ux / (2 * np.pi), ur / (2 * np.pi)
+
+    def velocidade(self, Q):
+        """Módulo da velocidade (m/s) para a vazão Q."""
+        return Q * np.hypot(self.ux, self.ur)
+
+    def pressao(self, Q, rho, P1):
+        """Pressão manométrica (Pa) por Bernoulli a partir de P₁ na entrada."""
+        v_entrada = Q * self.ux[0].mean()
+        return P1 + 0.5 * rho * (v_entrada ** 2 - self.velocidade(Q) ** 2)
+
+
+def _montar_sistema(x, eta, R):
+    """
+    Matriz esparsa do operador E² no plano (x, η) e o lado direito.
+
+    Com r = η·R(x) e a = −η·R'/R:
+        ψ_xx + 2a·ψ_xη + (a² + 1/R²)·ψ_ηη + [η(2R'² − R·R'')/R² − 1/(η·R²)]·ψ_η = 0
+    Nós do contorno são equações identidade com o valor prescrito.
+    """
+    nx, ne = len(x), len(eta)
+    hx, he = x[1] - x[0], eta[1] - eta[0]
+    dR = np.gradient(R, x)
+    d2R = np.gradient(dR, x)
+
+    indice = np.arange(nx * ne).reshape(nx, ne)
+    I, J = np.meshgrid(np.arange(1, nx - 1), np.arange(1, ne - 1), indexing='ij')
+    Ri, dRi, d2Ri = R[I], dR[I], d2R[I]
+    e = eta[J]
+
+    a = -e * dRi / Ri
+    c_xx = 1.0 / hx ** 2
+    c_ee = (a ** 2 + 1.0 / Ri ** 2) / he ** 2
+    c_e = (e * (2 * dRi ** 2 - Ri * d2Ri) / Ri ** 2 - 1.0 / (e * Ri ** 2)) / (2 * he)
+    c_xe = 2 * a / (4 * hx * he)
+
+    centro = indice[I, J]
+    vizinhos = [
+        (indice[I, J], -2 * c_xx - 2 * c_ee),
+        (indice[I - 1, J], np.full_like(a, c_xx)),
+        (indice[I + 1, J], np.full_like(a, c_xx)),
+        (indice[I, J - 1], c_ee - c_e),
+        (indice[I, J + 1], c_ee + c_e),
+        (indice[I + 1, J + 1], c_xe),
+        (indice[I - 1, J - 1], c_xe),
+        (indice[I + 1, J - 1], -c_xe),
+        (indice[I - 1, J + 1], -c_xe),
+    ]
+
+    contorno = np.concatenate([indice[0], indice[-1], indice[1:-1, 0], indice[1:-1, -1]])
+    linhas = np.concatenate([np.tile(centro.ravel(), len(vizinhos)), contorno])
+    colunas = np.concatenate([v.ravel() for v, _ in vizinhos] + [contorno])
+    valores = np.concatenate([c.ravel() for _, c in vizinhos] + [np.ones(len(contorno))])
+    A = sp.csc_matrix((valores, (linhas, colunas)), shape=(nx * ne, nx * ne))
+
+    # ψ (normalizado por Q/2π): η² nas seções de tubo reto, 0 no eixo, 1 na parede
+    b = np.zeros((nx, ne))
+    b[0] = b[-1] = eta ** 2
+    b[:, -1] = 1.0
+    return A, b.ravel()
+
+
+def resolver_campo(sim, pontos_axiais=PONTOS_AXIAIS, pontos_radiais=PONTOS_RADIAIS):
+    """
+    Campo potencial (Q = 1) da geometria de `sim`, com cache por geometria e malha.
+
+    Args:
+        sim: VenturiSimulator calculado (usa D1, D2, comprimentos e ângulos)
+        pontos_axiais, pontos_radiais: Nós da malha estruturada
+
+    Returns:
+        CampoEscoamento; use `velocidade(Q)` e `pressao(Q, rho, P1)`
+    """
+    chave = tuple(float(f'{float(v):.12g}') for v in (sim.D1, sim.D2, sim.L_garganta,
+                                                      sim.angulo_convergente, sim.angulo_divergente))
+    chave += (pontos_axiais, pontos_radiais)
+    with _trava_campos:
+        campo = _cache_campos.get(chave)
+        if campo is not None:
+            _cache_campos.move_to_end(chave)
+            return campo
+
+    x = np.linspace(-sim.D1, sim.L + sim.D1, pontos_axiais)
+    eta = np.linspace(0.0, 1.0, pontos_radiais)
+    R = raio_parede(sim, x)
+
+    A, b = _montar_sistema(x, eta, R)
+    psi = splu(A).solve(b).reshape(pontos_axiais, pontos_radiais)
+    campo = CampoEscoamento(x, eta, R, psi)
+
+    # A solução fica fora da trava; sessões que resolvem a mesma geometria ao
+    # mesmo tempo gravam campos equivalentes
+    with _trava_campos:
+        _cache_campos[chave] = campo
+        if len(_cache_campos) > MAX_CAMPOS_CACHE:
+            _cache_campos.popitem(last=False)
+    return campo
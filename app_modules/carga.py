@@ -0,0 +1,265 @@
+"""
+Teste de carga local: várias sessões simuladas reexecutando `main()`.
+
+Cada sessão é um `AppTest` do Streamlit (sem navegador nem servidor) em sua
+própria thread, como as sessões de um processo do `streamlit run`. As
+sessões repetem sequências realistas de interação: arrastar os sliders de
+D₁, D₂, Q e temperatura (uma reexecução por posição intermediária), trocar
+o fluido e o modo, com pausas de leitura entre as ações. Uma thread de
+monitoramento registra CPU e memória residente do processo ao longo do teste.
+
+Como todas as sessões dividem o mesmo processo (e o GIL), a latência das
+reexecuções em função do número de sessões mostra quantos usuários
+simultâneos um processo atende antes de degradar:
+
+    python -m app_modules.carga --sessoes 1 2 4 8 --duracao 60 --saida carga/
+"""
+import argparse
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+from app_modules.recursos import rss_bytes
+
+
+ARQUIVO_APP = Path(__file__).resolve().parent.parent / 'app.py'
+
+ROTULOS = {
+    'D1': "D₁ - Diâmetro de entrada (m)",
+    'D2': "D₂ - Diâmetro da garganta (m)",
+    'Q': "Q - Vazão volumétrica (m³/s)",
+    'temperatura': "Temperatura (°C)",
+    'fluido': "Selecione o Fluido:",
+    'modo': "🔬 Tipo de Simulação:",
+}
+
+# Ação → peso no sorteio (arrastos de vazão e diâmetros são os mais comuns)
+PESOS_ACOES = {'D1': 0.2, 'D2': 0.2, 'Q': 0.3, 'temperatura': 0.15, 'fluido': 0.1, 'modo': 0.05}
+
+FLUIDOS_CARGA = ("Água", "Etanol", "Glicerina", "Óleo de Motor (n-Octano)")
+
+# Posições intermediárias por arrasto e intervalo entre elas (s)
+PASSOS_ARRASTO = (2, 6)
+INTERVALO_ARRASTO = 0.05
+
+PERCENTIS = (50, 95, 99)
+
+
+def _widget(at, acao):
+    """Widget do AppTest correspondente à ação."""
+    colecao = at.selectbox if acao == 'fluido' else at.radio if acao == 'modo' else at.slider
+    return next(w for w in colecao if w.label == ROTULOS[acao])
+
+
+def _arrasto(atual, alvo, passos, casas):
+    """Posições intermediárias de um arrasto de slider, terminando no alvo."""
+    return [round(v, casas) for v in np.linspace(atual, alvo, passos + 1)[1:]]
+
+
+def _sequencia(at, acao, rng):
+    """Valores sucessivos do widget da ação (um arrasto ou uma troca de opção)."""
+    valor = _widget(at, acao).value
+    passos = int(rng.integers(*PASSOS_ARRASTO, endpoint=True))
+    if acao == 'fluido':
+        return [str(rng.choice([f for f in FLUIDOS_CARGA if f != valor]))]
+    if acao == 'modo':
+        return ['Realista' if valor == 'Ideal' else 'Ideal']
+    if acao == 'temperatura':
+        return [int(v) for v in _arrasto(valor, int(rng.integers(0, 101)), passos, 0)]
+
+    # Diâmetros mantêm a razão na faixa válida (1 < D₁/D₂ ≤ 2) na maior parte do tempo
+    D1, D2 = _widget(at, 'D1').value, _widget(at, 'D2').value
+    if acao == 'D1':
+        alvo = rng.uniform(max(D2 + 0.01, 0.05), min(2 * D2, 0.30))
+    elif acao == 'D2':
+        alvo = rng.uniform(max(D1 / 2, 0.02), min(D1 - 0.01, 0.15))
+    else:
+        return _arrasto(valor, rng.uniform(0.001, 0.05), passos, 3)
+    return _arrasto(valor, alvo, passos, 2)
+
+
+class SessaoSimulada(threading.Thread):
+    """Uma sessão do app repetindo ações sorteadas até o prazo."""
+
+    def __init__(self, indice, prazo, registros, pensar=1.0, semente=0, arquivo_app=ARQUIVO_APP,
+                 timeout=120.0):
+        super().__init__(name=f'sessao-{indice}', daemon=True)
+        self.indice = indice
+        self.prazo = prazo
+        self.registros = registros
+        self.pensar = pensar
+        self.rng = np.random.default_rng([semente, indice])
+        self.arquivo_app = arquivo_app
+        self.timeout = timeout
+
+    def _reexecutar(self, at, acao):
+        inicio = time.perf_counter()
+        at.run(timeout=self.timeout)
+        fim = time.perf_counter()
+        # list.append é atômico no CPython: sem trava entre as sessões
+        self.registros.append((self.indice, acao, inicio, fim - inicio, len(at.exception)))
+
+    def run(self):
+        at = AppTest.from_file(str(self.arquivo_app), default_timeout=self.timeout)
+        self._reexecutar(at, 'abertura')
+        acoes, pesos = list(PESOS_ACOES), np.array(list(PESOS_ACOES.values()))
+        while time.perf_counter() < self.prazo:
+            acao = str(self.rng.choice(acoes, p=pesos / pesos.sum()))
+            try:
+                valores = _sequencia(at, acao, self.rng)
+            except StopIteration:
+                # Widget ausente (app parado pela validação): recomeça do estado padrão
+                at = AppTest.from_file(str(self.arquivo_app), default_timeout=self.timeout)
+                self._reexecutar(at, 'abertura')
+                continue
+            for i, valor in enumerate(valores):
+                if i:
+                    time.sleep(INTERVALO_ARRASTO)
+                _widget(at, acao).set_value(valor)
+                self._reexecutar(at, acao)
+            time.sleep(self.rng.exponential(self.pensar))
+
+
+class MonitorProcesso(threading.Thread):
+    """Amostra CPU (% de um núcleo), RSS e reexecuções concluídas a intervalos regulares."""
+
+    def __init__(self, registros, intervalo=0.5):
+        super().__init__(name='monitor-carga', daemon=True)
+        self.registros = registros
+        self.intervalo = intervalo
+        self.amostras = []
+        self._parar = threading.Event()
+
+    def run(self):
+        inicio = anterior = time.perf_counter()
+        tempos = os.times()
+        cpu_anterior = tempos.user + tempos.system
+        concluidas = 0
+        while not self._parar.wait(self.intervalo):
+            agora = time.perf_counter()
+            tempos = os.times()
+            cpu = tempos.user + tempos.system
+            total = len(self.registros)
+            self.amostras.append({
+                't': agora - inicio,
+                'cpu_pct': 100 * (cpu - cpu_anterior) / (agora - anterior),
+                'rss_mb': rss_bytes() / 2**20,
+                'reexecucoes_por_s': (total - concluidas) / (agora - anterior),
+            })
+            anterior, cpu_anterior, concluidas = agora, cpu, total
+
+    def parar(self):
+        self._parar.set()
+        self.join()
+
+
+class ResultadoCarga:
+    """Reexecuções (uma linha cada) e linha do tempo do processo de um teste de carga."""
+
+    def __init__(self, sessoes, duracao, reexecucoes, linha_do_tempo):
+        self.sessoes = sessoes
+        self.duracao = duracao
+        self.reexecucoes = reexecucoes
+        self.linha_do_tempo = linha_do_tempo
+
+    def resumo(self):
+        """
+        Returns:
+            dict com sessões, reexecuções, vazão (reexecuções/s), latências
+            (s) p50/p95/p99/máx das interações (sem as aberturas), excecoes,
+            CPU média (% de um núcleo) e RSS máximo (MB)
+        """
+        interacoes = self.reexecucoes[self.reexecucoes['acao'] != 'abertura']['latencia']
+        resumo = {
+            'sessoes': self.sessoes,
+            'reexecucoes': len(self.reexecucoes),
+            'vazao': len(self.reexecucoes) / self.duracao,
+        }
+        for p in PERCENTIS:
+            resumo[f'p{p}'] = float(np.percentile(interacoes, p)) if len(interacoes) else np.nan
+        resumo['maximo'] = float(interacoes.max()) if len(interacoes) else np.nan
+        resumo['excecoes'] = int((self.reexecucoes['excecoes'] > 0).sum())
+        resumo['cpu_pct'] = float(self.linha_do_tempo['cpu_pct'].mean()) if len(self.linha_do_tempo) else np.nan
+        resumo['rss_max_mb'] = float(self.linha_do_tempo['rss_mb'].max()) if len(self.linha_do_tempo) else np.nan
+        return resumo
+
+    def latencias_por_acao(self):
+        """Percentis de latência (s) por tipo de ação."""
+        grupos = self.reexecucoes.groupby('acao')['latencia']
+        tabela = grupos.quantile([p / 100 for p in PERCENTIS]).unstack()
+        tabela.columns = [f'p{p}' for p in PERCENTIS]
+        tabela.insert(0, 'n', grupos.size())
+        return tabela
+
+
+def executar_carga(sessoes=4, duracao=60.0, pensar=1.0, rampa=None, semente=0, intervalo_monitor=0.5,
+                   arquivo_app=ARQUIVO_APP):
+    """
+    Roda `sessoes` sessões simultâneas do app por `duracao` segundos.
+
+    Args:
+        pensar: Pausa média entre ações de uma sessão (s, exponencial)
+        rampa: Intervalo entre o início das sessões (s); padrão, pensar / sessoes
+        semente: Semente das sequências (a mesma semente repete as ações)
+
+    Returns:
+        ResultadoCarga; a duração efetiva inclui o término das sessões em curso
+    """
+    rampa = pensar / sessoes if rampa is None else rampa
+    registros = []
+    monitor = MonitorProcesso(registros, intervalo_monitor)
+    inicio = time.perf_counter()
+    prazo = inicio + duracao
+    monitor.start()
+
+    threads = []
+    for i in range(sessoes):
+        sessao = SessaoSimulada(i, prazo, registros, pensar, semente, arquivo_app)
+        sessao.start()
+        threads.append(sessao)
+        time.sleep(rampa)
+    for sessao in threads:
+        sessao.join()
+    monitor.parar()
+    total = time.perf_counter() - inicio
+
+    reexecucoes = pd.DataFrame(registros, columns=['sessao', 'acao', 'inicio', 'latencia', 'excecoes'])
+    reexecucoes['inicio'] -= inicio
+    return ResultadoCarga(sessoes, total, reexecucoes, pd.DataFrame(monitor.amostras))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga local do app com sessões simuladas.")
+    parser.add_argument('--sessoes', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help="Números de sessões simultâneas (um teste por valor)")
+    parser.add_argument('--duracao', type=float, default=60.0, help="Duração de cada teste (s)")
+    parser.add_argument('--pensar', type=float, default=1.0, help="Pausa média entre ações (s)")
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--saida', default=None, help="Diretório para os CSVs de cada teste")
+    args = parser.parse_args()
+
+    resumos = []
+    for n in args.sessoes:
+        resultado = executar_carga(n, args.duracao, args.pensar, semente=args.semente)
+        resumos.append(resultado.resumo())
+        print(pd.DataFrame([resumos[-1]]).to_string(index=False, float_format=lambda v: f'{v:.3f}'))
+        if args.saida:
+            saida = Path(args.saida)
+            saida.mkdir(parents=True, exist_ok=True)
+            resultado.reexecucoes.to_csv(saida / f'reexecucoes_{n}.csv', index=False)
+            resultado.linha_do_tempo.to_csv(saida / f'linha_do_tempo_{n}.csv', index=False)
+            resultado.latencias_por_acao().to_csv(saida / f'latencias_por_acao_{n}.csv')
+
+    print()
+    print(pd.DataFrame(resumos).to_string(index=False, float_format=lambda v: f'{v:.3f}'))
+    if args.saida:
+        pd.DataFrame(resumos).to_csv(Path(args.saida) / 'resumo.csv', index=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Cavitação na garganta: margem para a pressão de vapor e vazão segura.
+
+A menor pressão estática do medidor é a do fim da garganta (`P2_fim`). As
+pressões do simulador são manométricas; somando a atmosfera padrão (a mesma
+referência usada para o thermo) obtém-se a pressão absoluta, comparada à
+pressão de vapor do fluido. O número de cavitação da garganta é
+
+    σ = (P₂,abs − P_v) / (½ ρ v₂²)
+
+e o escoamento cavita para σ ≤ σ_min (0 por padrão). Como P₂,fim cai com
+Q², a vazão segura de cada geometria sai de forma fechada, com poucas
+iterações de ponto fixo apenas para o atrito da garganta.
+"""
+import numpy as np
+
+from app_modules.atrito import resolver_atrito
+from app_modules.simulator import COEFICIENTES_PADRAO
+
+
+P_ATMOSFERICA = 101325.0
+
+SIGMA_MINIMO = 0.0
+
+
+def analisar_cavitacao(sim, P_vapor, sigma_minimo=SIGMA_MINIMO):
+    """
+    Margem de cavitação de um simulador já calculado (escalar ou vetorizado).
+
+    Args:
+        sim: VenturiSimulator após `calcular`
+        P_vapor: Pressão de vapor absoluta (Pa); NaN para gases
+        sigma_minimo: σ abaixo do qual o ponto é considerado cavitante
+
+    Returns:
+        dict com P2_abs (Pa), margem (P2_abs − P_vapor, Pa), sigma e cavita
+        (bool; sempre False sem pressão de vapor)
+    """
+    P2_abs = sim.P2_fim + P_ATMOSFERICA
+    margem = P2_abs - P_vapor
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sigma = margem / (0.5 * sim.rho * sim.v2**2)
+    return {'P2_abs': P2_abs, 'margem': margem, 'sigma': sigma, 'cavita': sigma <= sigma_minimo}
+
+
+def vazao_segura(D1, D2, L_garganta, rho, mu, epsilon, P1, P_vapor, mode='Realista',
+                 coeficientes=COEFICIENTES_PADRAO, sigma_minimo=SIGMA_MINIMO):
+    """
+    Maior vazão sem cavitação na garganta, vetorizada sobre as geometrias.
+
+    Resolve P₁,abs − P_v = ½ρQ²·[(1+K_e)/A₂² − 1/A₁² + f·L/(D₂A₂²) + σ_min/A₂²],
+    com f no Reynolds da própria solução (`resolver_atrito`, ponto fixo por
+    elemento; f varia pouco com Re).
+
+    Args:
+        P1: Pressão de entrada manométrica (Pa)
+        P_vapor: Pressão de vapor absoluta (Pa); NaN (gases) resulta em infinito
+
+    Returns:
+        Q (m³/s) com o formato do broadcasting das entradas; 0 quando nem o
+        escoamento parado fica acima da pressão de vapor
+    """
+    D1, D2 = np.asarray(D1, dtype=float), np.asarray(D2, dtype=float)
+    A1 = np.pi * (D1 / 2) ** 2
+    A2 = np.pi * (D2 / 2) ** 2
+    realista = mode == 'Realista'
+    k_entrada = coeficientes.k_entrada if realista else 0.0
+
+    disponivel = np.maximum(P1 + P_ATMOSFERICA - P_vapor, 0.0)
+    termo_fixo = (1 + k_entrada + sigma_minimo) / A2**2 - 1 / A1**2
+
+    def vazao(f):
+        return np.sqrt(disponivel / (0.5 * rho * (termo_fixo + f * L_garganta / (D2 * A2**2))))
+
+    if realista:
+        _, f, _ = resolver_atrito(lambda f: vazao(f) / A2, D2, rho, mu, epsilon)
+        Q = vazao(f)
+    else:
+        Q = vazao(0.0)
+
+    return np.where(np.isnan(P_vapor), np.inf, Q)[()]
+
+
+def envelope_vazao_segura(D1, L_garganta, rho, mu, epsilon, P1, P_vapor, mode='Realista',
+                          coeficientes=COEFICIENTES_PADRAO, sigma_minimo=SIGMA_MINIMO, pontos=200):
+    """
+    Vazão segura em função de D₂ na faixa aceita pela validação (D₁/2 ≤ D₂ < D₁).
+
+    Returns:
+        (D2, Q_max): arrays com `pontos` valores
+    """
+    D2 = np.linspace(D1 / 2, D1, pontos + 1)[:-1]
+    Q = vazao_segura(D1, D2, L_garganta, rho, mu, epsilon, P1, P_vapor, mode,
+                     coeficientes, sigma_minimo)
+    return D2, np.broadcast_to(Q, D2.shape)
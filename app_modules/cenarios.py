@@ -0,0 +1,177 @@
+"""
+Comparação de cenários nomeados ("medidor atual × proposto", "20 °C × 80 °C").
+
+Os cenários ficam guardados (na sessão do Streamlit, por exemplo) e são
+avaliados juntos: propriedades dos fluidos consultadas uma vez por
+combinação (fluido, T, P), atrito e simulador em uma chamada vetorizada por
+modo. Só os cenários cujas entradas mudaram desde a última avaliação são
+recalculados.
+"""
+import numpy as np
+import pandas as pd
+
+from app_modules.atrito import obter_rugosidade_material
+from app_modules.fluidos import propriedades_fluido
+from app_modules.lote import simular_lote
+from app_modules.simulator import VenturiSimulator
+from app_modules.validacao import VALIDO, mensagens, validar
+
+
+PARAMETROS = ('mode', 'fluido', 'T_C', 'P1', 'D1', 'D2', 'L', 'Q', 'rho_m', 'material',
+              'angulo_convergente', 'angulo_divergente')
+
+# Atributos do VenturiSimulator copiados para o simulador de cada cenário
+_ATRIBUTOS_SIMULADOR = ('D1', 'D2', 'L_garganta', 'rho', 'rho_m', 'Q', 'delta_h', 'f', 'Re', 'mu', 'P1',
+                        'angulo_convergente', 'angulo_divergente', 'A1', 'A2', 'L_entrada',
+                        'L_saida', 'L', 'v1', 'v2', 'delta_P', 'P2', 'P2_fim', 'P3', 'h_L')
+
+# (rótulo, unidade, função do simulador) da tabela de comparação
+GRANDEZAS = (
+    ('Vazão Q', 'm³/s', lambda sim: sim.Q),
+    ('Desnível Δh', 'cm', lambda sim: sim.delta_h * 100),
+    ('Velocidade v₁', 'm/s', lambda sim: sim.v1),
+    ('Velocidade v₂', 'm/s', lambda sim: sim.v2),
+    ('P₂ (início)', 'kPa', lambda sim: sim.P2 / 1000),
+    ('P₂ (fim)', 'kPa', lambda sim: sim.P2_fim / 1000),
+    ('P₃', 'kPa', lambda sim: sim.P3 / 1000),
+    ('ΔP', 'kPa', lambda sim: sim.delta_P / 1000),
+    ('Perda hₗ', 'm', lambda sim: sim.h_L),
+    ('Reynolds', '-', lambda sim: sim.calcular_reynolds()),
+    ('Atrito f', '-', lambda sim: sim.f),
+    ('ρ', 'kg/m³', lambda sim: sim.rho),
+    ('μ', 'Pa·s', lambda sim: sim.mu),
+)
+
+
+class ResultadoCenario:
+    """Resultado de um cenário: simulador escalar equivalente ou mensagem de erro."""
+
+    def __init__(self, nome, parametros, sim=None, erro=None):
+        self.nome = nome
+        self.parametros = parametros
+        self.sim = sim
+        self.erro = erro
+
+
+def _fatiar_simulador(sim, i, mode):
+    """VenturiSimulator escalar com os valores do elemento `i` de um simulador vetorizado."""
+    fatia = VenturiSimulator(sim.coeficientes)
+    fatia.mode = mode
+    n = np.shape(sim.Q)
+    for nome in _ATRIBUTOS_SIMULADOR:
+        setattr(fatia, nome, float(np.broadcast_to(getattr(sim, nome), n)[i]))
+    return fatia
+
+
+class ComparadorCenarios:
+    """
+    Conjunto ordenado de cenários nomeados com resultados memorizados.
+
+    Cada cenário é um dicionário com as chaves de `PARAMETROS` (mesmas
+    entradas de `main()`; `fluido` é o identificador do thermo).
+    """
+
+    def __init__(self):
+        self.cenarios = {}
+        self._resultados = {}
+        self.avaliacoes = 0
+
+    def __len__(self):
+        return len(self.cenarios)
+
+    def __contains__(self, nome):
+        return nome in self.cenarios
+
+    def definir(self, nome, parametros):
+        """Cria ou substitui um cenário."""
+        faltando = set(PARAMETROS) - set(parametros)
+        if faltando:
+            raise ValueError(f"Parâmetros ausentes: {sorted(faltando)}")
+        self.cenarios[nome] = {chave: parametros[chave] for chave in PARAMETROS}
+
+    def remover(self, nome):
+        self.cenarios.pop(nome, None)
+        self._resultados.pop(nome, None)
+
+    def pendentes(self):
+        """Cenários novos ou com entradas alteradas desde a última avaliação."""
+        return [nome for nome, parametros in self.cenarios.items()
+                if nome not in self._resultados or self._resultados[nome].parametros != parametros]
+
+    def avaliar(self):
+        """
+        Avalia os cenários pendentes e retorna todos os resultados, em ordem.
+
+        Returns:
+            Lista de ResultadoCenario
+        """
+        pendentes = self.pendentes()
+        validos = {'Ideal': [], 'Realista': []}
+        if pendentes:
+            lista = [dict(self.cenarios[nome]) for nome in pendentes]
+            propriedades = np.array([propriedades_fluido(p['fluido'], p['T_C'] + 273.15, p['P1'] + 101325.0)
+                                     for p in lista], dtype=float)
+
+            def coluna_pendentes(chave):
+                return np.array([p[chave] for p in lista], dtype=float)
+
+            rho, mu = propriedades[:, 0], propriedades[:, 1]
+            D2 = coluna_pendentes('D2')
+            with np.errstate(invalid='ignore'):
+                Re = rho * (coluna_pendentes('Q') / (np.pi * (D2 / 2) ** 2)) * D2 / mu
+            codigos = validar(coluna_pendentes('D1'), D2, rho, coluna_pendentes('rho_m'), Re,
+                              np.array([p['mode'] for p in lista]))
+
+            for nome, parametros, codigo, rho_i, mu_i in zip(pendentes, lista, codigos, rho, mu):
+                if codigo != VALIDO:
+                    self._resultados[nome] = ResultadoCenario(nome, parametros, erro=' '.join(mensagens(codigo)))
+                else:
+                    validos[parametros['mode']].append((nome, parametros, rho_i, mu_i))
+
+        for mode, itens in validos.items():
+            if not itens:
+                continue
+
+            def coluna(chave):
+                return np.array([parametros[chave] for _, parametros, _, _ in itens], dtype=float)
+
+            epsilon = np.array([obter_rugosidade_material(p['material']) for _, p, _, _ in itens])
+            resultado = simular_lote(
+                coluna('D1'), coluna('D2'), coluna('L'), coluna('Q'),
+                np.array([rho for _, _, rho, _ in itens]), np.array([mu for _, _, _, mu in itens]),
+                epsilon, coluna('rho_m'), mode, coluna('P1'),
+                coluna('angulo_convergente'), coluna('angulo_divergente'),
+            )
+            for i, (nome, parametros, _, _) in enumerate(itens):
+                sim = _fatiar_simulador(resultado.simulador, i, mode)
+                self._resultados[nome] = ResultadoCenario(nome, parametros, sim)
+
+        self.avaliacoes += len(pendentes)
+        return [self._resultados[nome] for nome in self.cenarios]
+
+
+def tabela_comparacao(resultados, referencia=None):
+    """
+    Tabela grandeza × cenário, com a diferença percentual para a referência.
+
+    Args:
+        resultados: Lista de ResultadoCenario (os inválidos são ignorados)
+        referencia: Nome do cenário de referência (padrão: o primeiro válido)
+
+    Returns:
+        DataFrame indexado por grandeza (com unidade)
+    """
+    validos = [r for r in resultados if r.sim is not None]
+    indice = [f"{rotulo} ({unidade})" for rotulo, unidade, _ in GRANDEZAS]
+    if not validos:
+        return pd.DataFrame(index=indice)
+
+    valores = {r.nome: [float(funcao(r.sim)) for _, _, funcao in GRANDEZAS] for r in validos}
+    tabela = pd.DataFrame(valores, index=indice)
+
+    referencia = referencia if referencia in valores else validos[0].nome
+    base = tabela[referencia]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        desvios = {f"Δ% {r.nome}": np.where(base != 0, (tabela[r.nome] - base) / base.abs() * 100, np.nan)
+                   for r in validos if r.nome != referencia}
+    return pd.concat([tabela, pd.DataFrame(desvios, index=indice)], axis=1)
@@ -0,0 +1,149 @@
+"""
+Escoamento compressível de gases: expansibilidade e estado na garganta.
+
+No modo incompressível o ΔP vem de Bernoulli com ρ₁. Para gases, a mesma
+vazão mássica exige um ΔP maior, ΔP = ΔP_incompressível / ε², com o fator
+de expansibilidade isentrópico da ISO 5167 (τ = P₂/P₁, β = D₂/D₁):
+
+    ε² = κτ^(2/κ)/(κ−1) · (1 − β⁴)/(1 − β⁴τ^(2/κ)) · (1 − τ^((κ−1)/κ))/(1 − τ)
+
+A razão τ é resolvida por bissecção vetorizada entre a razão crítica e 1;
+vazões que exigiriam τ abaixo da crítica (garganta bloqueada, Mach 1)
+resultam em NaN. Densidade e temperatura na garganta seguem as relações
+isentrópicas, e a viscosidade no estado da garganta vem da grade de
+temperatura de `propriedades_interpoladas` (poucos pontos no cache do thermo
+por lote, não uma chamada por ponto).
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from app_modules.fluidos import expoente_isentropico, propriedades_interpoladas
+
+
+P_ATMOSFERICA = 101325.0
+
+# Passo da grade de pressão (Pa) das propriedades no estado da garganta; μ
+# de gases quase não depende de P, e a grade limita as chamadas ao thermo
+PASSO_PRESSAO_GARGANTA = 1000.0
+
+ITERACOES_BISSECCAO = 60
+
+
+@dataclass(frozen=True)
+class EstadoGas:
+    """Dados do gás na entrada para o modo compressível do simulador.
+
+    Atributos: identificador do thermo, κ e temperatura de entrada T1 (K),
+    escalares ou arrays do lote.
+    """
+    fluido: str
+    kappa: object
+    T1: object
+
+    def viscosidade(self, T, P_abs):
+        """μ (Pa·s) nos estados (T, P) da garganta, pela grade de temperatura."""
+        P = round(float(np.mean(P_abs)) / PASSO_PRESSAO_GARGANTA) * PASSO_PRESSAO_GARGANTA
+        return propriedades_interpoladas(self.fluido, T, P)[1]
+
+
+def estado_gas(fluido_quimico, T1, P1=0.0):
+    """
+    EstadoGas de um gás a T1 (K) e P1 manométrica (Pa), com κ do thermo.
+
+    Arrays de T1 ou P1 usam κ nos valores médios (κ varia pouco com T e P).
+    """
+    kappa = expoente_isentropico(fluido_quimico, float(np.mean(T1)), float(np.mean(P1)) + P_ATMOSFERICA)
+    return EstadoGas(fluido_quimico, kappa, T1)
+
+
+def expansibilidade(tau, beta, kappa):
+    """Fator de expansibilidade ε (ISO 5167) para τ = P₂/P₁; ε → 1 quando τ → 1."""
+    tau, beta, kappa = (np.asarray(x, dtype=float) for x in (tau, beta, kappa))
+    beta4 = beta ** 4
+    t2k = tau ** (2 / kappa)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        eps2 = (kappa * t2k / (kappa - 1) * (1 - beta4) / (1 - beta4 * t2k)
+                * (1 - tau ** ((kappa - 1) / kappa)) / (1 - tau))
+    return np.where(tau >= 1.0, 1.0, np.sqrt(eps2))[()]
+
+
+def razao_critica(beta, kappa):
+    """
+    τ crítica (Mach 1 na garganta) de um bocal com razão β:
+    τ^((1−κ)/κ) + (κ−1)/2 · β⁴ · τ^(2/κ) = (κ+1)/2.
+    """
+    beta, kappa = np.broadcast_arrays(np.asarray(beta, dtype=float), np.asarray(kappa, dtype=float))
+    baixo, alto = np.full(beta.shape, 1e-3), np.ones(beta.shape)
+    for _ in range(ITERACOES_BISSECCAO):
+        tau = 0.5 * (baixo + alto)
+        g = tau ** ((1 - kappa) / kappa) + (kappa - 1) / 2 * beta ** 4 * tau ** (2 / kappa) - (kappa + 1) / 2
+        # g decresce com τ: g > 0 → raiz acima
+        baixo, alto = np.where(g > 0, tau, baixo), np.where(g > 0, alto, tau)
+    return (0.5 * (baixo + alto))[()]
+
+
+def razao_pressoes(delta_P_incompressivel, P1_abs, beta, kappa):
+    """
+    τ = P₂/P₁ tal que P₁·(1 − τ)·ε(τ)² = ΔP incompressível, vetorizado.
+
+    Returns:
+        τ; NaN onde a vazão excede a de bloqueio
+    """
+    alvo = np.asarray(delta_P_incompressivel, dtype=float) / np.asarray(P1_abs, dtype=float)
+    critica = razao_critica(beta, kappa)
+    forma = np.broadcast_shapes(np.shape(alvo), np.shape(critica))
+    alvo = np.broadcast_to(alvo, forma)
+    baixo, alto = np.broadcast_to(critica, forma).copy(), np.ones(forma)
+
+    def funcao(tau):
+        return (1 - tau) * expansibilidade(tau, beta, kappa) ** 2
+
+    bloqueada = funcao(baixo) < alvo
+    for _ in range(ITERACOES_BISSECCAO):
+        tau = 0.5 * (baixo + alto)
+        # (1 − τ)ε² cresce quando τ diminui (ramo subsônico)
+        acima = funcao(tau) < alvo
+        baixo, alto = np.where(acima, baixo, tau), np.where(acima, tau, alto)
+    return np.where(bloqueada, np.nan, 0.5 * (baixo + alto))[()]
+
+
+def estado_garganta(Q, rho1, D1, D2, P1, gas, k_entrada=0.0):
+    """
+    Estado isentrópico na garganta para a vazão volumétrica Q na entrada.
+
+    Args:
+        Q: Vazão nas condições de entrada (m³/s)
+        rho1: Densidade na entrada (kg/m³)
+        P1: Pressão manométrica de entrada (Pa)
+        gas: EstadoGas
+        k_entrada: Coeficiente de perda da entrada (modo Realista)
+
+    Returns:
+        dict com tau, expansibilidade, delta_P (Pa), rho2, T2 (K), v2 (m/s),
+        Mach2 e mu2 (Pa·s)
+    """
+    A1 = np.pi * (np.asarray(D1) / 2) ** 2
+    A2 = np.pi * (np.asarray(D2) / 2) ** 2
+    P1_abs = P1 + P_ATMOSFERICA
+    kappa, T1 = gas.kappa, gas.T1
+
+    delta_P_inc = 0.5 * rho1 * ((Q / A2) ** 2 * (1 + k_entrada) - (Q / A1) ** 2)
+    tau = razao_pressoes(delta_P_inc, P1_abs, np.asarray(D2) / D1, kappa)
+    eps = expansibilidade(tau, np.asarray(D2) / D1, kappa)
+
+    rho2 = rho1 * tau ** (1 / kappa)
+    T2 = T1 * tau ** ((kappa - 1) / kappa)
+    v2 = rho1 * Q / (rho2 * A2)
+    # Constante do gás pela equação de estado na entrada
+    R = P1_abs / (rho1 * T1)
+    with np.errstate(invalid='ignore'):
+        Mach2 = v2 / np.sqrt(kappa * R * T2)
+    validos = np.isfinite(T2)
+    mu2 = np.full(np.shape(T2), np.nan)
+    if np.any(validos):
+        mu2[validos] = gas.viscosidade(np.asarray(T2)[validos], np.asarray(P1_abs * tau)[validos])
+    return {
+        'tau': tau, 'expansibilidade': eps, 'delta_P': P1_abs * (1 - tau),
+        'rho2': rho2, 'T2': T2, 'v2': v2, 'Mach2': Mach2, 'mu2': mu2[()],
+    }
@@ -0,0 +1,211 @@
+"""
+Curvas de calibração Q(Δh) pré-calculadas por medidor instalado.
+
+Para um medidor fixo (geometria, fluido, material), converter Δh em Q é
+sempre a mesma função monótona de Δh e da temperatura. A curva é gerada
+uma vez com o modelo Realista completo (`simular_lote`, inclusive o modo
+compressível de gases), em uma grade geométrica de vazões para cada
+temperatura da faixa, e gravada em disco; cada leitura passa a ser uma
+busca binária vetorizada (`searchsorted`) e uma interpolação.
+
+A interpolação é linear em (log Δh, log Q), exata para Δh ∝ Q², e linear
+em T entre as linhas da grade. O erro é medido na construção contra a
+simulação direta nos pontos médios das células (vazões e temperaturas
+intermediárias), onde a interpolação é pior, e fica em `erro_maximo`.
+Leituras fora da faixa de Δh ou de temperatura da curva resultam em NaN.
+
+Uso:
+
+    python -m app_modules.curvas curva.npz --D1 0.1 --D2 0.05 --T-min 10 --T-max 40
+"""
+import argparse
+import json
+
+import numpy as np
+
+from app_modules.atrito import obter_rugosidade_material
+from app_modules.compressivel import P_ATMOSFERICA, estado_gas
+from app_modules.fluidos import eh_gas, propriedades_interpoladas
+from app_modules.lote import simular_lote
+from app_modules.simulator import (
+    ANGULO_CONVERGENTE, ANGULO_DIVERGENTE, COEFICIENTES_PADRAO, CoeficientesPerda,
+)
+
+
+FORMATO = 1
+
+PONTOS_VAZAO = 2049
+PASSO_TEMPERATURA = 1.0     # K, alinhado aos °C inteiros
+
+
+class CurvaCalibracao:
+    """
+    Tabela Q(Δh, T) de um medidor.
+
+    Atributos: `medidor` (dict com a configuração usada na construção),
+    `temperaturas` (K), `Q` (m³/s, grade geométrica), `delta_h` (m, uma linha
+    por temperatura, crescente em Q) e `erro_maximo` (erro relativo máximo em
+    Q contra a simulação direta).
+    """
+
+    def __init__(self, medidor, temperaturas, Q, delta_h, erro_maximo=np.nan):
+        self.medidor = medidor
+        self.temperaturas = np.asarray(temperaturas, dtype=float)
+        self.Q = np.asarray(Q, dtype=float)
+        self.delta_h = np.asarray(delta_h, dtype=float)
+        self.erro_maximo = erro_maximo
+
+        self._log_Q = np.log(self.Q)
+        log_delta_h = np.log(self.delta_h)
+        # Linhas concatenadas com deslocamento crescente: uma única busca
+        # binária (global e ordenada) atende leituras de temperaturas diferentes
+        self._deslocamento = float(log_delta_h.max() - log_delta_h.min()) + 1.0
+        self._linhas = np.arange(len(self.temperaturas))[:, None] * self._deslocamento
+        self._log_delta_h = log_delta_h
+        self._busca = (log_delta_h + self._linhas).ravel()
+
+    def _vazao_na_linha(self, linha, log_delta_h):
+        """log Q na linha de temperatura `linha` (array de índices)."""
+        n = len(self.Q)
+        alvo = log_delta_h + linha * self._deslocamento
+        j = np.searchsorted(self._busca, alvo) - linha * n
+        j = np.clip(j, 1, n - 1)
+        x0, x1 = self._log_delta_h[linha, j - 1], self._log_delta_h[linha, j]
+        t = (log_delta_h - x0) / (x1 - x0)
+        fora = (log_delta_h < self._log_delta_h[linha, 0]) | (log_delta_h > self._log_delta_h[linha, -1])
+        return np.where(fora, np.nan, self._log_Q[j - 1] + t * (self._log_Q[j] - self._log_Q[j - 1]))
+
+    def vazao(self, delta_h, T=None):
+        """
+        Q (m³/s) para as leituras Δh (m) nas temperaturas T (K), vetorizado.
+
+        Sem T, usa a única temperatura da curva (curvas de uma temperatura).
+        """
+        if T is None:
+            if len(self.temperaturas) != 1:
+                raise ValueError("Informe T: a curva cobre uma faixa de temperaturas.")
+            T = self.temperaturas[0]
+        delta_h, T = np.broadcast_arrays(np.asarray(delta_h, dtype=float), np.asarray(T, dtype=float))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_delta_h = np.log(delta_h)
+
+        if len(self.temperaturas) == 1:
+            fora_T = ~np.isclose(T, self.temperaturas[0])
+            log_Q = self._vazao_na_linha(np.zeros(T.shape, dtype=np.intp), log_delta_h)
+        else:
+            posicao = np.interp(T, self.temperaturas, np.arange(len(self.temperaturas)))
+            i = np.minimum(posicao.astype(np.intp), len(self.temperaturas) - 2)
+            w = posicao - i
+            fora_T = (T < self.temperaturas[0]) | (T > self.temperaturas[-1])
+            log_Q = ((1 - w) * self._vazao_na_linha(i, log_delta_h)
+                     + w * self._vazao_na_linha(i + 1, log_delta_h))
+        return np.where(fora_T | ~np.isfinite(log_delta_h), np.nan, np.exp(log_Q))[()]
+
+    def salvar(self, caminho):
+        """Grava a curva em um .npz (configuração do medidor em JSON)."""
+        np.savez_compressed(caminho, formato=FORMATO, medidor=json.dumps(self.medidor),
+                            temperaturas=self.temperaturas, Q=self.Q, delta_h=self.delta_h,
+                            erro_maximo=self.erro_maximo)
+
+
+def carregar_curva(caminho):
+    """Lê uma curva gravada por `CurvaCalibracao.salvar`."""
+    with np.load(caminho) as dados:
+        if int(dados['formato']) != FORMATO:
+            raise ValueError(f"Formato de curva não suportado: {int(dados['formato'])}")
+        return CurvaCalibracao(json.loads(str(dados['medidor'])), dados['temperaturas'], dados['Q'],
+                               dados['delta_h'], float(dados['erro_maximo']))
+
+
+def _simular_delta_h(medidor, T, Q):
+    """Δh (m) do modelo completo para temperaturas T (K) × vazões Q (broadcast)."""
+    P1 = medidor['P1']
+    rho, mu = propriedades_interpoladas(medidor['fluido'], T, P1 + P_ATMOSFERICA,
+                                        passo=PASSO_TEMPERATURA, origem=273.15)
+    gas = estado_gas(medidor['fluido'], T, P1) if medidor['compressivel'] else None
+    resultado = simular_lote(
+        medidor['D1'], medidor['D2'], medidor['L'], Q, rho, mu,
+        obter_rugosidade_material(medidor['material']), rho_m=medidor['rho_m'], mode=medidor['mode'],
+        P1=P1, angulo_convergente=medidor['angulo_convergente'],
+        angulo_divergente=medidor['angulo_divergente'],
+        coeficientes=CoeficientesPerda(**medidor['coeficientes']), gas=gas,
+    )
+    return resultado['delta_h']
+
+
+def construir_curva(D1, D2, L, Q_min, Q_max, fluido='water', T_min=20.0, T_max=None,
+                    material='Steel, commercial', rho_m=13600.0, P1=0.0, mode='Realista',
+                    angulo_convergente=ANGULO_CONVERGENTE, angulo_divergente=ANGULO_DIVERGENTE,
+                    coeficientes=COEFICIENTES_PADRAO, compressivel=None, pontos=PONTOS_VAZAO):
+    """
+    Gera a curva Q(Δh) de um medidor na faixa de temperaturas [T_min, T_max].
+
+    Args:
+        D1, D2, L: Geometria (m)
+        Q_min, Q_max: Faixa de vazões da curva (m³/s)
+        fluido, material, rho_m, P1, mode, ângulos, coeficientes: como na interface
+        T_min, T_max: Faixa de temperaturas (°C); sem T_max, curva de uma temperatura
+        compressivel: Modo compressível; por padrão, ativo para gases
+        pontos: Número de vazões por temperatura
+
+    Returns:
+        CurvaCalibracao com `erro_maximo` medido nos pontos médios das células;
+        vazões acima do bloqueio de um gás são excluídas da curva
+    """
+    T_max = T_min if T_max is None else T_max
+    medidor = {
+        'D1': float(D1), 'D2': float(D2), 'L': float(L), 'fluido': fluido, 'material': material,
+        'rho_m': float(rho_m), 'P1': float(P1), 'mode': mode,
+        'angulo_convergente': float(angulo_convergente), 'angulo_divergente': float(angulo_divergente),
+        'coeficientes': {'k_entrada': coeficientes.k_entrada, 'fator_difusor': coeficientes.fator_difusor},
+        'compressivel': eh_gas(fluido) if compressivel is None else bool(compressivel),
+    }
+
+    n_T = max(int(round((T_max - T_min) / PASSO_TEMPERATURA)), 0) + 1
+    temperaturas = np.linspace(T_min, T_max, n_T) + 273.15
+    Q = np.geomspace(Q_min, Q_max, pontos)
+    delta_h = _simular_delta_h(medidor, temperaturas[:, None], Q[None, :])
+
+    # Gases: a curva termina na maior vazão sem bloqueio em toda a faixa
+    validas = np.all(np.isfinite(delta_h), axis=0)
+    if not validas[0]:
+        raise ValueError("Q_min bloqueia a garganta (ou Δh não é finito) na faixa de temperaturas.")
+    n_Q = int(np.argmin(validas)) if not validas.all() else pontos
+    curva = CurvaCalibracao(medidor, temperaturas, Q[:n_Q], delta_h[:, :n_Q])
+
+    # Verificação: simulação direta no centro das células (Q e T intermediários)
+    Q_medio = np.sqrt(curva.Q[1:] * curva.Q[:-1])
+    T_medio = 0.5 * (temperaturas[1:] + temperaturas[:-1]) if n_T > 1 else temperaturas
+    delta_h_medio = _simular_delta_h(medidor, T_medio[:, None], Q_medio[None, :])
+    erro = np.abs(curva.vazao(delta_h_medio, T_medio[:, None]) / Q_medio - 1)
+    curva.erro_maximo = float(np.nanmax(erro))
+    return curva
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera a curva de calibração Q(Δh) de um medidor.")
+    parser.add_argument('saida', help="Arquivo .npz da curva")
+    parser.add_argument('--D1', type=float, required=True)
+    parser.add_argument('--D2', type=float, required=True)
+    parser.add_argument('--L', type=float, default=1.0)
+    parser.add_argument('--Q-min', type=float, default=0.001)
+    parser.add_argument('--Q-max', type=float, default=0.05)
+    parser.add_argument('--fluido', default='water')
+    parser.add_argument('--T-min', type=float, default=20.0, help="°C")
+    parser.add_argument('--T-max', type=float, default=None, help="°C")
+    parser.add_argument('--material', default='Steel, commercial')
+    parser.add_argument('--rho-m', type=float, default=13600.0)
+    parser.add_argument('--P1', type=float, default=0.0)
+    parser.add_argument('--modo', default='Realista', choices=('Ideal', 'Realista'))
+    args = parser.parse_args()
+
+    curva = construir_curva(args.D1, args.D2, args.L, args.Q_min, args.Q_max, fluido=args.fluido,
+                            T_min=args.T_min, T_max=args.T_max, material=args.material,
+                            rho_m=args.rho_m, P1=args.P1, mode=args.modo)
+    curva.salvar(args.saida)
+    print(f"{len(curva.temperaturas)} temperaturas × {len(curva.Q)} vazões gravadas em {args.saida}; "
+          f"erro máximo {curva.erro_maximo:.2e} (relativo em Q)")
+
+
+if __name__ == '__main__':
+    main()
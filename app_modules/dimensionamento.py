@@ -0,0 +1,185 @@
+"""
+Dimensionamento inverso da garganta: D₂ para um Δh máximo desejado.
+
+Na especificação de um medidor conhecem-se a vazão máxima e o fundo de
+escala do manômetro; o D₂ que leva Q_max exatamente a Δh_max sai de uma
+busca de raiz com intervalo garantido, vetorizada sobre todas as linhas de
+um catálogo. Cada iteração passa por `simular_lote` (modelo Realista
+completo, com atrito e difusor), de modo que a perda permanente h_L do D₂
+encontrado vem junto e qualquer mudança no modelo vale também aqui.
+
+O intervalo é o da validação da interface, 1 < D₁/D₂ ≤ 2: Δh decresce com
+D₂, então um alvo acima do Δh de D₂ = D₁/2 exigiria garganta mais estreita
+que o permitido e um alvo abaixo do Δh de D₂ → D₁ não é atingível por
+nenhuma redução. Essas linhas ficam no extremo correspondente e são
+marcadas em `situacao`.
+"""
+import numpy as np
+import pandas as pd
+
+from app_modules.atrito import obter_rugosidade_material
+from app_modules.fluidos import propriedades_por_pressao
+from app_modules.lote import PADROES, simular_lote
+from app_modules.simulator import ANGULO_CONVERGENTE, ANGULO_DIVERGENTE, COEFICIENTES_PADRAO
+from app_modules.validacao import RAZAO_MAXIMA
+
+
+DIMENSIONADO = 0
+ALVO_ACIMA_DA_FAIXA = 1     # exigiria D₁/D₂ > 2; D₂ = D₁/2
+ALVO_ABAIXO_DA_FAIXA = 2    # exigiria D₂ ≥ D₁; D₂ no limite superior
+NAO_CONVERGIU = 4
+
+MENSAGENS_SITUACAO = {
+    ALVO_ACIMA_DA_FAIXA: "Δh alvo exige D₁/D₂ acima de 2.",
+    ALVO_ABAIXO_DA_FAIXA: "Δh alvo abaixo do obtido com D₂ próximo de D₁.",
+    NAO_CONVERGIU: "Busca de D₂ não convergiu.",
+}
+
+# Maior D₂ do intervalo, em fração de D₁ (D₂ = D₁ é rejeitado pela validação)
+FRACAO_D2_MAXIMA = 0.999
+
+COLUNAS_CATALOGO = ('D1', 'Q_max', 'delta_h_max')
+
+
+def dimensionar_garganta(D1, Q_max, delta_h_max, rho, mu, epsilon, L=1.0, rho_m=13600.0,
+                         mode='Realista', P1=0.0, angulo_convergente=ANGULO_CONVERGENTE,
+                         angulo_divergente=ANGULO_DIVERGENTE, coeficientes=COEFICIENTES_PADRAO,
+                         tol=1e-10, max_iter=50):
+    """
+    D₂ tal que Δh(Q_max) = Δh_max, vetorizado sobre as linhas.
+
+    Busca de raiz por falsa posição (variante de Illinois) em log D₂, com o
+    intervalo [D₁/2, 0.999·D₁] mantido em todas as iterações; em log, Δh é
+    quase uma reta (Δh ∝ D₂⁻⁴), e poucas iterações bastam. Só as linhas ainda
+    não convergidas são simuladas a cada passo.
+
+    Args:
+        D1, Q_max: Diâmetro de entrada (m) e vazão máxima (m³/s)
+        delta_h_max: Desnível desejado na vazão máxima (m de coluna manométrica)
+        rho, mu, epsilon, L, rho_m, P1, ângulos: como em `simular_lote`
+        tol: Tolerância relativa em D₂
+        max_iter: Limite de iterações
+
+    Returns:
+        ResultadoLote na vazão máxima com o D₂ encontrado, acrescido das
+        colunas `razao` (D₁/D₂) e `situacao` (DIMENSIONADO ou os motivos de
+        `MENSAGENS_SITUACAO`)
+    """
+    entradas = dict(L=L, rho=rho, mu=mu, epsilon=epsilon, rho_m=rho_m, P1=P1,
+                    angulo_convergente=angulo_convergente, angulo_divergente=angulo_divergente)
+    forma = np.broadcast_shapes(*(np.shape(x) for x in (D1, Q_max, delta_h_max, *entradas.values())))
+    D1, Q_max, alvo = (np.broadcast_to(np.asarray(x, dtype=float), forma).ravel()
+                       for x in (D1, Q_max, delta_h_max))
+    entradas = {nome: np.broadcast_to(np.asarray(valor, dtype=float), forma).ravel()
+                for nome, valor in entradas.items()}
+
+    def residuo(indices, D2):
+        """log(Δh/Δh_max) das linhas `indices` com gargantas D2."""
+        resultado = simular_lote(D1[indices], D2, Q=Q_max[indices], mode=mode, coeficientes=coeficientes,
+                                 **{nome: valor[indices] for nome, valor in entradas.items()})
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.log(resultado['delta_h'] / alvo[indices])
+
+    def diametro(indices, x):
+        """D₂ = exp(x) limitado à faixa exata: o arredondamento de exp(log(D₁/2))
+        daria D₁/D₂ ligeiramente acima de 2, rejeitado por `validar`."""
+        return np.clip(np.exp(x), D1[indices] / RAZAO_MAXIMA, FRACAO_D2_MAXIMA * D1[indices])
+
+    todos = np.arange(D1.size)
+    a, b = np.log(D1 / RAZAO_MAXIMA), np.log(FRACAO_D2_MAXIMA * D1)
+    ra, rb = residuo(todos, D1 / RAZAO_MAXIMA), residuo(todos, FRACAO_D2_MAXIMA * D1)
+
+    situacao = np.full(D1.size, NAO_CONVERGIU, dtype=np.uint8)
+    situacao[ra < 0] = ALVO_ACIMA_DA_FAIXA
+    situacao[rb > 0] = ALVO_ABAIXO_DA_FAIXA
+    x = np.where(ra < 0, a, b)
+
+    ativos = np.flatnonzero((ra >= 0) & (rb <= 0))
+    lado = np.zeros(D1.size, dtype=np.int8)     # último extremo mantido (Illinois)
+    for _ in range(max_iter):
+        if not ativos.size:
+            break
+        ia, ib, fa, fb = a[ativos], b[ativos], ra[ativos], rb[ativos]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            novo = np.where(fa != fb, ib - fb * (ib - ia) / (fb - fa), 0.5 * (ia + ib))
+        novo = np.clip(novo, ia, ib)
+        r = residuo(ativos, diametro(ativos, novo))
+
+        # Raiz entre a e novo: novo vira b; caso contrário, vira a. O extremo
+        # que fica parado duas vezes seguidas tem o resíduo reduzido à metade
+        esquerda = r < 0
+        b[ativos] = np.where(esquerda, novo, ib)
+        rb[ativos] = np.where(esquerda, r, fb)
+        a[ativos] = np.where(esquerda, ia, novo)
+        ra[ativos] = np.where(esquerda, fa, r)
+        repetido = lado[ativos] == np.where(esquerda, 1, -1)
+        ra[ativos] = np.where(esquerda & repetido, 0.5 * ra[ativos], ra[ativos])
+        rb[ativos] = np.where(~esquerda & repetido, 0.5 * rb[ativos], rb[ativos])
+        lado[ativos] = np.where(esquerda, 1, -1)
+
+        x[ativos] = novo
+        convergiu = (np.abs(r) < tol) | (b[ativos] - a[ativos] < tol)
+        situacao[ativos[convergiu]] = DIMENSIONADO
+        ativos = ativos[~convergiu]
+
+    D2 = diametro(todos, x)
+    resultado = simular_lote(D1, D2, Q=Q_max, mode=mode, coeficientes=coeficientes, **entradas)
+    resultado.entradas['delta_h_max'] = alvo
+    resultado.saidas['razao'] = D1 / D2
+    resultado.saidas['situacao'] = situacao
+    for colecao in (resultado.entradas, resultado.saidas):
+        for nome, valor in colecao.items():
+            if np.ndim(valor):
+                colecao[nome] = valor.reshape(forma)
+    return resultado
+
+
+def dimensionar_catalogo(tabela, mode='Realista', tol=1e-10, max_iter=50):
+    """
+    Dimensiona cada linha de um catálogo (DataFrame) de medidores.
+
+    Colunas obrigatórias: D1, Q_max, delta_h_max (m). Opcionais como nos
+    relatórios (`fluido`, `T_C`, `P1`, `rho_m`, `material`, ângulos, com os
+    padrões de `lote.PADROES`) e `L` (1 m). As propriedades vêm da grade de
+    temperatura por fluido e P₁ distinto, como em `simular_dataframe`.
+
+    Returns:
+        DataFrame indexado como a entrada com D2, razao, delta_h, h_L, v2, Re,
+        status (validação) e situacao
+    """
+    faltando = [nome for nome in COLUNAS_CATALOGO if nome not in tabela.columns]
+    if faltando:
+        raise ValueError(f"Colunas ausentes: {faltando}")
+
+    n = len(tabela)
+
+    def coluna(nome, padrao):
+        if nome in tabela.columns:
+            return tabela[nome].fillna(padrao).to_numpy(dtype=float)
+        return np.full(n, padrao, dtype=float)
+
+    T = coluna('T_C', PADROES['T_C']) + 273.15
+    P1 = coluna('P1', PADROES['P1'])
+    rho, mu = np.empty(n), np.empty(n)
+    codigos, fluidos = pd.factorize(tabela['fluido'].fillna(PADROES['fluido']) if 'fluido' in tabela.columns
+                                    else pd.Series([PADROES['fluido']] * n))
+    for codigo, fluido in enumerate(fluidos):
+        sel = codigos == codigo
+        rho[sel], mu[sel] = propriedades_por_pressao(fluido, T[sel], P1[sel] + 101325.0, origem=273.15)
+
+    if 'material' in tabela.columns:
+        codigos, materiais = pd.factorize(tabela['material'].fillna(PADROES['material']))
+        epsilon = np.array([obter_rugosidade_material(m) for m in materiais])[codigos]
+    else:
+        epsilon = obter_rugosidade_material(PADROES['material'])
+
+    resultado = dimensionar_garganta(
+        coluna('D1', np.nan), coluna('Q_max', np.nan), coluna('delta_h_max', np.nan), rho, mu, epsilon,
+        L=coluna('L', 1.0), rho_m=coluna('rho_m', PADROES['rho_m']), mode=mode, P1=P1,
+        angulo_convergente=coluna('angulo_convergente', PADROES['angulo_convergente']),
+        angulo_divergente=coluna('angulo_divergente', PADROES['angulo_divergente']),
+        tol=tol, max_iter=max_iter,
+    )
+    dados = {'D2': resultado['D2']}
+    dados.update({nome: resultado[nome] for nome in ('razao', 'delta_h', 'h_L', 'v2', 'Re', 'status', 'situacao')})
+    return pd.DataFrame(dados, index=tabela.index)
@@ -0,0 +1,296 @@
+import numpy as np
+from thermo import Chemical, Mixture
+
+
+FLUIDOS = {
+    "Água": "water",
+    "Ar": "air",
+    "Etanol": "ethanol",
+    "Glicerina": "glycerol",
+    "Óleo de Motor (n-Octano)": "n-octane"
+}
+
+# Misturas são identificadas por texto canônico (ver `identificador_mistura`),
+# de modo que cache, snapshot, lotes e CSVs as tratam como qualquer fluido
+PREFIXO_MISTURA = 'mistura:'
+BASES_FRACAO = {'massa': 'ws', 'molar': 'zs'}
+
+# Componentes oferecidos para misturas personalizadas
+COMPONENTES_MISTURA = {
+    "Água": "water",
+    "Etanol": "ethanol",
+    "Metanol": "methanol",
+    "Etilenoglicol": "ethylene glycol",
+    "Propilenoglicol": "propylene glycol",
+    "Glicerina": "glycerol",
+}
+
+MISTURAS = {
+    "Água-Etilenoglicol 50% (massa)": f"{PREFIXO_MISTURA}massa:ethylene glycol=0.5;water=0.5",
+    "Água-Etanol 40% (massa)": f"{PREFIXO_MISTURA}massa:ethanol=0.4;water=0.6",
+}
+
+# Cache de propriedades por (fluido, T, P); construir objetos do thermo é caro
+_cache_propriedades = {}
+
+# Cache de pressão de vapor por (fluido, T)
+_cache_pressao_vapor = {}
+
+# Fluidos tratados como gás (modo compressível disponível)
+GASES = frozenset({'air'})
+
+# Cache do expoente isentrópico por (fluido, T, P)
+_cache_expoente = {}
+
+
+def identificador_mistura(componentes, fracoes, base='massa'):
+    """
+    Identificador canônico de uma mistura definida pela composição.
+
+    Frações são normalizadas (soma 1) e arredondadas a 1e-6; componentes são
+    ordenados, então a mesma composição sempre gera o mesmo identificador
+    (e reaproveita o cache).
+
+    Args:
+        componentes: Identificadores do thermo (ex.: ['water', 'ethylene glycol'])
+        fracoes: Frações (ou proporções) de cada componente
+        base: 'massa' ou 'molar'
+
+    Returns:
+        Texto no formato 'mistura:<base>:<componente>=<fração>;...'
+    """
+    if base not in BASES_FRACAO:
+        raise ValueError(f"Base de fração desconhecida: {base}")
+    if len(componentes) != len(fracoes) or not componentes:
+        raise ValueError("Informe uma fração para cada componente.")
+    fracoes = np.asarray(fracoes, dtype=float)
+    if np.any(fracoes < 0) or fracoes.sum() <= 0:
+        raise ValueError("As frações devem ser não negativas e somar mais que zero.")
+
+    fracoes = fracoes / fracoes.sum()
+    pares = sorted((str(c).strip(), round(float(x), 6)) for c, x in zip(componentes, fracoes) if x > 0)
+    return PREFIXO_MISTURA + base + ':' + ';'.join(f'{c}={x:g}' for c, x in pares)
+
+
+def interpretar_mistura(fluido_quimico):
+    """(componentes, frações, base) de um identificador de mistura."""
+    base, composicao = fluido_quimico[len(PREFIXO_MISTURA):].split(':', 1)
+    pares = [item.rsplit('=', 1) for item in composicao.split(';')]
+    return [c for c, _ in pares], [float(x) for _, x in pares], base
+
+
+def eh_mistura(fluido_quimico):
+    return isinstance(fluido_quimico, str) and fluido_quimico.startswith(PREFIXO_MISTURA)
+
+
+def eh_gas(fluido_quimico):
+    return fluido_quimico in GASES
+
+
+def _calcular_propriedades(fluido_quimico, T, P):
+    if fluido_quimico == 'air':
+        fluido = Mixture('air', T=T, P=P)
+    elif eh_mistura(fluido_quimico):
+        componentes, fracoes, base = interpretar_mistura(fluido_quimico)
+        fluido = Mixture(componentes, T=T, P=P, **{BASES_FRACAO[base]: fracoes})
+        if fluido.phase not in ('l', 'g'):
+            # Região bifásica: sem ρ e μ únicos
+            return None, None
+    else:
+        fluido = Chemical(fluido_quimico, T=T, P=P)
+    return fluido.rho, fluido.mu
+
+
+def propriedades_fluido(fluido_quimico, T, P=101325.0):
+    """
+    Retorna massa específica e viscosidade dinâmica do fluido.
+
+    Args:
+        fluido_quimico: Identificador do thermo (ex.: 'water', 'air') ou de
+            mistura (`identificador_mistura`)
+        T: Temperatura (K)
+        P: Pressão absoluta (Pa)
+
+    Returns:
+        (rho, mu): kg/m³ e Pa·s (None quando o thermo não consegue avaliar)
+    """
+    chave = (fluido_quimico, round(float(T), 6), round(float(P), 3))
+    if chave not in _cache_propriedades:
+        _cache_propriedades[chave] = _calcular_propriedades(fluido_quimico, chave[1], chave[2])
+    return _cache_propriedades[chave]
+
+
+def _grade_temperaturas(T, passo, origem):
+    """Pontos origem + k·passo dentro da faixa de T, mais os extremos dos dados."""
+    T_min, T_max = np.min(T), np.max(T)
+    internos = np.arange(np.ceil((T_min - origem) / passo), np.floor((T_max - origem) / passo) + 1) * passo + origem
+    return np.unique(np.concatenate([[T_min], internos, [T_max]]))
+
+
+def propriedades_interpoladas(fluido_quimico, T, P=101325.0, passo=1.0, origem=0.0):
+    """
+    Propriedades vetorizadas para arrays de temperatura.
+
+    Avalia o thermo apenas em uma grade regular (passo em K) que cobre os
+    dados e interpola linearmente; os pontos da grade ficam no cache de
+    `propriedades_fluido`, então séries longas custam poucas chamadas.
+
+    Args:
+        fluido_quimico: Identificador do thermo
+        T: Temperaturas (K), escalar ou array
+        P: Pressão absoluta (Pa), única para todo o array
+        passo: Espaçamento da grade de temperatura (K)
+        origem: Deslocamento da grade (K); 273.15 alinha a grade aos °C
+            inteiros, que então são avaliados exatamente
+
+    Returns:
+        (rho, mu): arrays com o formato de T; NaN onde o thermo não avalia
+    """
+    T = np.asarray(T, dtype=float)
+    grade = _grade_temperaturas(T, passo, origem)
+
+    tabela = np.array([propriedades_fluido(fluido_quimico, t, P) for t in grade], dtype=float)
+
+    rho = np.interp(T, grade, tabela[:, 0])
+    mu = np.interp(T, grade, tabela[:, 1])
+    return rho[()], mu[()]
+
+
+def propriedades_por_pressao(fluido_quimico, T, P=101325.0, passo=1.0, origem=0.0, passo_pressao=None):
+    """
+    `propriedades_interpoladas` com pressões diferentes por ponto.
+
+    Os pontos são agrupados por pressão distinta e cada grupo usa a grade de
+    temperatura na sua pressão (gases dependem de P; uma média de P do lote
+    mudaria os resultados com o tamanho do lote). Pressões contínuas
+    (amostras sorteadas) usam `passo_pressao`: interpolação linear entre os
+    múltiplos de `passo_pressao` vizinhos, com poucos grupos por lote.
+
+    Args:
+        T: Temperaturas (K), escalar ou array
+        P: Pressões absolutas (Pa), escalar ou array (broadcast com T)
+        passo_pressao: Espaçamento da grade de pressão (Pa); None agrupa por
+            pressão exata
+
+    Returns:
+        (rho, mu): arrays com o formato do broadcast de T e P
+    """
+    P = np.asarray(P, dtype=float)
+    if P.ndim == 0 or np.all(P == P.flat[0]):
+        rho, mu = propriedades_interpoladas(fluido_quimico, T, float(P.flat[0]), passo, origem)
+        forma = np.broadcast_shapes(np.shape(T), P.shape)
+        return np.broadcast_to(rho, forma).copy()[()], np.broadcast_to(mu, forma).copy()[()]
+
+    T, P = np.broadcast_arrays(np.asarray(T, dtype=float), P)
+    rho, mu = np.empty(T.shape), np.empty(T.shape)
+    if passo_pressao is None:
+        pressoes, grupos = np.unique(P, return_inverse=True)
+        grupos = grupos.reshape(T.shape)
+        for i, pressao in enumerate(pressoes):
+            sel = grupos == i
+            rho[sel], mu[sel] = propriedades_interpoladas(fluido_quimico, T[sel], float(pressao), passo, origem)
+        return rho, mu
+
+    # Grade fixa em T (nós origem + k·passo que cobrem o grupo, sem os
+    # extremos dos dados) e em P: cada ponto depende só dos nós vizinhos,
+    # não dos demais pontos do lote, e os nós ficam no cache
+    posicao = P / passo_pressao
+    nos = np.floor(posicao)
+    for no in np.unique(nos):
+        sel = nos == no
+        T_sel, w = T[sel], posicao[sel] - no
+        grade = np.arange(np.floor((T_sel.min() - origem) / passo),
+                          np.ceil((T_sel.max() - origem) / passo) + 1) * passo + origem
+        tabelas = [np.array([propriedades_fluido(fluido_quimico, t, pressao) for t in grade], dtype=float)
+                   for pressao in (no * passo_pressao, (no + 1) * passo_pressao)]
+        rho0, rho1 = (np.interp(T_sel, grade, tabela[:, 0]) for tabela in tabelas)
+        mu0, mu1 = (np.interp(T_sel, grade, tabela[:, 1]) for tabela in tabelas)
+        rho[sel] = rho0 + w * (rho1 - rho0)
+        mu[sel] = mu0 + w * (mu1 - mu0)
+    return rho, mu
+
+
+def pre_calcular_tabela(fluido_quimico, temperaturas_C=range(0, 101), P=101325.0):
+    """
+    Tabela densa de propriedades para uma composição fixa, gravada no cache.
+
+    Depois dela, cada reexecução com uma temperatura da tabela é só uma
+    consulta ao dicionário, mesmo para misturas (cujo thermo é o mais caro).
+
+    Args:
+        fluido_quimico: Identificador do fluido ou da mistura
+        temperaturas_C: Temperaturas (°C), as mesmas do slider da interface
+        P: Pressão absoluta (Pa)
+
+    Returns:
+        (T_C, rho, mu): arrays; NaN onde o thermo não avalia
+    """
+    T_C = np.asarray(list(temperaturas_C), dtype=float)
+    tabela = np.full((len(T_C), 2), np.nan)
+    for i, t in enumerate(T_C):
+        try:
+            rho, mu = propriedades_fluido(fluido_quimico, t + 273.15, P)
+        except Exception:
+            continue
+        if rho is not None and mu is not None:
+            tabela[i] = rho, mu
+    return T_C, tabela[:, 0], tabela[:, 1]
+
+
+def _calcular_pressao_vapor(fluido_quimico, T):
+    if fluido_quimico == 'air':
+        # Gás: sem pressão de vapor (e sem cavitação)
+        return None
+    if eh_mistura(fluido_quimico):
+        componentes, fracoes, base = interpretar_mistura(fluido_quimico)
+        return Mixture(componentes, T=T, P=101325.0, **{BASES_FRACAO[base]: fracoes}).Pbubble
+    return Chemical(fluido_quimico, T=T).Psat
+
+
+def pressao_vapor(fluido_quimico, T):
+    """
+    Pressão de vapor (Pa) do fluido; pressão de bolha para misturas.
+
+    Args:
+        fluido_quimico: Identificador do thermo ou de mistura
+        T: Temperatura (K)
+
+    Returns:
+        Pa, ou None para gases e quando o thermo não consegue avaliar
+    """
+    chave = (fluido_quimico, round(float(T), 6))
+    if chave not in _cache_pressao_vapor:
+        try:
+            _cache_pressao_vapor[chave] = _calcular_pressao_vapor(fluido_quimico, chave[1])
+        except Exception:
+            _cache_pressao_vapor[chave] = None
+    return _cache_pressao_vapor[chave]
+
+
+def pressao_vapor_interpolada(fluido_quimico, T, passo=1.0, origem=0.0):
+    """
+    Pressão de vapor vetorizada, na mesma grade de `propriedades_interpoladas`.
+
+    A interpolação é feita em log(Psat), quase linear em T dentro de um
+    passo; NaN onde não há pressão de vapor (gases).
+    """
+    T = np.asarray(T, dtype=float)
+    grade = _grade_temperaturas(T, passo, origem)
+    tabela = np.array([pressao_vapor(fluido_quimico, t) for t in grade], dtype=float)
+    with np.errstate(divide='ignore'):
+        return np.exp(np.interp(T, grade, np.log(tabela)))[()]
+
+
+def expoente_isentropico(fluido_quimico, T, P=101325.0):
+    """
+    Expoente isentrópico κ = Cp/Cv de um gás (cache por (fluido, T, P)).
+
+    Args:
+        fluido_quimico: Identificador do thermo de um gás (`GASES`)
+        T: Temperatura (K)
+        P: Pressão absoluta (Pa)
+    """
+    chave = (fluido_quimico, round(float(T), 6), round(float(P), 3))
+    if chave not in _cache_expoente:
+        _cache_expoente[chave] = Mixture(fluido_quimico, T=chave[1], P=chave[2]).isentropic_exponent
+    return _cache_expoente[chave]
@@ -0,0 +1,268 @@
+"""
+Histórico de telemetria de um medidor: Q, P₂ (fim) e perda ao longo do tempo.
+
+Leituras de Δh e T (semanas de dados de um historiador de planta) são
+convertidas em vazão pela inversa fechada do modelo (`vazao_de_desnivel`) e
+simuladas em lote para P₂ no fim da garganta e a perda permanente hₗ. O
+cálculo é incremental: `acrescentar` processa só as leituras posteriores à
+última já conhecida, de modo que reenviar uma exportação que cresceu custa
+apenas as linhas novas.
+
+As somas acumuladas (valor, quadrado e volume por trapézios) são mantidas
+junto com as séries; média, desvio e volume de qualquer janela saem em O(1)
+por busca binária nos tempos. Para exibir a janela, a série é reduzida à
+resolução da tela pelo algoritmo LTTB (largest-triangle-three-buckets),
+que preserva picos e vales que uma média por blocos apagaria.
+"""
+import numpy as np
+import pandas as pd
+
+from app_modules.atrito import obter_rugosidade_material
+from app_modules.fluidos import propriedades_interpoladas
+from app_modules.lote import simular_lote
+from app_modules.simulator import vazao_de_desnivel
+
+
+COLUNAS_TELEMETRIA = ('tempo', 'delta_h', 'T_C')
+SERIES = ('Q', 'P2_fim', 'h_L')
+
+# Parâmetros do medidor (os de `cenarios.PARAMETROS`, sem Q e T_C, que vêm da telemetria)
+PARAMETROS_MEDIDOR = ('mode', 'fluido', 'P1', 'D1', 'D2', 'L', 'rho_m', 'material',
+                      'angulo_convergente', 'angulo_divergente')
+
+# Pontos por série na tela (~ largura do gráfico em pixels)
+PONTOS_TELA = 1500
+
+CAPACIDADE_INICIAL = 4096
+
+
+def lttb(x, y, pontos):
+    """
+    Índices dos pontos escolhidos pelo LTTB (Steinarsson, 2013).
+
+    O primeiro e o último ponto são mantidos; os demais são divididos em
+    `pontos − 2` baldes, e de cada balde fica o ponto que forma o maior
+    triângulo com o ponto escolhido no balde anterior e a média do seguinte.
+
+    Args:
+        x: Abscissas crescentes (float)
+        y: Ordenadas finitas
+        pontos: Número de pontos desejado (≥ 3)
+
+    Returns:
+        Array de índices crescentes (todos os índices se len(x) ≤ pontos)
+    """
+    n = len(x)
+    if n <= pontos or pontos < 3:
+        return np.arange(n)
+
+    limites = np.linspace(1, n - 1, pontos - 1).astype(np.intp)
+    inicios, fins = limites[:-1], limites[1:]
+    # Médias de cada balde, usadas como terceiro vértice do balde anterior
+    contagens = fins - inicios
+    media_x = np.add.reduceat(x[1:n - 1], inicios - 1) / contagens
+    media_y = np.add.reduceat(y[1:n - 1], inicios - 1) / contagens
+    media_x = np.append(media_x[1:], x[-1])
+    media_y = np.append(media_y[1:], y[-1])
+
+    escolhidos = np.empty(pontos, dtype=np.intp)
+    escolhidos[0], escolhidos[-1] = 0, n - 1
+    anterior = 0
+    for k, (inicio, fim) in enumerate(zip(inicios, fins)):
+        xa, ya = x[anterior], y[anterior]
+        area = np.abs((xa - media_x[k]) * (y[inicio:fim] - ya) - (xa - x[inicio:fim]) * (media_y[k] - ya))
+        anterior = inicio + int(np.argmax(area))
+        escolhidos[k + 1] = anterior
+    return escolhidos
+
+
+class HistoricoMedidor:
+    """
+    Séries calculadas de um medidor, alimentadas incrementalmente.
+
+    `parametros` tem as chaves de `PARAMETROS_MEDIDOR`. Os tempos são
+    datetime64[ns] estritamente crescentes; leituras com tempo igual ou
+    anterior à última já processada são ignoradas por `acrescentar`.
+    """
+
+    def __init__(self, parametros):
+        self.parametros = dict(parametros)
+        self.n = 0
+        self._tempo = np.empty(CAPACIDADE_INICIAL, dtype='datetime64[ns]')
+        self._colunas = {nome: np.empty(CAPACIDADE_INICIAL) for nome in ('delta_h', 'T_C', 'status', *SERIES)}
+        # Somas acumuladas com um zero inicial: soma da janela [i, j) = S[j] − S[i]
+        self._somas = {nome: np.zeros(CAPACIDADE_INICIAL + 1) for nome in
+                       ('validos', 'volume', *SERIES, *(f'{s}²' for s in SERIES))}
+
+    def __len__(self):
+        return self.n
+
+    @property
+    def tempo(self):
+        return self._tempo[:self.n]
+
+    def __getitem__(self, nome):
+        return self._colunas[nome][:self.n]
+
+    @property
+    def ultimo_tempo(self):
+        return self._tempo[self.n - 1] if self.n else None
+
+    def _garantir_capacidade(self, n):
+        capacidade = len(self._tempo)
+        if n <= capacidade:
+            return
+        while capacidade < n:
+            capacidade *= 2
+        self._tempo = np.resize(self._tempo, capacidade)
+        self._colunas = {nome: np.resize(valor, capacidade) for nome, valor in self._colunas.items()}
+        self._somas = {nome: np.resize(valor, capacidade + 1) for nome, valor in self._somas.items()}
+
+    def _calcular(self, delta_h, T_C):
+        p = self.parametros
+        rho, mu = propriedades_interpoladas(p['fluido'], T_C + 273.15, p['P1'] + 101325.0, origem=273.15)
+        Q = vazao_de_desnivel(p['D1'], p['D2'], delta_h, rho, p['rho_m'], p['mode'])
+        resultado = simular_lote(p['D1'], p['D2'], p['L'], Q, rho, mu, obter_rugosidade_material(p['material']),
+                                 rho_m=p['rho_m'], mode=p['mode'], P1=p['P1'],
+                                 angulo_convergente=p['angulo_convergente'],
+                                 angulo_divergente=p['angulo_divergente'])
+        return {'Q': Q, 'P2_fim': resultado['P2_fim'], 'h_L': resultado['h_L'], 'status': resultado['status']}
+
+    def acrescentar(self, tempo, delta_h, T_C):
+        """
+        Processa as leituras posteriores à última conhecida.
+
+        Args:
+            tempo: Instantes (qualquer formato aceito por `pd.to_datetime`)
+            delta_h: Desníveis lidos (m)
+            T_C: Temperaturas (°C), escalar ou array
+
+        Returns:
+            Número de leituras novas processadas
+        """
+        tempo = pd.to_datetime(np.atleast_1d(tempo)).to_numpy(dtype='datetime64[ns]')
+        delta_h = np.broadcast_to(np.asarray(delta_h, dtype=float), tempo.shape)
+        T_C = np.broadcast_to(np.asarray(T_C, dtype=float), tempo.shape)
+
+        ordem = np.argsort(tempo, kind='stable')
+        tempo, delta_h, T_C = tempo[ordem], delta_h[ordem], T_C[ordem]
+        # Só o que é posterior ao último instante, sem repetições de tempo
+        novos = np.ones(tempo.shape, dtype=bool)
+        novos[1:] = tempo[1:] != tempo[:-1]
+        if self.n:
+            novos &= tempo > self.ultimo_tempo
+        tempo, delta_h, T_C = tempo[novos], delta_h[novos], T_C[novos]
+        m = len(tempo)
+        if not m:
+            return 0
+
+        calculado = self._calcular(delta_h, T_C)
+        i, j = self.n, self.n + m
+        self._garantir_capacidade(j)
+        self._tempo[i:j] = tempo
+        self._colunas['delta_h'][i:j] = delta_h
+        self._colunas['T_C'][i:j] = T_C
+        for nome, valor in calculado.items():
+            self._colunas[nome][i:j] = valor
+
+        # Somas acumuladas continuadas a partir da última
+        validos = np.isfinite(calculado['Q'])
+        incrementos = {'validos': validos.astype(float)}
+        for nome in SERIES:
+            valor = np.where(np.isfinite(calculado[nome]), calculado[nome], 0.0)
+            incrementos[nome] = valor
+            incrementos[f'{nome}²'] = valor ** 2
+        # Volume por trapézios entre leituras consecutivas (inclui a junção com o bloco anterior)
+        t = self._tempo[max(i - 1, 0):j].astype('int64') / 1e9
+        Q = np.nan_to_num(self._colunas['Q'][max(i - 1, 0):j])
+        trapezios = 0.5 * (Q[1:] + Q[:-1]) * np.diff(t)
+        incrementos['volume'] = trapezios if i else np.concatenate([[0.0], trapezios])
+        for nome, incremento in incrementos.items():
+            self._somas[nome][i + 1:j + 1] = self._somas[nome][i] + np.cumsum(incremento)
+        self.n = j
+        return m
+
+    def indices_janela(self, inicio=None, fim=None):
+        """Intervalo [i, j) das leituras com inicio ≤ tempo ≤ fim."""
+        i = 0 if inicio is None else int(np.searchsorted(self.tempo, np.datetime64(inicio, 'ns'), 'left'))
+        j = self.n if fim is None else int(np.searchsorted(self.tempo, np.datetime64(fim, 'ns'), 'right'))
+        return i, max(i, j)
+
+    def agregados(self, inicio=None, fim=None):
+        """
+        Estatísticas das séries na janela, a partir das somas acumuladas.
+
+        Returns:
+            DataFrame (linhas: `SERIES`) com media, desvio, minimo e maximo,
+            e um dict com n (leituras), validos e volume (m³, ∫Q dt)
+        """
+        i, j = self.indices_janela(inicio, fim)
+        S = self._somas
+        validos = S['validos'][j] - S['validos'][i]
+        linhas = {}
+        for nome in SERIES:
+            janela = self._colunas[nome][i:j]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                media = (S[nome][j] - S[nome][i]) / validos
+                variancia = (S[f'{nome}²'][j] - S[f'{nome}²'][i]) / validos - media ** 2
+            finitos = janela[np.isfinite(janela)]
+            linhas[nome] = {
+                'media': media,
+                'desvio': np.sqrt(max(variancia, 0.0)) if validos else np.nan,
+                'minimo': finitos.min() if finitos.size else np.nan,
+                'maximo': finitos.max() if finitos.size else np.nan,
+            }
+        # Volume entre a primeira e a última leitura da janela
+        volume = float(S['volume'][j] - S['volume'][i + 1]) if j > i else 0.0
+        return pd.DataFrame.from_dict(linhas, orient='index'), {'n': j - i, 'validos': int(validos),
+                                                                'volume': volume}
+
+    def serie(self, nome, inicio=None, fim=None, pontos=PONTOS_TELA):
+        """
+        Série `nome` na janela, reduzida por LTTB a no máximo `pontos`.
+
+        Returns:
+            (tempo datetime64[ns], valores), sem as leituras não finitas
+        """
+        i, j = self.indices_janela(inicio, fim)
+        tempo, valores = self.tempo[i:j], self._colunas[nome][i:j]
+        finitos = np.isfinite(valores)
+        if not finitos.all():
+            tempo, valores = tempo[finitos], valores[finitos]
+        escolhidos = lttb(tempo.astype('int64').astype(float), valores, pontos)
+        return tempo[escolhidos], valores[escolhidos]
+
+
+def ler_telemetria(arquivo, T_C_padrao=20.0):
+    """
+    Lê uma exportação CSV do historiador (colunas tempo, delta_h em m e,
+    opcionalmente, T_C em °C).
+
+    Returns:
+        (tempo, delta_h, T_C) como arrays
+    """
+    tabela = pd.read_csv(arquivo)
+    faltando = [nome for nome in ('tempo', 'delta_h') if nome not in tabela.columns]
+    if faltando:
+        raise ValueError(f"Colunas ausentes: {faltando}")
+    T_C = tabela['T_C'].fillna(T_C_padrao).to_numpy(dtype=float) if 'T_C' in tabela.columns else T_C_padrao
+    return pd.to_datetime(tabela['tempo']).to_numpy(), tabela['delta_h'].to_numpy(dtype=float), T_C
+
+
+def telemetria_exemplo(inicio, dias=1.0, intervalo_s=1.0, delta_h_medio=0.1, semente=0):
+    """
+    Telemetria sintética (ciclo diário de demanda e de temperatura com ruído)
+    para demonstrar a reprodução do histórico.
+
+    Returns:
+        (tempo, delta_h, T_C) com uma leitura a cada `intervalo_s`
+    """
+    rng = np.random.default_rng(semente)
+    n = int(dias * 86400 / intervalo_s)
+    inicio = np.datetime64(inicio, 'ns')
+    tempo = inicio + (np.arange(n) * intervalo_s * 1e9).astype('timedelta64[ns]')
+    horas = (tempo - tempo.astype('datetime64[D]')).astype('int64') / 3.6e12
+    demanda = 1 + 0.4 * np.sin(2 * np.pi * (horas - 8) / 24) + 0.05 * rng.standard_normal(n)
+    delta_h = delta_h_medio * np.clip(demanda, 0.05, None) ** 2
+    T_C = 20 + 5 * np.sin(2 * np.pi * (horas - 14) / 24) + 0.2 * rng.standard_normal(n)
+    return tempo, delta_h, T_C
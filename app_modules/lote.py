@@ -0,0 +1,195 @@
+"""
+Simulação vetorizada de lotes de pontos de operação.
+
+Reúne, para arrays de entradas, as mesmas etapas de `main()`: Reynolds na
+garganta, fator de atrito pela rugosidade do material e o `VenturiSimulator`.
+
+Modo compacto (`dtype=np.float32`): cálculo e armazenamento em precisão
+simples, com metade do tráfego de memória. Envelope de precisão medido por
+`verificar_precisao_compacta` contra o caminho float64, nas faixas da
+interface (D₁ 0.05–0.30 m, D₂ 0.02–0.15 m, 1 < D₁/D₂ ≤ 2, Q 0.001–0.05 m³/s,
+L 0.1–3 m, ângulos 5–45°, P₁ ±2 bar, ρ 700–1260 kg/m³, ρₘ 1500–20000 kg/m³),
+nos dois modos:
+
+    delta_h           erro relativo < 2e-5; absoluto < 1e-4 m (0.01 cm) para Δh < 100 m
+    h_L, delta_P      erro relativo < 2e-5
+    v1, v2, Re, f     erro relativo < 1e-6
+    P2, P2_fim, P3    erro absoluto < 5e-6·(|P₁| + ½ρv₂²)
+"""
+import numpy as np
+
+from app_modules.cavitacao import analisar_cavitacao
+from app_modules.simulator import (
+    ANGULO_CONVERGENTE,
+    ANGULO_DIVERGENTE,
+    COEFICIENTES_PADRAO,
+    VenturiSimulator,
+)
+from app_modules.validacao import validar
+
+
+# Valores das entradas opcionais de configurações (relatórios, DataFrames)
+PADROES = {
+    'mode': 'Realista',
+    'fluido': 'water',
+    'T_C': 20.0,
+    'P1': 0.0,
+    'rho_m': 13600.0,
+    'material': 'Steel, commercial',
+    'angulo_convergente': 15.0,
+    'angulo_divergente': 15.0,
+}
+
+COLUNAS_SAIDA = ('v1', 'v2', 'P2', 'P2_fim', 'P3', 'delta_P', 'delta_h', 'h_L', 'Re', 'f')
+
+# Colunas adicionais quando a pressão de vapor é informada
+COLUNAS_CAVITACAO = ('margem_cavitacao', 'sigma')
+
+# Envelope de precisão do modo compacto (ver docstring do módulo)
+ENVELOPE_FLOAT32 = {
+    'delta_h': 2e-5, 'h_L': 2e-5, 'delta_P': 2e-5,
+    'v1': 1e-6, 'v2': 1e-6, 'Re': 1e-6, 'f': 1e-6,
+    'P2': 5e-6, 'P2_fim': 5e-6, 'P3': 5e-6,
+}
+ERRO_DELTA_H_FLOAT32 = 1e-4
+
+
+class ResultadoLote:
+    """Colunas de entrada e de saída de um lote, acessíveis por nome.
+
+    Entradas constantes no lote (ρₘ, rugosidade, P₁, ...) ficam guardadas
+    como escalares; saídas têm todas o formato do lote.
+    """
+
+    def __init__(self, entradas, saidas, mode='Realista', simulador=None):
+        self.entradas = entradas
+        self.saidas = saidas
+        self.mode = mode
+        # VenturiSimulator vetorizado que produziu o lote (geometria, pressões)
+        self.simulador = simulador
+
+    @property
+    def dtype(self):
+        return self.saidas['delta_h'].dtype
+
+    @property
+    def nbytes(self):
+        """Memória ocupada pelas colunas (escalares e broadcasts contam um item)."""
+        total = 0
+        for valor in (*self.entradas.values(), *self.saidas.values()):
+            valor = np.asarray(valor)
+            if valor.ndim and 0 not in valor.strides:
+                total += valor.nbytes
+            else:
+                total += valor.itemsize
+        return total
+
+    def __len__(self):
+        return len(self.saidas['delta_h'])
+
+    def __getitem__(self, nome):
+        if nome in self.saidas:
+            return self.saidas[nome]
+        return self.entradas[nome]
+
+    def __contains__(self, nome):
+        return nome in self.saidas or nome in self.entradas
+
+
+def simular_lote(D1, D2, L, Q, rho, mu, epsilon, rho_m=13600.0, mode='Realista', P1=0.0,
+                 angulo_convergente=ANGULO_CONVERGENTE, angulo_divergente=ANGULO_DIVERGENTE,
+                 coeficientes=COEFICIENTES_PADRAO, dtype=np.float64, P_vapor=None, gas=None):
+    """
+    Simula um lote de pontos em uma única chamada vetorizada.
+
+    Todos os argumentos numéricos aceitam escalares ou arrays (broadcasting);
+    `mode` é único para o lote.
+
+    Args:
+        dtype: np.float64 (padrão) ou np.float32 para o modo compacto;
+            todas as entradas são convertidas para esse tipo e o cálculo
+            inteiro é feito nele
+        P_vapor: Pressão de vapor absoluta (Pa, escalar ou array); quando
+            informada, acrescenta as colunas de `COLUNAS_CAVITACAO`
+        gas: compressivel.EstadoGas para o modo compressível (Q nas
+            condições de entrada); NaN nos pontos com garganta bloqueada
+
+    Returns:
+        ResultadoLote com as colunas de `COLUNAS_SAIDA` e `status` (códigos
+        de `validacao.validar`; pontos inválidos são calculados mesmo assim);
+        Re e f vêm da solução acoplada do simulador, com as iterações por
+        ponto em `simulador.iteracoes_atrito`
+    """
+    tipo = np.dtype(dtype)
+    (D1, D2, L, Q, rho, mu, epsilon, rho_m, P1,
+     angulo_convergente, angulo_divergente) = (
+        np.asarray(x, dtype=tipo)[()] for x in (D1, D2, L, Q, rho, mu, epsilon, rho_m, P1,
+                                                angulo_convergente, angulo_divergente))
+
+    sim = VenturiSimulator(coeficientes)
+    sim.calcular(D1, D2, L, rho, rho_m, Q, 0, None, mode, mu, P1,
+                 angulo_convergente, angulo_divergente, epsilon=epsilon, gas=gas)
+    Re, f = sim.Re, sim.f
+
+    forma = np.broadcast_shapes(*(np.shape(x) for x in (D1, D2, L, Q, rho, mu, epsilon, rho_m, P1,
+                                                        angulo_convergente, angulo_divergente)))
+    saidas = {'Re': Re, 'f': f}
+    for nome in COLUNAS_SAIDA:
+        if nome not in saidas:
+            saidas[nome] = getattr(sim, nome)
+    if P_vapor is not None:
+        cavitacao = analisar_cavitacao(sim, np.asarray(P_vapor, dtype=tipo))
+        saidas['margem_cavitacao'], saidas['sigma'] = cavitacao['margem'], cavitacao['sigma']
+    saidas = {nome: np.broadcast_to(np.asarray(valor, dtype=tipo), forma)
+              for nome, valor in saidas.items()}
+    saidas['status'] = np.broadcast_to(validar(D1, D2, rho, rho_m, Re, mode), forma)
+
+    entradas = {'D1': D1, 'D2': D2, 'L': L, 'Q': Q, 'rho': rho, 'mu': mu,
+                'epsilon': epsilon, 'rho_m': rho_m, 'P1': P1,
+                'angulo_convergente': angulo_convergente, 'angulo_divergente': angulo_divergente}
+    return ResultadoLote(entradas, saidas, mode, sim)
+
+
+def verificar_precisao_compacta(n=200_000, semente=0, mode='Realista'):
+    """
+    Compara o modo float32 com o float64 em pontos aleatórios das faixas da interface.
+
+    Returns:
+        dict coluna → erro máximo na métrica de `ENVELOPE_FLOAT32` (relativo;
+        pressões relativas a |P₁| + ½ρv₂²), 'delta_h_abs' (m, para Δh < 100 m)
+        e 'dentro_do_envelope'
+    """
+    rng = np.random.default_rng(semente)
+    D1 = rng.uniform(0.05, 0.30, n)
+    D2 = np.clip(D1 / rng.uniform(1.01, 2.0, n), 0.02, 0.15)
+    D2 = np.where(D2 < D1, D2, D1 / 1.01)
+    entradas = dict(
+        D1=D1, D2=D2, L=rng.uniform(0.1, 3.0, n), Q=rng.uniform(0.001, 0.05, n),
+        rho=rng.uniform(700.0, 1260.0, n), mu=10 ** rng.uniform(-3.7, -0.5, n),
+        epsilon=rng.choice([1.5e-7, 1.5e-6, 4.5e-5, 2.6e-4], n), rho_m=rng.uniform(1500.0, 20000.0, n),
+        P1=rng.uniform(-2e5, 2e5, n), angulo_convergente=rng.uniform(5.0, 45.0, n),
+        angulo_divergente=rng.uniform(5.0, 45.0, n),
+    )
+
+    referencia = simular_lote(mode=mode, **entradas)
+    compacto = simular_lote(mode=mode, dtype=np.float32, **entradas)
+    escala_pressao = np.abs(entradas['P1']) + 0.5 * entradas['rho'] * referencia['v2']**2
+
+    erros = {}
+    for nome in COLUNAS_SAIDA:
+        ref = referencia[nome]
+        dif = np.abs(compacto[nome].astype(np.float64) - ref)
+        if nome in ('P2', 'P2_fim', 'P3'):
+            erros[nome] = float((dif / escala_pressao).max())
+        else:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                relativo = np.where(ref != 0, dif / np.abs(ref), dif)
+            erros[nome] = float(relativo.max())
+
+    faixa = referencia['delta_h'] < 100.0
+    erros['delta_h_abs'] = float(np.abs(compacto['delta_h'][faixa] - referencia['delta_h'][faixa]).max())
+    erros['dentro_do_envelope'] = (
+        erros['delta_h_abs'] < ERRO_DELTA_H_FLOAT32
+        and all(erros[nome] < limite for nome, limite in ENVELOPE_FLOAT32.items())
+    )
+    return erros
@@ -0,0 +1,312 @@
+"""
+Monte Carlo paralelo com as amostras de entrada em memória compartilhada.
+
+As amostras ficam em um único segmento de `multiprocessing.shared_memory`
+com uma vaga por processo, do tamanho de um bloco (uma linha por variável
+incerta): a memória depende do bloco e do número de processos, não de `n`.
+O estudo é dividido em blocos de tamanho fixo; o bloco `b` é sorteado com
+o fluxo `SeedSequence(semente, spawn_key=(b,))`, de modo que as amostras (e as
+contagens dos histogramas) não dependem do número de processos. Cada
+processo sorteia, simula (atrito, propriedades e simulador vetorizados) e
+reduz seus blocos; ao processo principal voltam só os acumuladores:
+contagens de um histograma fino por saída, momentos, extremos e contagem de
+motivos de invalidação. Uso:
+
+    estudo = EstudoMonteCarlo({'Q': ('normal', 0.02, 0.0005), 'T_C': ('uniforme', 15, 25)},
+                              fixos={'D1': 0.10, 'D2': 0.05, 'L': 1.0})
+    resultado = executar_monte_carlo(estudo, 100_000_000, processos=8)
+    resultado.percentis['delta_h']
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from app_modules.atrito import obter_rugosidade_material
+from app_modules.fluidos import pressao_vapor_interpolada, propriedades_por_pressao
+from app_modules.lote import PADROES, simular_lote
+from app_modules.validacao import MENSAGENS, VALIDO
+
+
+VARIAVEIS = ('D1', 'D2', 'L', 'Q', 'T_C', 'P1', 'rho_m', 'epsilon',
+             'angulo_convergente', 'angulo_divergente')
+
+DISTRIBUICOES = ('normal', 'uniforme', 'triangular', 'lognormal')
+
+PERCENTIS = (0.1, 1, 5, 25, 50, 75, 95, 99, 99.9)
+
+# Histograma fino (percentis) e o histograma reportado (agrupa o fino)
+CLASSES_FINAS = 2 ** 14
+CLASSES = 64
+
+TAMANHO_BLOCO = 1_000_000
+
+# Grade de pressão (Pa) das propriedades com P1 sorteado: ρ e μ interpolados
+# entre os múltiplos vizinhos, sem depender dos outros pontos do bloco; ρ de
+# gases é quase linear em P e μ quase não depende de P, então a grade é larga
+PASSO_PRESSAO = 10000.0
+
+
+def _sortear(rng, distribuicao, n):
+    """Amostras de uma distribuição ('normal', media, desvio), ('uniforme', min, max), ..."""
+    tipo, *parametros = distribuicao
+    if tipo == 'normal':
+        return rng.normal(*parametros, n)
+    if tipo == 'uniforme':
+        return rng.uniform(*parametros, n)
+    if tipo == 'triangular':
+        return rng.triangular(*parametros, n)
+    if tipo == 'lognormal':
+        # (mediana, sigma do logaritmo)
+        mediana, sigma = parametros
+        return mediana * np.exp(sigma * rng.standard_normal(n))
+    raise ValueError(f"Distribuição desconhecida: {tipo} (use uma de {DISTRIBUICOES})")
+
+
+class EstudoMonteCarlo:
+    """
+    Definição de um estudo: distribuições das entradas incertas e valores fixos.
+
+    Args:
+        distribuicoes: dict variável → tupla da distribuição (ver `_sortear`);
+            variáveis de `VARIAVEIS`
+        fixos: Valores das demais variáveis; D1, D2, L e Q são obrigatórios
+            quando não sorteados, as outras têm os padrões de `lote.PADROES`
+            (`epsilon` pelo material padrão)
+        fluido: Identificador do thermo ou de mistura
+        mode: 'Ideal' ou 'Realista'
+        saidas: Colunas do lote reduzidas (percentis, histogramas, momentos),
+            inclusive as de cavitação (`margem_cavitacao`, `sigma`)
+        dtype: Tipo das amostras e do cálculo (np.float32 reduz a memória
+            compartilhada pela metade)
+    """
+
+    def __init__(self, distribuicoes, fixos=None, fluido='water', mode='Realista',
+                 saidas=('delta_h', 'h_L'), dtype=np.float64):
+        desconhecidas = set(distribuicoes) - set(VARIAVEIS)
+        if desconhecidas:
+            raise ValueError(f"Variáveis desconhecidas: {sorted(desconhecidas)}")
+        self.distribuicoes = dict(distribuicoes)
+        self.fixos = {**PADROES, 'epsilon': obter_rugosidade_material(PADROES['material']), **(fixos or {})}
+        faltando = [nome for nome in VARIAVEIS if nome not in self.distribuicoes and nome not in self.fixos]
+        if faltando:
+            raise ValueError(f"Informe distribuição ou valor fixo para: {faltando}")
+        self.fluido = fluido
+        self.mode = mode
+        self.saidas = tuple(saidas)
+        self.dtype = np.dtype(dtype)
+
+    @property
+    def incertas(self):
+        """Variáveis sorteadas, na ordem das linhas da memória compartilhada."""
+        return [nome for nome in VARIAVEIS if nome in self.distribuicoes]
+
+    def sortear_bloco(self, semente, bloco, destino):
+        """Preenche `destino` (variáveis × n) com as amostras do bloco."""
+        rng = np.random.default_rng(np.random.SeedSequence(semente, spawn_key=(bloco,)))
+        for linha, nome in zip(destino, self.incertas):
+            linha[:] = _sortear(rng, self.distribuicoes[nome], len(linha))
+
+    def avaliar(self, amostras):
+        """Simula as amostras (variáveis × n); retorna o ResultadoLote."""
+        valores = dict(self.fixos)
+        valores.update(zip(self.incertas, amostras))
+        T = np.asarray(valores['T_C'], dtype=self.dtype) + 273.15
+        rho, mu = propriedades_por_pressao(self.fluido, T, np.asarray(valores['P1']) + 101325.0,
+                                           origem=273.15, passo_pressao=PASSO_PRESSAO)
+        return simular_lote(valores['D1'], valores['D2'], valores['L'], valores['Q'], rho, mu,
+                            valores['epsilon'], valores['rho_m'], self.mode, valores['P1'],
+                            valores['angulo_convergente'], valores['angulo_divergente'], dtype=self.dtype,
+                            P_vapor=pressao_vapor_interpolada(self.fluido, T, origem=273.15))
+
+
+class _Acumulador:
+    """Contagens e momentos de uma saída, combináveis entre processos."""
+
+    def __init__(self, faixa):
+        self.faixa = faixa
+        self.contagens = np.zeros(CLASSES_FINAS, dtype=np.int64)
+        self.abaixo = 0
+        self.acima = 0
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.minimo = np.inf
+        self.maximo = -np.inf
+
+    def consumir(self, valores):
+        if not valores.size:
+            return
+        valores = valores.astype(np.float64, copy=False)
+        self.contagens += np.histogram(valores, CLASSES_FINAS, self.faixa)[0]
+        self.abaixo += int(np.count_nonzero(valores < self.faixa[0]))
+        self.acima += int(np.count_nonzero(valores > self.faixa[1]))
+        self.minimo = min(self.minimo, float(valores.min()))
+        self.maximo = max(self.maximo, float(valores.max()))
+        media = float(valores.mean())
+        self._combinar_momentos(valores.size, media, float(((valores - media) ** 2).sum()))
+
+    def _combinar_momentos(self, n, media, m2):
+        # Chan et al.: variância combinada sem somas de quadrados grandes
+        total = self.n + n
+        delta = media - self.media
+        self.media += delta * n / total
+        self.m2 += m2 + delta**2 * self.n * n / total
+        self.n = total
+
+    def combinar(self, outro):
+        self.contagens += outro.contagens
+        self.abaixo += outro.abaixo
+        self.acima += outro.acima
+        self.minimo = min(self.minimo, outro.minimo)
+        self.maximo = max(self.maximo, outro.maximo)
+        if outro.n:
+            self._combinar_momentos(outro.n, outro.media, outro.m2)
+
+    def percentil(self, q):
+        """Percentil pela CDF do histograma fino (interpolação linear na classe)."""
+        if not self.n:
+            return np.nan
+        bordas = np.linspace(*self.faixa, CLASSES_FINAS + 1)
+        # Caudas fora da faixa: entre o extremo exato e a borda da faixa
+        bordas = np.concatenate([[min(self.minimo, bordas[0])], bordas, [max(self.maximo, bordas[-1])]])
+        cdf = np.concatenate([[0], np.cumsum([self.abaixo, *self.contagens, self.acima])]) / self.n
+        return float(np.interp(q / 100, cdf, bordas))
+
+
+class ResultadoMonteCarlo:
+    """Resumo do estudo: momentos, percentis e histogramas de cada saída."""
+
+    def __init__(self, n, acumuladores, motivos):
+        self.n = n
+        self.n_validos = next(iter(acumuladores.values())).n if acumuladores else 0
+        # mensagem curta → pontos invalidados pelo motivo
+        self.motivos = motivos
+        self._acumuladores = acumuladores
+
+    @property
+    def estatisticas(self):
+        return {nome: {'media': a.media, 'desvio': np.sqrt(a.m2 / (a.n - 1)) if a.n > 1 else np.nan,
+                       'minimo': a.minimo, 'maximo': a.maximo}
+                for nome, a in self._acumuladores.items()}
+
+    @property
+    def percentis(self):
+        return {nome: {q: a.percentil(q) for q in PERCENTIS} for nome, a in self._acumuladores.items()}
+
+    def percentil(self, saida, q):
+        return self._acumuladores[saida].percentil(q)
+
+    def resolucao(self, saida):
+        """Largura da classe fina: erro máximo dos percentis dentro da faixa."""
+        inicio, fim = self._acumuladores[saida].faixa
+        return (fim - inicio) / CLASSES_FINAS
+
+    def histograma(self, saida):
+        """(bordas, contagens) com `CLASSES` classes; fora da faixa em 'abaixo'/'acima'."""
+        acumulador = self._acumuladores[saida]
+        contagens = acumulador.contagens.reshape(CLASSES, -1).sum(axis=1)
+        return {'bordas': np.linspace(*acumulador.faixa, CLASSES + 1), 'contagens': contagens,
+                'abaixo': acumulador.abaixo, 'acima': acumulador.acima}
+
+
+# Estado por processo de trabalho
+_memoria = None
+_amostras = None
+
+
+def _inicializar_processo(nome_memoria, forma, dtype):
+    global _memoria, _amostras
+    _memoria = shared_memory.SharedMemory(name=nome_memoria)
+    _amostras = np.ndarray(forma, dtype=dtype, buffer=_memoria.buf)
+
+
+def _processar_blocos(estudo, semente, blocos, tamanho_bloco, faixas, n, vaga=0, amostras=None):
+    """
+    Sorteia, simula e reduz uma sequência de blocos na vaga `vaga` da memória
+    compartilhada; retorna os acumuladores.
+    """
+    amostras = (_amostras if amostras is None else amostras)[vaga]
+    acumuladores = {nome: _Acumulador(faixas[nome]) for nome in estudo.saidas}
+    motivos = dict.fromkeys((mensagem for mensagem, _ in MENSAGENS.values()), 0)
+
+    for bloco in blocos:
+        inicio, fim = bloco * tamanho_bloco, min((bloco + 1) * tamanho_bloco, n)
+        fatia = amostras[:, :fim - inicio]
+        estudo.sortear_bloco(semente, bloco, fatia)
+        resultado = estudo.avaliar(fatia)
+
+        status = np.broadcast_to(resultado['status'], (fim - inicio,))
+        validos = status == VALIDO
+        for nome, acumulador in acumuladores.items():
+            acumulador.consumir(np.broadcast_to(resultado[nome], validos.shape)[validos])
+        for bit, (mensagem, _) in MENSAGENS.items():
+            motivos[mensagem] += int(np.count_nonzero(status & bit))
+    return acumuladores, motivos
+
+
+def _faixas_piloto(estudo, semente, tamanho):
+    """Faixa de cada saída a partir do bloco 0 (alargada 50% para cada lado)."""
+    amostras = np.empty((len(estudo.incertas), tamanho), dtype=estudo.dtype)
+    estudo.sortear_bloco(semente, 0, amostras)
+    resultado = estudo.avaliar(amostras)
+    validos = np.broadcast_to(resultado['status'], (tamanho,)) == VALIDO
+
+    faixas = {}
+    for nome in estudo.saidas:
+        valores = np.broadcast_to(resultado[nome], (tamanho,))[validos].astype(np.float64)
+        if not valores.size:
+            faixas[nome] = (0.0, 1.0)
+            continue
+        minimo, maximo = float(valores.min()), float(valores.max())
+        folga = 0.5 * (maximo - minimo) or 0.5 * abs(maximo) or 1.0
+        faixas[nome] = (minimo - folga, maximo + folga)
+    return faixas
+
+
+def executar_monte_carlo(estudo, n, semente=0, processos=None, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Executa o estudo com `n` amostras.
+
+    Os blocos são repartidos em faixas contíguas entre os processos, e cada
+    processo sorteia os seus na própria vaga (um bloco) da memória
+    compartilhada; com `processos=1` tudo roda no processo atual (mesma
+    memória compartilhada, mesmos fluxos aleatórios).
+
+    Returns:
+        ResultadoMonteCarlo
+    """
+    processos = processos or os.cpu_count() or 1
+    n_blocos = -(-n // tamanho_bloco)
+    grupos = [g for g in np.array_split(np.arange(n_blocos), processos) if g.size]
+    # Uma vaga de um bloco por grupo: só os blocos em andamento ocupam memória
+    forma = (len(grupos), len(estudo.incertas), min(n, tamanho_bloco))
+
+    # O piloto também aquece o cache de propriedades herdado pelos processos
+    faixas = _faixas_piloto(estudo, semente, min(n, tamanho_bloco))
+
+    memoria = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(forma)) * estudo.dtype.itemsize))
+    try:
+        if processos == 1:
+            amostras = np.ndarray(forma, dtype=estudo.dtype, buffer=memoria.buf)
+            parciais = [_processar_blocos(estudo, semente, grupos[0], tamanho_bloco, faixas, n, 0, amostras)]
+            del amostras
+        else:
+            with ProcessPoolExecutor(processos, initializer=_inicializar_processo,
+                                     initargs=(memoria.name, forma, estudo.dtype)) as executor:
+                futuros = [executor.submit(_processar_blocos, estudo, semente, grupo, tamanho_bloco, faixas,
+                                           n, vaga)
+                           for vaga, grupo in enumerate(grupos)]
+                parciais = [futuro.result() for futuro in futuros]
+    finally:
+        memoria.close()
+        memoria.unlink()
+
+    acumuladores, motivos = parciais[0]
+    for outros, motivos_outros in parciais[1:]:
+        for nome, acumulador in acumuladores.items():
+            acumulador.combinar(outros[nome])
+        for mensagem, contagem in motivos_outros.items():
+            motivos[mensagem] += contagem
+    return ResultadoMonteCarlo(n, acumuladores, motivos)
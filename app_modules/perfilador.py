@@ -0,0 +1,169 @@
+"""
+Perfil opcional de uma reexecução de `main()` ou de qualquer chamada em lote.
+
+Mostra onde o tempo vai dentro das etapas: métodos internos do thermo,
+layout de texto do matplotlib (as anotações de `plotar_diagrama_venturi`),
+codificação dos PNGs etc. Dois modos:
+
+- 'amostragem' (padrão): uma thread lê a pilha da thread perfilada a
+  intervalos regulares (`sys._current_frames`) e conta as pilhas
+  colapsadas; o arquivo .folded (uma linha "raiz;...;folha contagem" por
+  pilha) é a entrada de flamegraph.pl, speedscope e similares.
+- 'cprofile': trace determinístico do cProfile, gravado como .prof
+  (pstats; abre no snakeviz ou no gprof2dot).
+
+Desligado, não há custo: a interface só consulta a variável de ambiente
+VENTURI_PERFIL na importação deste módulo e, sem ela, chama `main()`
+diretamente. Com VENTURI_PERFIL=<diretório>, cada reexecução grava um
+arquivo nesse diretório (modo em VENTURI_PERFIL_MODO). Lotes e CLIs:
+
+    python -m app_modules.perfilador lote.folded app_modules.relatorios config.csv saida/
+
+ou, no código, `with perfilar('lote.folded'): simular_lote(...)`.
+"""
+import argparse
+import cProfile
+import os
+import runpy
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+
+MODOS = ('amostragem', 'cprofile')
+EXTENSOES = {'amostragem': '.folded', 'cprofile': '.prof'}
+
+# A thread perfilada só é lida quando a amostradora obtém o GIL; abaixo do
+# intervalo de troca do interpretador (5 ms) as amostras não ficam mais densas
+INTERVALO_PADRAO = 0.005
+
+DIRETORIO_PERFIL = os.environ.get('VENTURI_PERFIL')
+MODO_PERFIL = os.environ.get('VENTURI_PERFIL_MODO', 'amostragem')
+
+_reexecucoes = 0
+
+
+def _rotulo(codigo):
+    """Nome do quadro no flame graph: função qualificada (arquivo:linha)."""
+    nome = f"{codigo.co_qualname} ({Path(codigo.co_filename).name}:{codigo.co_firstlineno})"
+    return nome.replace(';', ',')
+
+
+class AmostradorPilhas:
+    """Amostrador da pilha de uma thread, com as pilhas colapsadas contadas."""
+
+    def __init__(self, thread_id=None, intervalo=INTERVALO_PADRAO):
+        self.thread_id = threading.get_ident() if thread_id is None else thread_id
+        self.intervalo = intervalo
+        self.pilhas = Counter()
+        self.amostras = 0
+        self._parar = threading.Event()
+        self._thread = None
+
+    def _amostrar(self):
+        rotulos = {}
+        while not self._parar.wait(self.intervalo):
+            quadro = sys._current_frames().get(self.thread_id)
+            if quadro is None:
+                continue
+            pilha = []
+            while quadro is not None:
+                codigo = quadro.f_code
+                rotulo = rotulos.get(codigo)
+                if rotulo is None:
+                    rotulo = rotulos[codigo] = _rotulo(codigo)
+                pilha.append(rotulo)
+                quadro = quadro.f_back
+            self.pilhas[';'.join(reversed(pilha))] += 1
+            self.amostras += 1
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self._amostrar, name='amostrador-pilhas', daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+        self._thread.join()
+
+    def salvar(self, caminho):
+        """Grava as pilhas colapsadas (formato de flamegraph.pl)."""
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            for pilha, contagem in self.pilhas.most_common():
+                arquivo.write(f"{pilha} {contagem}\n")
+
+
+@contextmanager
+def perfilar(caminho, modo='amostragem', intervalo=INTERVALO_PADRAO):
+    """
+    Perfila o bloco `with` na thread atual e grava o resultado em `caminho`.
+
+    Args:
+        caminho: Arquivo de saída (.folded na amostragem, .prof no cProfile)
+        modo: 'amostragem' ou 'cprofile'
+        intervalo: Período de amostragem (s)
+    """
+    if modo not in MODOS:
+        raise ValueError(f"Modo de perfil desconhecido: {modo}")
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+
+    if modo == 'cprofile':
+        perfil = cProfile.Profile()
+        perfil.enable()
+        try:
+            yield
+        finally:
+            perfil.disable()
+            perfil.dump_stats(caminho)
+        return
+
+    amostrador = AmostradorPilhas(intervalo=intervalo)
+    amostrador.iniciar()
+    try:
+        yield
+    finally:
+        amostrador.parar()
+        amostrador.salvar(caminho)
+
+
+def executar(main):
+    """
+    Executa `main()`; com VENTURI_PERFIL definido, perfila a reexecução.
+
+    O arquivo de cada reexecução recebe data, hora e um contador do processo.
+    """
+    global _reexecucoes
+    if DIRETORIO_PERFIL is None:
+        return main()
+
+    _reexecucoes += 1
+    nome = f"reexecucao-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{_reexecucoes:04d}"
+    with perfilar(Path(DIRETORIO_PERFIL) / (nome + EXTENSOES[MODO_PERFIL]), MODO_PERFIL):
+        return main()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Perfila um módulo (como `python -m`) e grava o flame graph ou o trace.")
+    parser.add_argument('--modo', choices=MODOS, default='amostragem')
+    parser.add_argument('--intervalo-ms', type=float, default=INTERVALO_PADRAO * 1000)
+    parser.add_argument('saida', help="Arquivo de saída (.folded ou .prof)")
+    parser.add_argument('modulo', help="Módulo a executar")
+    parser.add_argument('argumentos', nargs=argparse.REMAINDER, help="Argumentos do módulo")
+    args = parser.parse_args()
+
+    sys.argv = [args.modulo, *args.argumentos]
+    try:
+        with perfilar(args.saida, args.modo, args.intervalo_ms / 1000):
+            runpy.run_module(args.modulo, run_name='__main__', alter_sys=True)
+    except SystemExit as saida:
+        if saida.code not in (None, 0):
+            print(f"{args.modulo} terminou com código {saida.code}", file=sys.stderr)
+    print(f"Perfil gravado em {args.saida}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
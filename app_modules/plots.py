@@ -1,246 +1,676 @@
+import io
+import threading
+import weakref
+from collections import OrderedDict
+
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.patches import Polygon
-
-def plotar_diagrama_venturi(sim):
-
-    fig, ax = plt.subplots(figsize=(14, 9)) 
-    
-    COR_P1 = '#ef4444'      
-    COR_P2 = '#10b981'      
-    COR_P2FIM = '#059669'   
-    COR_P3 = '#8b5cf6'      
-    COR_FLUIDO = '#e0f2fe'
-    COR_BORDA_TUBO = '#0369a1'
-    COR_MERCURIO = '#4b5563'
-
-    margem_visual = sim.D1 * 0.8
-    x_points = np.linspace(-margem_visual, sim.L + margem_visual, 500)
-    
-    def radius_at_x(x):
-        L1 = sim.L_entrada
-        L2 = sim.L_garganta
-        r1 = sim.D1 / 2
-        r2 = sim.D2 / 2
-        
-        def smooth_step(t):
-            return (1 - np.cos(t * np.pi)) / 2
-
-        if x < 0: return r1
-        elif x < L1:
-            t = x / L1
-            return r1 - (r1 - r2) * smooth_step(t)
-        elif x < L1 + L2: return r2
-        elif x <= sim.L:
-            x_no_cone = x - (L1 + L2)
-            t = x_no_cone / sim.L_saida
-            t = min(t, 1.0)
-            return r2 + (r1 - r2) * smooth_step(t)
-        else: return r1
-    
-    y_upper = [radius_at_x(x) for x in x_points]
-    y_lower = [-y for y in y_upper]
-    
-    ax.fill_between(x_points, y_lower, y_upper, color=COR_FLUIDO, 
-                    alpha=0.6, edgecolor=COR_BORDA_TUBO, linewidth=2)
-    ax.axhline(0, color='black', linestyle='-.', alpha=0.3, linewidth=1)
-
-    x_p1 = 0.0 
-    y_p1 = -radius_at_x(x_p1)
-
-    x_p2 = sim.L_entrada + (sim.L_garganta * 0.05) 
-    y_p2 = -radius_at_x(x_p2)
-
-    x_p2fim = sim.L_entrada + (sim.L_garganta * 0.95)
-    y_p2fim = -radius_at_x(x_p2fim)
-
-    x_p3 = sim.L
-    y_p3 = -radius_at_x(x_p3)
-
-    limite_visual_max = max(sim.D1 * 3.0, 0.5)
-    if sim.delta_h > limite_visual_max:
-        delta_h_plot = limite_visual_max
-        travado = True
-    else:
-        delta_h_plot = sim.delta_h
-        travado = False
-        
-    centro_manometro = y_p1 - (sim.D1 * 0.5) - (delta_h_plot * 0.5) - 0.1
-    nivel_esq = centro_manometro - (delta_h_plot / 2)
-    nivel_dir = centro_manometro + (delta_h_plot / 2)
-    fundo_U = min(nivel_esq, nivel_dir) - (sim.D1 * 0.4)
-
-    # Desenho do Tubo em U (Conectando P1 e P2)
-    # Linhas descendo
-    ax.plot([x_p1, x_p1], [y_p1, nivel_esq], color='gray', linewidth=1.5, alpha=0.7)
-    ax.plot([x_p2, x_p2], [y_p2, nivel_dir], color='gray', linewidth=1.5, alpha=0.7)
-    
-    # Fluido Manométrico
-    ax.plot([x_p1, x_p1], [fundo_U, nivel_esq], color=COR_MERCURIO, linewidth=8, solid_capstyle='butt')
-    ax.plot([x_p2, x_p2], [fundo_U, nivel_dir], color=COR_MERCURIO, linewidth=8, solid_capstyle='butt')
-    ax.plot([x_p1, x_p2], [fundo_U, fundo_U], color=COR_MERCURIO, linewidth=8, solid_capstyle='butt')
-
-    # Marcadores de Nível
-    ax.plot([x_p1-0.04, x_p1+0.04], [nivel_esq, nivel_esq], color=COR_P1, linewidth=3)
-    ax.plot([x_p2-0.04, x_p2+0.04], [nivel_dir, nivel_dir], color=COR_P2, linewidth=3)
-
-    # Cota Delta H
-    mid_x = (x_p1 + x_p2) / 2
-    aviso = "\n(Escala Reduzida)" if travado else ""
-    cor_texto = 'red' if travado else '#b91c1c'
-    
-    ax.plot([mid_x, mid_x], [nivel_esq, nivel_dir], color=cor_texto, linestyle='--', linewidth=1)
-    if travado:
-        y_mid = (nivel_esq + nivel_dir) / 2
-        ax.text(mid_x, y_mid, "//", color=cor_texto, ha='center', va='center', fontweight='bold', fontsize=16, backgroundcolor='white')
-
-    ax.text(mid_x + 0.05, (nivel_esq + nivel_dir)/2, 
-            f'Δh = {sim.delta_h*100:.1f} cm{aviso}', 
-            color=cor_texto, fontweight='bold', fontsize=11, va='center',
-            bbox=dict(facecolor='white', alpha=0.8, edgecolor=cor_texto, boxstyle='round,pad=0.2'))
-
-    # ==========================================
-    # 4. ANOTAÇÕES (CAIXAS DE TEXTO)
-    # ==========================================
-    
-    # Função auxiliar para formatar texto
-    def criar_anotacao(x, y, titulo, pressao, velocidade, cor):
-        texto = f"{titulo}\nP = {pressao/1000:.2f} kPa\nv = {velocidade:.2f} m/s"
-        ax.annotate(texto, xy=(x, 0), xytext=(x, sim.D1*1.3),
-                    ha='center', va='bottom', color=cor, fontweight='bold', fontsize=10,
-                    bbox=dict(boxstyle="round,pad=0.3", fc="white", ec=cor, lw=2),
-                    arrowprops=dict(arrowstyle="->", color=cor))
-
-    # P1 (Entrada)
-    criar_anotacao(x_p1, 0, "P₁ (Entrada)", sim.P1, sim.v1, COR_P1)
-
-    # P2 (Início Garganta)
-    criar_anotacao(x_p2, 0, "P₂ (Início)", sim.P2, sim.v2, COR_P2)
-
-    # P2_fim (Fim Garganta) - Verifica se existe o atributo P2_fim (criado no simulator)
-    p2_fim_val = getattr(sim, 'P2_fim', sim.P2) # Fallback se não tiver atrito calculado
-    
-    # Se a garganta for muito curta, não mostramos P2_fim para não sobrepor
-    if sim.L_garganta > 0.15:
-        criar_anotacao(x_p2fim, 0, "P₂ (Fim)", p2_fim_val, sim.v2, COR_P2FIM)
-        
-        # Linha vertical indicando o fim da garganta
-        ax.plot([x_p2fim, x_p2fim], [y_p2fim, sim.D1*1.2], color=COR_P2FIM, linestyle=':', alpha=0.5)
-
-    # P3 (Saída)
-    criar_anotacao(x_p3, 0, "P₃ (Saída)", sim.P3, sim.v1, COR_P3)
-
-    # ==========================================
-    # 5. FINALIZAÇÃO
-    # ==========================================
-    ax.set_title('Diagrama do Venturi (Geometria Real)', fontsize=16, fontweight='bold', pad=50)
-    ax.set_xlabel('Posição Axial (m)')
-    ax.set_ylabel('Raio (m)')
-    
-    ax.set_xlim(-margem_visual, sim.L + margem_visual)
-    
-    top_limit = sim.D1 * 3.5 # Mais espaço para as caixas de texto
-    bottom_limit = fundo_U - 0.2
-    ax.set_ylim(bottom_limit, top_limit)
-
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-    ax.grid(True, alpha=0.15, linestyle='--')
-    ax.set_aspect('equal')
-    
+from matplotlib import dates as mdates
+from matplotlib.figure import Figure
+
+
+COR_P1 = '#ef4444'
+COR_P2 = '#10b981'
+COR_P2FIM = '#059669'
+COR_P3 = '#8b5cf6'
+COR_FLUIDO = '#e0f2fe'
+COR_BORDA_TUBO = '#0369a1'
+COR_MERCURIO = '#4b5563'
+
+# Amostragem adaptativa das curvas: erro máximo em pixels e teto de pontos.
+# Com antialiasing, erros de corda acima de ~0.05 px já alteram a borda renderizada.
+TOLERANCIA_PX = 0.01
+MAX_INTERVALOS = 500
+
+# Resolução de renderização, a mesma do st.pyplot
+DPI_PADRAO = 200
+
+
+# Registro das figuras existentes (sem pyplot, nada mais as mantém vivas)
+_figuras_vivas = weakref.WeakSet()
+
+
+def _nova_figura(figsize):
+    """Cria uma Figure (sem o gerenciador global do pyplot) e a registra."""
+    fig = Figure(figsize=figsize)
+    _figuras_vivas.add(fig)
     return fig
 
-def plotar_perfil_pressao(sim):
-    
-    fig, ax = plt.subplots(figsize=(10, 5))
-    x_start = -sim.D1 * 0.5
-    x_p1 = 0.0
-    x_p2_start = sim.L_entrada
-    x_p2_end = sim.L_entrada + sim.L_garganta
-    x_p3 = sim.L
-    x_end = sim.L + sim.D1 * 0.5
-    
-    X = [x_start, x_p1, x_p2_start, x_p2_end, x_p3, x_end]
+
+def contar_figuras_vivas():
+    """Número de Figures do matplotlib ainda referenciadas no processo."""
+    return len(_figuras_vivas)
+
+
+def _suavizar(t):
+    return (1 - np.cos(t * np.pi)) / 2
+
+
+def raio_parede(sim, x):
+    """Raio da parede do Venturi em x (transições cônicas suavizadas).
+
+    Aceita escalares ou arrays de posições axiais.
+    """
+    x = np.asarray(x, dtype=float)
+    L1 = sim.L_entrada
+    L2 = sim.L_garganta
+    r1 = sim.D1 / 2
+    r2 = sim.D2 / 2
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_entrada = np.clip(x / L1, 0.0, 1.0)
+        t_saida = np.clip((x - (L1 + L2)) / sim.L_saida, 0.0, 1.0)
+
+    r = np.select(
+        [x < 0, x < L1, x < L1 + L2, x <= sim.L],
+        [r1, r1 - (r1 - r2) * _suavizar(t_entrada), r2, r2 + (r1 - r2) * _suavizar(t_saida)],
+        default=r1,
+    )
+    return r[()]
+
+
+def _pixels_por_unidade(ax, dpi):
+    """Pixels por unidade de dado nos limites atuais (aspecto igual: o menor eixo)."""
+    largura, altura = ax.get_position().size * ax.figure.get_size_inches() * dpi
+    x0, x1 = ax.get_xlim()
+    y0, y1 = ax.get_ylim()
+    return min(largura / abs(x1 - x0), altura / abs(y1 - y0))
+
+
+def _intervalos_suavizacao(amplitude_px, tolerancia_px=TOLERANCIA_PX, maximo=MAX_INTERVALOS):
+    """
+    Intervalos uniformes para traçar uma transição (1 - cos πt)/2 de amplitude
+    `amplitude_px` como polilinha com erro de corda ≤ `tolerancia_px`.
+
+    O erro da interpolação linear é h²·max|y''|/8 = π²·A/(16·n²).
+    """
+    n = np.ceil(np.pi * np.sqrt(max(amplitude_px, 0.0) / (16 * tolerancia_px)))
+    return int(np.clip(n, 1, maximo))
+
+
+def _vertices_faixa(x, y_inferior, y_superior):
+    """Vértices do polígono entre duas curvas, como em `fill_between`."""
+    y_inferior = np.broadcast_to(y_inferior, np.shape(x))
+    y_superior = np.broadcast_to(y_superior, np.shape(x))
+    return np.concatenate([
+        np.column_stack([x, y_superior]),
+        np.column_stack([x[::-1], y_inferior[::-1]]),
+    ])
+
+
+class FiguraDiagramaVenturi:
+    """
+    Diagrama do Venturi com artistas persistentes.
+
+    A figura e os artistas são criados uma única vez; `atualizar(sim)` apenas
+    troca dados, textos e posições, evitando recriar a figura a cada chamada.
+    """
+
+    def __init__(self):
+        self.fig = _nova_figura((14, 9))
+        ax = self.ax = self.fig.subplots()
+
+        self.fluido = ax.fill_between([0, 1], [0, 0], [0, 0], color=COR_FLUIDO,
+                                      alpha=0.6, edgecolor=COR_BORDA_TUBO, linewidth=2)
+        ax.axhline(0, color='black', linestyle='-.', alpha=0.3, linewidth=1)
+
+        # Desenho do Tubo em U (Conectando P1 e P2)
+        # Linhas descendo
+        self.tomada_p1, = ax.plot([], [], color='gray', linewidth=1.5, alpha=0.7)
+        self.tomada_p2, = ax.plot([], [], color='gray', linewidth=1.5, alpha=0.7)
+
+        # Fluido Manométrico
+        self.coluna_esq, = ax.plot([], [], color=COR_MERCURIO, linewidth=8, solid_capstyle='butt')
+        self.coluna_dir, = ax.plot([], [], color=COR_MERCURIO, linewidth=8, solid_capstyle='butt')
+        self.fundo, = ax.plot([], [], color=COR_MERCURIO, linewidth=8, solid_capstyle='butt')
+
+        # Marcadores de Nível
+        self.nivel_esq, = ax.plot([], [], color=COR_P1, linewidth=3)
+        self.nivel_dir, = ax.plot([], [], color=COR_P2, linewidth=3)
+
+        # Cota Delta H
+        self.cota, = ax.plot([], [], linestyle='--', linewidth=1)
+        self.quebra = ax.text(0, 0, "//", ha='center', va='center', fontweight='bold',
+                              fontsize=16, backgroundcolor='white')
+        self.texto_delta_h = ax.text(0, 0, '', fontweight='bold', fontsize=11, va='center',
+                                     bbox=dict(facecolor='white', alpha=0.8,
+                                               boxstyle='round,pad=0.2'))
+
+        # ==========================================
+        # 4. ANOTAÇÕES (CAIXAS DE TEXTO)
+        # ==========================================
+
+        # Função auxiliar para criar as caixas de texto
+        def criar_anotacao(cor):
+            return ax.annotate('', xy=(0, 0), xytext=(0, 0),
+                               ha='center', va='bottom', color=cor, fontweight='bold', fontsize=10,
+                               bbox=dict(boxstyle="round,pad=0.3", fc="white", ec=cor, lw=2),
+                               arrowprops=dict(arrowstyle="->", color=cor))
+
+        self.anotacao_p1 = criar_anotacao(COR_P1)
+        self.anotacao_p2 = criar_anotacao(COR_P2)
+        self.anotacao_p2fim = criar_anotacao(COR_P2FIM)
+        self.anotacao_p3 = criar_anotacao(COR_P3)
+
+        # Linha vertical indicando o fim da garganta
+        self.linha_p2fim, = ax.plot([], [], color=COR_P2FIM, linestyle=':', alpha=0.5)
+
+        # ==========================================
+        # 5. FINALIZAÇÃO
+        # ==========================================
+        ax.set_title('Diagrama do Venturi (Geometria Real)', fontsize=16, fontweight='bold', pad=50)
+        ax.set_xlabel('Posição Axial (m)')
+        ax.set_ylabel('Raio (m)')
+        ax.spines['top'].set_visible(False)
+        ax.spines['right'].set_visible(False)
+        ax.grid(True, alpha=0.15, linestyle='--')
+        ax.set_aspect('equal')
+
+    def atualizar(self, sim, dpi=None):
+        margem_visual = sim.D1 * 0.8
+
+        x_p1 = 0.0
+        y_p1 = -raio_parede(sim, x_p1)
+
+        x_p2 = sim.L_entrada + (sim.L_garganta * 0.05)
+        y_p2 = -raio_parede(sim, x_p2)
+
+        x_p2fim = sim.L_entrada + (sim.L_garganta * 0.95)
+        y_p2fim = -raio_parede(sim, x_p2fim)
+
+        x_p3 = sim.L
+
+        limite_visual_max = max(sim.D1 * 3.0, 0.5)
+        if sim.delta_h > limite_visual_max:
+            delta_h_plot = limite_visual_max
+            travado = True
+        else:
+            delta_h_plot = sim.delta_h
+            travado = False
+
+        centro_manometro = y_p1 - (sim.D1 * 0.5) - (delta_h_plot * 0.5) - 0.1
+        nivel_esq = centro_manometro - (delta_h_plot / 2)
+        nivel_dir = centro_manometro + (delta_h_plot / 2)
+        fundo_U = min(nivel_esq, nivel_dir) - (sim.D1 * 0.4)
+
+        self.tomada_p1.set_data([x_p1, x_p1], [y_p1, nivel_esq])
+        self.tomada_p2.set_data([x_p2, x_p2], [y_p2, nivel_dir])
+        self.coluna_esq.set_data([x_p1, x_p1], [fundo_U, nivel_esq])
+        self.coluna_dir.set_data([x_p2, x_p2], [fundo_U, nivel_dir])
+        self.fundo.set_data([x_p1, x_p2], [fundo_U, fundo_U])
+        self.nivel_esq.set_data([x_p1-0.04, x_p1+0.04], [nivel_esq, nivel_esq])
+        self.nivel_dir.set_data([x_p2-0.04, x_p2+0.04], [nivel_dir, nivel_dir])
+
+        mid_x = (x_p1 + x_p2) / 2
+        y_mid = (nivel_esq + nivel_dir) / 2
+        aviso = "\n(Escala Reduzida)" if travado else ""
+        cor_texto = 'red' if travado else '#b91c1c'
+
+        self.cota.set_data([mid_x, mid_x], [nivel_esq, nivel_dir])
+        self.cota.set_color(cor_texto)
+        self.quebra.set_visible(travado)
+        self.quebra.set_position((mid_x, y_mid))
+        self.quebra.set_color(cor_texto)
+
+        self.texto_delta_h.set_position((mid_x + 0.05, y_mid))
+        self.texto_delta_h.set_text(f'Δh = {sim.delta_h*100:.1f} cm{aviso}')
+        self.texto_delta_h.set_color(cor_texto)
+        self.texto_delta_h.get_bbox_patch().set_edgecolor(cor_texto)
+
+        def atualizar_anotacao(anotacao, x, titulo, pressao, velocidade):
+            anotacao.set_text(f"{titulo}\nP = {pressao/1000:.2f} kPa\nv = {velocidade:.2f} m/s")
+            anotacao.xy = (x, 0)
+            anotacao.set_position((x, sim.D1*1.3))
+
+        atualizar_anotacao(self.anotacao_p1, x_p1, "P₁ (Entrada)", sim.P1, sim.v1)
+        atualizar_anotacao(self.anotacao_p2, x_p2, "P₂ (Início)", sim.P2, sim.v2)
+
+        # P2_fim (Fim Garganta) - Verifica se existe o atributo P2_fim (criado no simulator)
+        p2_fim_val = getattr(sim, 'P2_fim', sim.P2) # Fallback se não tiver atrito calculado
+
+        # Se a garganta for muito curta, não mostramos P2_fim para não sobrepor
+        mostrar_p2fim = sim.L_garganta > 0.15
+        self.anotacao_p2fim.set_visible(mostrar_p2fim)
+        self.linha_p2fim.set_visible(mostrar_p2fim)
+        if mostrar_p2fim:
+            atualizar_anotacao(self.anotacao_p2fim, x_p2fim, "P₂ (Fim)", p2_fim_val, sim.v2)
+            self.linha_p2fim.set_data([x_p2fim, x_p2fim], [y_p2fim, sim.D1*1.2])
+
+        atualizar_anotacao(self.anotacao_p3, x_p3, "P₃ (Saída)", sim.P3, sim.v1)
+
+        self.ax.set_xlim(-margem_visual, sim.L + margem_visual)
+
+        top_limit = sim.D1 * 3.5 # Mais espaço para as caixas de texto
+        bottom_limit = fundo_U - 0.2
+        self.ax.set_ylim(bottom_limit, top_limit)
+
+        # Parede amostrada só onde curva, com densidade dada pela escala em pixels
+        escala = _pixels_por_unidade(self.ax, dpi or self.fig.dpi)
+        n = _intervalos_suavizacao((sim.D1 - sim.D2) / 2 * escala)
+        x_points = np.concatenate([
+            [-margem_visual],
+            np.linspace(0, sim.L_entrada, n + 1),
+            np.linspace(sim.L_entrada + sim.L_garganta, sim.L, n + 1),
+            [sim.L + margem_visual],
+        ])
+        y_upper = raio_parede(sim, x_points)
+        self.fluido.set_verts([_vertices_faixa(x_points, -y_upper, y_upper)])
+
+        return self.fig
+
+
+class FiguraPerfilPressao:
+    """Perfil de pressão estática com artistas persistentes."""
+
+    def __init__(self):
+        self.fig = _nova_figura((10, 5))
+        ax = self.ax = self.fig.subplots()
+
+        self.linha_pressao, = ax.plot([], [], color='#2563eb', linewidth=3, label='Pressão Estática P(x)')
+        self.linha_p1 = ax.axhline(0, color='#ef4444', linestyle='--', alpha=0.5, label='P₁')
+        self.linha_p2 = ax.axhline(0, color='#10b981', linestyle='--', alpha=0.5, label='P₂')
+        self.linha_fim_garganta = ax.axvline(0, color='gray', linestyle=':', alpha=0.3)
+
+        self.linha_p3 = ax.axhline(0, color='orange', linestyle=':', alpha=0.7)
+        self.anotacao_perda = ax.annotate('', xy=(0, 0), xytext=(0, 0),
+                                          arrowprops=dict(arrowstyle='<->', color='orange'),
+                                          color='orange', fontweight='bold', ha='center', va='center',
+                                          bbox=dict(facecolor='white', edgecolor='orange', boxstyle='round,pad=0.2'))
+
+        ax.set_xlabel('Posição Axial (m)', fontweight='bold')
+        ax.set_ylabel('Pressão (kPa)', fontweight='bold')
+        ax.set_title('Perfil de Pressão ao Longo do Medidor', fontweight='bold', pad=15)
+        ax.grid(True, alpha=0.2, linestyle='--')
+        ax.legend(loc='best')
+        ax.spines['top'].set_visible(False)
+        ax.spines['right'].set_visible(False)
+
+    def atualizar(self, sim, dpi=None):
+        x_start = -sim.D1 * 0.5
+        x_p1 = 0.0
+        x_p2_start = sim.L_entrada
+        x_p2_end = sim.L_entrada + sim.L_garganta
+        x_p3 = sim.L
+        x_end = sim.L + sim.D1 * 0.5
+
+        X = [x_start, x_p1, x_p2_start, x_p2_end, x_p3, x_end]
+        P = np.array([sim.P1, sim.P1, sim.P2, sim.P2_fim, sim.P3, sim.P3]) / 1000.0
+
+        self.linha_pressao.set_data(X, P)
+        self.linha_p1.set_ydata([sim.P1/1000, sim.P1/1000])
+        self.linha_p2.set_ydata([sim.P2/1000, sim.P2/1000])
+        self.linha_fim_garganta.set_xdata([x_p2_end, x_p2_end])
+
+        realista = sim.mode == 'Realista'
+        self.linha_p3.set_visible(realista)
+        self.anotacao_perda.set_visible(realista)
+        if realista:
+            self.linha_p3.set_ydata([sim.P3/1000, sim.P3/1000])
+            mid_x_end = (x_p3 + x_end) / 2
+            self.anotacao_perda.set_text(f'Perda: {(sim.P1 - sim.P3)/1000:.2f} kPa')
+            self.anotacao_perda.xy = (mid_x_end, sim.P3/1000)
+            self.anotacao_perda.set_position((mid_x_end, (sim.P1 + sim.P3)/2000))
+
+        self.ax.relim(visible_only=True)
+        self.ax.autoscale_view()
+        return self.fig
+
+
+class FiguraLinhasEnergia:
+    """Balanço de energia (áreas empilhadas) com artistas persistentes."""
+
+    def __init__(self):
+        self.fig = _nova_figura((10, 6))
+        ax = self.ax = self.fig.subplots()
+
+        self.faixa_perda = ax.fill_between([0, 1], 0, 0, color='#ef4444', alpha=0.2, label='Perda de Carga')
+        self.faixa_cinetica = ax.fill_between([0, 1], 0, 0, color='#10b981', alpha=0.5, label='Energia Cinética')
+        self.faixa_pressao = ax.fill_between([0, 1], 0, 0, color='#3b82f6', alpha=0.4, label='Energia de Pressão')
+        self.linha_datum = ax.axhline(0, color='black', linestyle=':', label='Pressão Zero')
+
+        self.linha_egl, = ax.plot([], [], color='#b91c1c', linewidth=2)
+        self.anotacao_perda = ax.annotate('', xy=(0, 0), xytext=(0, 0),
+                                          arrowprops=dict(arrowstyle='-[, widthB=0.5', color='red'),
+                                          color='red', fontweight='bold', va='center')
+
+        ax.set_xlabel('Posição (m)', fontweight='bold')
+        ax.set_ylabel('Energia / Carga (m)', fontweight='bold')
+        ax.set_title('Balanço de Energia', fontweight='bold', pad=15)
+        ax.spines['top'].set_visible(False)
+        ax.spines['right'].set_visible(False)
+        ax.grid(True, alpha=0.2, linestyle='--')
+
+    def atualizar(self, sim, dpi=None):
+        # Geometria e Arrays
+        L1, L2 = sim.L_entrada, sim.L_garganta
+        X_key = [0, L1, L1 + L2, sim.L]
+        Areas = [sim.A1, sim.A2, sim.A2, sim.A1]
+        V_key = [sim.Q / a for a in Areas]
+        Hv_key = np.array([v**2 / (2 * sim.g) for v in V_key])
+        gamma = sim.rho * sim.g
+        Hp_key = np.array([sim.P1/gamma, sim.P2/gamma, sim.P2_fim/gamma, sim.P3/gamma])
+
+        # Datum Offset para evitar gráficos negativos
+        min_p = np.min(Hp_key)
+        datum_offset = abs(min_p) + 0.1 if min_p < 0 else 0.0
+        Hp_key_plot = Hp_key + datum_offset
+
+        # As cargas variam linearmente entre as seções-chave: bastam esses pontos
+        X_plot = np.asarray(X_key, dtype=float)
+        Hp_plot = Hp_key_plot
+        Hv_plot = Hv_key
+        EGL_plot = Hp_plot + Hv_plot
+        EGL_ideal = np.full_like(X_plot, EGL_plot[0])
+
+        self.faixa_perda.set_verts([_vertices_faixa(X_plot, EGL_plot, EGL_ideal)])
+        self.faixa_cinetica.set_verts([_vertices_faixa(X_plot, Hp_plot, EGL_plot)])
+        self.faixa_pressao.set_verts([_vertices_faixa(X_plot, 0.0, Hp_plot)])
+        self.linha_egl.set_data(X_plot, EGL_plot)
+
+        self.linha_datum.set_visible(datum_offset > 0)
+        self.linha_datum.set_ydata([datum_offset, datum_offset])
+
+        perda_total = EGL_ideal[-1] - EGL_plot[-1]
+        self.anotacao_perda.set_visible(perda_total > 0.001)
+        if perda_total > 0.001:
+            y_meio = (EGL_ideal[-1] + EGL_plot[-1])/2
+            self.anotacao_perda.set_text(f"Perda Total:\n{perda_total:.3f} m")
+            self.anotacao_perda.xy = (sim.L, y_meio)
+            self.anotacao_perda.set_position((sim.L + 0.1, y_meio))
+
+        # A legenda só lista os artistas visíveis (a linha de pressão zero é opcional)
+        handles = [self.faixa_perda, self.faixa_cinetica, self.faixa_pressao]
+        if datum_offset > 0:
+            handles.append(self.linha_datum)
+        self.ax.legend(handles=handles, loc='lower left', frameon=True)
+
+        # Equivalente ao autoscale do fill_between seguido de set_ylim(bottom=0)
+        y_max = max(np.max(EGL_plot), np.max(EGL_ideal), datum_offset)
+        self.ax.set_xlim(0, sim.L * 1.15)
+        self.ax.set_ylim(0, y_max * 1.05)
+        return self.fig
+
+
+def _perfil_pressao(sim):
+    """Pontos (x, P em kPa) do perfil de pressão estática por seções."""
+    x_fim_garganta = sim.L_entrada + sim.L_garganta
+    X = [-sim.D1 * 0.5, 0.0, sim.L_entrada, x_fim_garganta, sim.L, sim.L + sim.D1 * 0.5]
     P = np.array([sim.P1, sim.P1, sim.P2, sim.P2_fim, sim.P3, sim.P3]) / 1000.0
-    
-    ax.plot(X, P, color='#2563eb', linewidth=3, label='Pressão Estática P(x)')
-    ax.axhline(sim.P1/1000, color='#ef4444', linestyle='--', alpha=0.5, label=f'P₁')
-    ax.axhline(sim.P2/1000, color='#10b981', linestyle='--', alpha=0.5, label=f'P₂')
-    
-    ax.axvline(x_p2_end, color='gray', linestyle=':', alpha=0.3)
-
-    if sim.mode == 'Realista':
-        ax.axhline(sim.P3/1000, color='orange', linestyle=':', alpha=0.7)
-        mid_x_end = (x_p3 + x_end) / 2
-        ax.annotate(f'Perda: {(sim.P1 - sim.P3)/1000:.2f} kPa', 
-                   xy=(mid_x_end, sim.P3/1000), 
-                   xytext=(mid_x_end, (sim.P1 + sim.P3)/2000),
-                   arrowprops=dict(arrowstyle='<->', color='orange'),
-                   color='orange', fontweight='bold', ha='center', va='center',
-                   bbox=dict(facecolor='white', edgecolor='orange', boxstyle='round,pad=0.2'))
-
-    ax.set_xlabel('Posição Axial (m)', fontweight='bold')
-    ax.set_ylabel('Pressão (kPa)', fontweight='bold')
-    ax.set_title('Perfil de Pressão ao Longo do Medidor', fontweight='bold', pad=15)
-    ax.grid(True, alpha=0.2, linestyle='--')
-    ax.legend(loc='best')
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-    return fig
+    return X, P
+
+
+class _FiguraComparacao:
+    """Base das figuras de comparação: um conjunto de linhas por cenário, reaproveitado."""
+
+    LINHAS_POR_CENARIO = 1
+
+    def __init__(self, figsize):
+        self.fig = _nova_figura(figsize)
+        self.ax = self.fig.subplots()
+        self.linhas = []
+        self.ax.spines['top'].set_visible(False)
+        self.ax.spines['right'].set_visible(False)
+        self.ax.grid(True, alpha=0.2, linestyle='--')
+
+    def _linhas_do_cenario(self, i):
+        while len(self.linhas) <= i:
+            cor = f'C{len(self.linhas) % 10}'
+            self.linhas.append([self.ax.plot([], [], color=cor, linewidth=2, linestyle=estilo)[0]
+                                for estilo in ('-', '--')[:self.LINHAS_POR_CENARIO]])
+        return self.linhas[i]
+
+    def atualizar(self, cenarios, dpi=None):
+        """Atualiza com uma lista de pares (nome, sim); linhas excedentes são ocultadas."""
+        for i, (nome, sim) in enumerate(cenarios):
+            self._desenhar(self._linhas_do_cenario(i), nome, sim)
+        for linhas in self.linhas[len(cenarios):]:
+            for linha in linhas:
+                linha.set_visible(False)
+
+        visiveis = [linha for linhas in self.linhas[:len(cenarios)] for linha in linhas]
+        if visiveis:
+            self.ax.legend(handles=visiveis, loc='best', fontsize=9)
+        self.ax.relim(visible_only=True)
+        self.ax.autoscale_view()
+        return self.fig
+
+
+class FiguraComparacaoPressao(_FiguraComparacao):
+    """Perfis de pressão estática de vários cenários sobrepostos."""
+
+    def __init__(self):
+        super().__init__((10, 5))
+        self.ax.set_xlabel('Posição Axial (m)', fontweight='bold')
+        self.ax.set_ylabel('Pressão (kPa)', fontweight='bold')
+        self.ax.set_title('Perfis de Pressão por Cenário', fontweight='bold', pad=15)
+
+    def _desenhar(self, linhas, nome, sim):
+        X, P = _perfil_pressao(sim)
+        linhas[0].set_data(X, P)
+        linhas[0].set_label(nome)
+        linhas[0].set_visible(True)
+
+
+class FiguraComparacaoEnergia(_FiguraComparacao):
+    """Linhas de energia (contínuas) e piezométricas (tracejadas) de vários cenários."""
+
+    LINHAS_POR_CENARIO = 2
+
+    def __init__(self):
+        super().__init__((10, 6))
+        self.ax.set_xlabel('Posição (m)', fontweight='bold')
+        self.ax.set_ylabel('Carga (m)', fontweight='bold')
+        self.ax.set_title('Linhas de Energia (—) e Piezométricas (- -) por Cenário', fontweight='bold', pad=15)
+
+    def _desenhar(self, linhas, nome, sim):
+        # Cargas lineares entre as seções-chave, como em FiguraLinhasEnergia
+        X = [0, sim.L_entrada, sim.L_entrada + sim.L_garganta, sim.L]
+        gamma = sim.rho * sim.g
+        Hp = np.array([sim.P1, sim.P2, sim.P2_fim, sim.P3]) / gamma
+        Hv = np.array([sim.v1, sim.v2, sim.v2, sim.v1]) ** 2 / (2 * sim.g)
+        linhas[0].set_data(X, Hp + Hv)
+        linhas[0].set_label(f'{nome} (EGL)')
+        linhas[1].set_data(X, Hp)
+        linhas[1].set_label(f'{nome} (HGL)')
+        for linha in linhas:
+            linha.set_visible(True)
+
+
+class FiguraEnvelopeCavitacao:
+    """Vazão segura × D₂ (região sem cavitação sombreada) com o ponto de operação."""
+
+    def __init__(self):
+        self.fig = _nova_figura((10, 4))
+        ax = self.ax = self.fig.subplots()
+        self.linha_limite, = ax.plot([], [], color='#dc2626', linewidth=2, label='Vazão máxima sem cavitação')
+        self.regiao_segura = ax.fill_between([0, 0], [0, 0], color='#10b981', alpha=0.15, label='Região segura')
+        self.ponto, = ax.plot([], [], 'o', color='#2563eb', markersize=9, label='Ponto de operação')
+
+        ax.set_xlabel('D₂ - Diâmetro da garganta (m)', fontweight='bold')
+        ax.set_ylabel('Vazão Q (m³/s)', fontweight='bold')
+        ax.set_title('Envelope de Cavitação na Garganta', fontweight='bold', pad=15)
+        ax.grid(True, alpha=0.2, linestyle='--')
+        ax.legend(loc='upper left')
+        ax.spines['top'].set_visible(False)
+        ax.spines['right'].set_visible(False)
 
-def plotar_linhas_energia(sim):
+    def atualizar(self, D2, Q_max, D2_operacao, Q_operacao, dpi=None):
+        self.linha_limite.set_data(D2, Q_max)
+        self.regiao_segura.set_verts([_vertices_faixa(D2, np.zeros_like(Q_max), Q_max)])
+        self.ponto.set_data([D2_operacao], [Q_operacao])
+
+        self.ax.set_xlim(D2[0], D2[-1])
+        self.ax.set_ylim(0, max(float(np.max(Q_max)), Q_operacao) * 1.05)
+        return self.fig
+
+
+class FiguraCampoEscoamento:
+    """Contornos de velocidade (com linhas de corrente) e de pressão do campo potencial."""
+
+    def __init__(self):
+        self.fig = _nova_figura((14, 6))
+        self.ax_velocidade, self.ax_pressao = self.fig.subplots(2, 1, sharex=True)
+        self.contornos = []
+        self.barras = {}
+
+        for ax, titulo in ((self.ax_velocidade, 'Velocidade e Linhas de Corrente'),
+                           (self.ax_pressao, 'Pressão Estática (escoamento potencial)')):
+            ax.set_title(titulo, fontweight='bold', pad=10)
+            ax.set_ylabel('Raio (m)')
+            ax.set_aspect('equal')
+            ax.spines['top'].set_visible(False)
+            ax.spines['right'].set_visible(False)
+        self.ax_pressao.set_xlabel('Posição Axial (m)')
+        self.paredes = [ax.plot([], [], color=COR_BORDA_TUBO, linewidth=2)[0]
+                        for ax in (self.ax_velocidade, self.ax_pressao) for _ in range(2)]
+
+    def atualizar(self, campo, Q, rho, P1, dpi=None):
+        # Barras recriadas (antes dos contornos que representam): a escala
+        # acompanha os níveis de cada vazão
+        for barra in self.barras.values():
+            barra.remove()
+        for contorno in self.contornos:
+            contorno.remove()
+
+        # Meia seção espelhada no eixo para mostrar o tubo inteiro
+        X = np.concatenate([campo.X[:, ::-1], campo.X], axis=1)
+        Y = np.concatenate([-campo.Rr[:, ::-1], campo.Rr], axis=1)
+
+        def espelhar(valores):
+            return np.concatenate([valores[:, ::-1], valores], axis=1)
+
+        velocidade = campo.velocidade(Q)
+        pressao = campo.pressao(Q, rho, P1) / 1000.0
+        self.contornos = [
+            self.ax_velocidade.contourf(X, Y, espelhar(velocidade), levels=30, cmap='viridis'),
+            self.ax_velocidade.contour(X, Y, espelhar(campo.psi), levels=np.linspace(0.1, 0.9, 9),
+                                       colors='white', linewidths=0.8, alpha=0.8),
+            self.ax_pressao.contourf(X, Y, espelhar(pressao), levels=30, cmap='coolwarm'),
+        ]
+        for ax, contorno, rotulo in ((self.ax_velocidade, self.contornos[0], 'Velocidade (m/s)'),
+                                     (self.ax_pressao, self.contornos[2], 'Pressão (kPa)')):
+            self.barras[ax] = self.fig.colorbar(contorno, ax=ax, label=rotulo, fraction=0.03, pad=0.02)
+
+        for i, parede in enumerate(self.paredes):
+            parede.set_data(campo.x, campo.R if i % 2 == 0 else -campo.R)
+        for ax in (self.ax_velocidade, self.ax_pressao):
+            ax.set_xlim(campo.x[0], campo.x[-1])
+            ax.set_ylim(-campo.R.max() * 1.1, campo.R.max() * 1.1)
+        return self.fig
+
+
+class FiguraHistorico:
+    """Séries de Q, P₂ (fim) e perda no tempo, com a média da janela tracejada."""
+
+    SERIES = (('Q', 'Vazão Q (m³/s)', 1.0, '#2563eb'),
+              ('P2_fim', 'P₂ fim (kPa)', 1e-3, COR_P2FIM),
+              ('h_L', 'Perda hₗ (m)', 1.0, '#dc2626'))
+
+    def __init__(self):
+        self.fig = _nova_figura((14, 8))
+        self.eixos = self.fig.subplots(len(self.SERIES), 1, sharex=True)
+        self.linhas, self.medias = [], []
+        for ax, (_, rotulo, _, cor) in zip(self.eixos, self.SERIES):
+            self.linhas.append(ax.plot([], [], color=cor, linewidth=0.8)[0])
+            self.medias.append(ax.axhline(0.0, color=cor, linestyle='--', linewidth=1, alpha=0.6))
+            ax.set_ylabel(rotulo, fontweight='bold')
+            ax.grid(True, alpha=0.2, linestyle='--')
+            ax.spines['top'].set_visible(False)
+            ax.spines['right'].set_visible(False)
+            ax.xaxis_date()
+        self.eixos[0].set_title('Histórico do Medidor', fontweight='bold', pad=15)
+        self.eixos[-1].set_xlabel('Tempo', fontweight='bold')
+        self.fig.autofmt_xdate()
+
+    def atualizar(self, series, medias, dpi=None):
+        """`series`: nome → (tempo datetime64, valores); `medias`: nome → média da janela."""
+        limites = None
+        for ax, linha, media, (nome, _, escala, _) in zip(self.eixos, self.linhas, self.medias, self.SERIES):
+            tempo, valores = series[nome]
+            x = mdates.date2num(tempo)
+            linha.set_data(x, valores * escala)
+            media.set_ydata([medias[nome] * escala] * 2)
+            if len(x):
+                limites = (x[0], x[-1]) if limites is None else (min(limites[0], x[0]), max(limites[1], x[-1]))
+                ax.relim()
+                ax.autoscale_view(scalex=False)
+        if limites is not None and limites[1] > limites[0]:
+            self.eixos[0].set_xlim(*limites)
+        return self.fig
+
+
+def figura_para_png(fig, dpi=DPI_PADRAO):
+    """Serializa uma Figure em PNG como `st.pyplot` (bbox justo)."""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight')
+    return buffer.getvalue()
+
+
+def plotar_diagrama_venturi(sim, dpi=None):
+    return FiguraDiagramaVenturi().atualizar(sim, dpi)
+
+
+def plotar_perfil_pressao(sim, dpi=None):
+    return FiguraPerfilPressao().atualizar(sim, dpi)
+
+
+def plotar_linhas_energia(sim, dpi=None):
     """Mantém o plot de linhas de energia (já atualizado anteriormente)."""
-    fig, ax = plt.subplots(figsize=(10, 6))
-    
-    # Geometria e Arrays
-    x_vals = np.linspace(0, sim.L, 200)
-    L1, L2 = sim.L_entrada, sim.L_garganta
-    X_key = [0, L1, L1 + L2, sim.L]
-    Areas = [sim.A1, sim.A2, sim.A2, sim.A1]
-    V_key = [sim.Q / a for a in Areas]
-    Hv_key = np.array([v**2 / (2 * sim.g) for v in V_key])
-    gamma = sim.rho * sim.g
-    Hp_key = np.array([sim.P1/gamma, sim.P2/gamma, sim.P2_fim/gamma, sim.P3/gamma])
-    
-    # Datum Offset para evitar gráficos negativos
-    min_p = np.min(Hp_key)
-    datum_offset = abs(min_p) + 0.1 if min_p < 0 else 0.0
-    Hp_key_plot = Hp_key + datum_offset
-    
-    # Interpolação
-    X_plot = np.linspace(0, sim.L, 500)
-    Hp_plot = np.interp(X_plot, X_key, Hp_key_plot)
-    Hv_plot = np.interp(X_plot, X_key, Hv_key)
-    EGL_plot = Hp_plot + Hv_plot
-    EGL_ideal = np.full_like(X_plot, EGL_plot[0])
-
-    # Plotagem
-    ax.fill_between(X_plot, EGL_plot, EGL_ideal, color='#ef4444', alpha=0.2, label='Perda de Carga')
-    ax.fill_between(X_plot, Hp_plot, EGL_plot, color='#10b981', alpha=0.5, label='Energia Cinética')
-    ax.fill_between(X_plot, 0, Hp_plot, color='#3b82f6', alpha=0.4, label='Energia de Pressão')
-    
-    if datum_offset > 0:
-        ax.axhline(datum_offset, color='black', linestyle=':', label='Pressão Zero')
-
-    ax.plot(X_plot, EGL_plot, color='#b91c1c', linewidth=2)
-    
-    perda_total = EGL_ideal[-1] - EGL_plot[-1]
-    if perda_total > 0.001:
-        ax.annotate(f"Perda Total:\n{perda_total:.3f} m", 
-                    xy=(sim.L, (EGL_ideal[-1] + EGL_plot[-1])/2),
-                    xytext=(sim.L + 0.1, (EGL_ideal[-1] + EGL_plot[-1])/2),
-                    arrowprops=dict(arrowstyle='-[, widthB=0.5', color='red'),
-                    color='red', fontweight='bold', va='center')
-
-    ax.set_xlabel('Posição (m)', fontweight='bold')
-    ax.set_ylabel('Energia / Carga (m)', fontweight='bold')
-    ax.set_title('Balanço de Energia', fontweight='bold', pad=15)
-    ax.set_xlim(0, sim.L * 1.15)
-    ax.set_ylim(bottom=0)
-    ax.legend(loc='lower left', frameon=True)
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-    ax.grid(True, alpha=0.2, linestyle='--')
-    return fig
+    return FiguraLinhasEnergia().atualizar(sim, dpi)
+
+
+# Cache de PNGs por (figura, estado da simulação); persistido pelo cache quente
+FIGURAS = {
+    'diagrama': FiguraDiagramaVenturi,
+    'perfil_pressao': FiguraPerfilPressao,
+    'linhas_energia': FiguraLinhasEnergia,
+}
+MAX_FIGURAS_CACHE = 256
+
+_cache_figuras = OrderedDict()
+_figuras_reutilizaveis = {}
+_trava_figuras = threading.Lock()
+
+
+def _chave_figura(nome, sim, dpi):
+    """Chave do estado que define a figura (floats com 12 algarismos significativos)."""
+    valores = (sim.D1, sim.D2, sim.L_garganta, sim.rho, sim.rho_m, sim.Q, sim.f, sim.mu,
+               sim.P1, sim.angulo_convergente, sim.angulo_divergente)
+    return (nome, sim.mode, sim.coeficientes, sim.gas, dpi) + tuple(float(f'{float(v):.12g}') for v in valores)
+
+
+def figura_png(nome, sim, figuras=None, dpi=DPI_PADRAO):
+    """
+    PNG de uma figura (`FIGURAS`) para o estado do simulador, com cache LRU.
+
+    Renderiza como `st.pyplot` (bbox justo, dpi 200). As figuras são
+    reaproveitadas e apenas atualizadas: as de `figuras` (ex.: um dicionário
+    guardado em `st.session_state`, um por sessão) ou, sem ele, uma instância
+    compartilhada por processo. Estados repetidos não são redesenhados.
+
+    Returns:
+        bytes do PNG
+    """
+    chave = _chave_figura(nome, sim, dpi)
+    with _trava_figuras:
+        png = _cache_figuras.get(chave)
+        if png is not None:
+            _cache_figuras.move_to_end(chave)
+            return png
+
+    if figuras is None:
+        with _trava_figuras:
+            png = _renderizar_png(_figuras_reutilizaveis, nome, sim, dpi)
+    else:
+        png = _renderizar_png(figuras, nome, sim, dpi)
+
+    with _trava_figuras:
+        _cache_figuras[chave] = png
+        if len(_cache_figuras) > MAX_FIGURAS_CACHE:
+            _cache_figuras.popitem(last=False)
+    return png
 
 
+def _renderizar_png(figuras, nome, sim, dpi):
+    if nome not in figuras:
+        figuras[nome] = FIGURAS[nome]()
+    return figura_para_png(figuras[nome].atualizar(sim, dpi), dpi)
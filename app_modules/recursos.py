@@ -0,0 +1,52 @@
+"""
+Medidores de recursos do processo: figuras vivas, caches e memória residente.
+
+Usado para monitorar pods sob carga (ver a aba "Sobre o Projeto") e para
+diagnosticar crescimento de memória.
+"""
+import gc
+import os
+import resource
+
+from app_modules import fluidos, plots
+
+
+def rss_bytes():
+    """Memória residente atual do processo (bytes).
+
+    Lê /proc/self/statm (Linux); em outros sistemas retorna o pico
+    (ru_maxrss), que é o melhor disponível sem dependências extras.
+    """
+    try:
+        with open('/proc/self/statm') as arquivo:
+            residentes = int(arquivo.read().split()[1])
+        return residentes * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux informa KiB; macOS, bytes
+        return pico if os.uname().sysname == 'Darwin' else pico * 1024
+
+
+def metricas(coletar=False):
+    """
+    Contadores de figuras, caches e memória do processo.
+
+    Args:
+        coletar: Executa o coletor de lixo antes de contar (figuras órfãs
+            presas em ciclos deixam de ser contadas)
+
+    Returns:
+        dict com figuras_vivas, figuras_em_cache, bytes_figuras_em_cache,
+        propriedades_em_cache e rss_bytes
+    """
+    if coletar:
+        gc.collect()
+    with plots._trava_figuras:
+        pngs = list(plots._cache_figuras.values())
+    return {
+        'figuras_vivas': plots.contar_figuras_vivas(),
+        'figuras_em_cache': len(pngs),
+        'bytes_figuras_em_cache': sum(len(png) for png in pngs),
+        'propriedades_em_cache': len(fluidos._cache_propriedades),
+        'rss_bytes': rss_bytes(),
+    }
@@ -0,0 +1,235 @@
+import warnings
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import spsolve
+
+from app_modules.atrito import RE_TRANSICAO, fator_atrito
+from app_modules.simulator import ANGULO_DIVERGENTE, VenturiSimulator, coeficiente_perda_venturi
+
+
+G = 9.81
+
+TIPO_TUBO = 0
+TIPO_VENTURI = 1
+
+
+class ResultadoRede:
+    """Vazões nos trechos e pressões nos nós de uma rede resolvida."""
+
+    def __init__(self, rede, Q, H, f, iteracoes, residuo, convergiu=True):
+        self.nos = list(rede._nomes_nos)
+        self.Q = Q
+        self.H = H
+        self.f = f
+        self.iteracoes = iteracoes
+        self.residuo = residuo
+        self.convergiu = convergiu
+
+        cotas = np.asarray(rede._cotas)
+        self.pressoes = (H - cotas) * rede.rho * G
+
+        # Grandezas de medição de cada Venturi (sentido do escoamento respeitado)
+        self.venturis = None
+        idx = np.flatnonzero(rede._tipos_array() == TIPO_VENTURI)
+        if idx.size:
+            origem = np.asarray(rede._origens)[idx]
+            destino = np.asarray(rede._destinos)[idx]
+            sentido_direto = Q[idx] >= 0
+            no_entrada = np.where(sentido_direto, origem, destino)
+
+            sim = VenturiSimulator()
+            sim.calcular(
+                np.asarray(rede._D1)[idx],
+                np.asarray(rede._D2)[idx],
+                np.asarray(rede._L)[idx],
+                rede.rho,
+                np.asarray(rede._rho_m)[idx],
+                np.abs(Q[idx]),
+                0,
+                f[idx],
+                'Realista',
+                rede.mu,
+                self.pressoes[no_entrada],
+                angulo_divergente=np.asarray(rede._angulo)[idx],
+            )
+            self.venturis = {
+                'trecho': idx,
+                'nome': [rede._nomes_trechos[i] for i in idx],
+                'sim': sim,
+            }
+
+
+class RedeTubulacoes:
+    """
+    Rede de tubulações com medidores de Venturi representados como trechos.
+
+    Os nós guardam cota e demanda (consumo, m³/s); reservatórios têm pressão
+    fixa. Tubos usam Darcy-Weisbach e Venturis o mesmo modelo de perdas do
+    `VenturiSimulator` (entrada, atrito na garganta e difusor cônico).
+    """
+
+    def __init__(self, rho, mu):
+        self.rho = rho
+        self.mu = mu
+
+        self._nomes_nos = []
+        self._indice_nos = {}
+        self._cotas = []
+        self._demandas = []
+        self._pressao_fixa = []
+
+        self._nomes_trechos = []
+        self._tipos = []
+        self._origens = []
+        self._destinos = []
+        self._D1 = []
+        self._D2 = []
+        self._L = []
+        self._epsilon = []
+        self._rho_m = []
+        self._angulo = []
+
+    def _registrar_no(self, nome, cota, demanda, pressao):
+        if nome in self._indice_nos:
+            raise ValueError(f"Nó '{nome}' já existe na rede.")
+        self._indice_nos[nome] = len(self._nomes_nos)
+        self._nomes_nos.append(nome)
+        self._cotas.append(float(cota))
+        self._demandas.append(float(demanda))
+        self._pressao_fixa.append(pressao)
+
+    def adicionar_no(self, nome, cota=0.0, demanda=0.0):
+        self._registrar_no(nome, cota, demanda, None)
+
+    def adicionar_reservatorio(self, nome, pressao, cota=0.0):
+        """Nó de pressão manométrica fixa (Pa), como tanques ou bombas ideais."""
+        self._registrar_no(nome, cota, 0.0, float(pressao))
+
+    def _registrar_trecho(self, nome, tipo, origem, destino, D1, D2, L, epsilon, rho_m,
+                          angulo=ANGULO_DIVERGENTE):
+        for no in (origem, destino):
+            if no not in self._indice_nos:
+                raise ValueError(f"Nó '{no}' não existe na rede.")
+        self._nomes_trechos.append(nome)
+        self._tipos.append(tipo)
+        self._origens.append(self._indice_nos[origem])
+        self._destinos.append(self._indice_nos[destino])
+        self._D1.append(float(D1))
+        self._D2.append(float(D2))
+        self._L.append(float(L))
+        self._epsilon.append(float(epsilon))
+        self._rho_m.append(float(rho_m))
+        self._angulo.append(float(angulo))
+
+    def adicionar_tubo(self, nome, origem, destino, D, L, epsilon=0.000045):
+        self._registrar_trecho(nome, TIPO_TUBO, origem, destino, D, D, L, epsilon, np.nan)
+
+    def adicionar_venturi(self, nome, origem, destino, D1, D2, L_garganta,
+                          epsilon=0.000045, rho_m=13600.0, angulo_divergente=ANGULO_DIVERGENTE):
+        if not 1 < D1 / D2 <= 2:
+            raise ValueError(f"Venturi '{nome}': D₁/D₂ deve estar entre 1 e 2.")
+        self._registrar_trecho(nome, TIPO_VENTURI, origem, destino, D1, D2,
+                               L_garganta, epsilon, rho_m, angulo_divergente)
+
+    def _tipos_array(self):
+        return np.asarray(self._tipos, dtype=np.int8)
+
+    def _resistencias(self, Q, D1, D2, L, epsilon, angulo, venturi):
+        """Resistência r de cada trecho, com h = r·Q|Q|, e o fator de atrito."""
+        A = np.pi * (D2 / 2) ** 2
+        v = np.abs(Q) / A
+        Re = self.rho * v * D2 / self.mu
+        f = fator_atrito(Re, epsilon / D2, interpolar_transicao=True)
+
+        K = np.where(venturi,
+                     coeficiente_perda_venturi(D1, D2, L, f, angulo_divergente=angulo),
+                     f * L / D2)
+        r = K / (2 * G * A**2)
+
+        # dh/dQ: 2·r|Q| no regime turbulento; no laminar f ∝ 1/Q e h é linear em Q
+        expoente = np.where(Re < RE_TRANSICAO[0], 1.0, 2.0)
+        return r, f, expoente
+
+    def resolver(self, tol=1e-8, max_iter=200):
+        """
+        Resolve vazões e cargas pelo Método do Gradiente Global (Newton).
+
+        A cada iteração o sistema de Schur A₁ᵀG⁻¹A₁·ΔH = b é montado como
+        matriz esparsa e o atrito é reavaliado com o Reynolds de cada trecho.
+
+        Returns:
+            ResultadoRede com vazões (m³/s), cargas (m) e pressões (Pa);
+            sem convergência em `max_iter` iterações, `convergiu` é False e
+            um RuntimeWarning é emitido
+        """
+        n_nos = len(self._nomes_nos)
+        m = len(self._nomes_trechos)
+        if m == 0:
+            raise ValueError("A rede não possui trechos.")
+
+        fixo = np.array([p is not None for p in self._pressao_fixa])
+        if not fixo.any():
+            raise ValueError("A rede precisa de ao menos um reservatório (pressão fixa).")
+
+        cotas = np.asarray(self._cotas)
+        demandas = np.asarray(self._demandas)
+        H = cotas.copy()
+        H[fixo] = cotas[fixo] + np.array(
+            [p for p in self._pressao_fixa if p is not None]) / (self.rho * G)
+
+        origens = np.asarray(self._origens)
+        destinos = np.asarray(self._destinos)
+        D1 = np.asarray(self._D1)
+        D2 = np.asarray(self._D2)
+        L = np.asarray(self._L)
+        epsilon = np.asarray(self._epsilon)
+        angulo = np.asarray(self._angulo)
+        venturi = self._tipos_array() == TIPO_VENTURI
+
+        # Matriz de incidência trecho × nó: +1 na origem, -1 no destino
+        linhas = np.concatenate([np.arange(m), np.arange(m)])
+        colunas = np.concatenate([origens, destinos])
+        valores = np.concatenate([np.ones(m), -np.ones(m)])
+        A = sp.csr_matrix((valores, (linhas, colunas)), shape=(m, n_nos))
+
+        livres = np.flatnonzero(~fixo)
+        A1 = A[:, livres].tocsc()
+        A0 = A[:, np.flatnonzero(fixo)]
+        H0 = H[fixo]
+        d = demandas[livres]
+
+        # Chute inicial: 1 m/s em todos os trechos
+        Q = np.pi * (D2 / 2) ** 2 * 1.0
+
+        residuo = np.inf
+        iteracoes = 0
+        for iteracoes in range(1, max_iter + 1):
+            r, f, expoente = self._resistencias(Q, D1, D2, L, epsilon, angulo, venturi)
+            derivada = np.maximum(expoente * r * np.abs(Q), 1e-12)
+            inv_G = 1.0 / derivada
+
+            e = A1 @ H[livres] + A0 @ H0 - r * Q * np.abs(Q)
+            c = -d - A1.T @ Q
+
+            M = (A1.T @ sp.diags(inv_G) @ A1).tocsc()
+            b = c - A1.T @ (inv_G * e)
+            dH = np.atleast_1d(spsolve(M, b, permc_spec='MMD_AT_PLUS_A'))
+            dQ = inv_G * (e + A1 @ dH)
+
+            # Critério do EPANET: Σ|ΔQ| / Σ|Q|
+            residuo = np.sum(np.abs(dQ)) / max(np.sum(np.abs(Q + dQ)), 1e-12)
+
+            H[livres] += dH
+            Q += dQ
+
+            if residuo < tol:
+                break
+
+        convergiu = bool(residuo < tol)
+        if not convergiu:
+            warnings.warn(f"Rede não convergiu em {max_iter} iterações (resíduo {residuo:.2e} ≥ {tol:.0e}).",
+                          RuntimeWarning, stacklevel=2)
+
+        r, f, _ = self._resistencias(Q, D1, D2, L, epsilon, angulo, venturi)
+        return ResultadoRede(self, Q, H, f, iteracoes, residuo, convergiu)
@@ -0,0 +1,280 @@
+"""
+Regressão de saídas de referência com orçamento de latência por caso.
+
+O corpus (`dados/casos_regressao.json`) cobre os dois modos, os cinco fluidos,
+todos os materiais e a faixa 1 < D₁/D₂ ≤ 2 aceita pela validação de `main()`.
+Cada caso guarda as saídas esperadas do `VenturiSimulator` e um orçamento de
+tempo para o caminho escalar (sequência de `main()`) e para o vetorizado
+(`simular_lote`); os valores são conferidos também pela comparação de
+cenários (`ComparadorCenarios` e `tabela_comparacao`). Uso:
+
+    python -m app_modules.regressao verificar
+    python -m app_modules.regressao gerar      # só quando os números mudam de propósito
+"""
+import argparse
+import itertools
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app_modules.atrito import MATERIAIS_RUGOSIDADE, obter_rugosidade_material
+from app_modules.cenarios import PARAMETROS, ComparadorCenarios, tabela_comparacao
+from app_modules.fluidos import FLUIDOS, propriedades_fluido
+from app_modules.lote import simular_lote
+from app_modules.simulator import VenturiSimulator
+from app_modules.validacao import VALIDO, validar
+
+
+CORPUS_PADRAO = Path(__file__).resolve().parent / 'dados' / 'casos_regressao.json'
+
+SAIDAS = ('P2', 'P2_fim', 'P3', 'delta_h', 'h_L', 'Re', 'f')
+
+RTOL = 1e-9
+ATOL = 1e-9
+
+# Orçamento = max(piso, fator × tempo medido na geração do corpus)
+FATOR_ORCAMENTO = 20.0
+PISO_ESCALAR_MS = 2.0
+PISO_VETORIZADO_MS = 0.05
+REPETICOES = 5
+
+# Eixos do corpus
+GEOMETRIAS = ((0.05, 0.025), (0.06, 0.04), (0.10, 0.05), (0.10, 0.09), (0.20, 0.12), (0.30, 0.15))
+VAZOES = (0.005, 0.02, 0.05)
+TEMPERATURAS = {'water': (20, 60), 'air': (20, 60), 'ethanol': (20, 60),
+                'glycerol': (20, 100), 'n-octane': (20, 60)}
+ANGULOS = ((15, 15), (7, 30), (30, 7), (45, 45), (10, 21))
+PRESSOES = (0.0, 50000.0, -20000.0)
+RHO_M = 13600.0
+L_GARGANTA = (0.1, 1.0, 3.0)
+
+
+def simular_escalar(caso):
+    """
+    Caminho escalar: a sequência de `main()` para um caso.
+
+    Returns:
+        dict saída → valor (mais rho e mu)
+    """
+    rho, mu = propriedades_fluido(caso['fluido'], caso['T_C'] + 273.15, caso['P1'] + 101325.0)
+    sim = VenturiSimulator()
+    sim.calcular(caso['D1'], caso['D2'], caso['L'], rho, caso['rho_m'], caso['Q'], 0, None, caso['mode'], mu,
+                 caso['P1'], caso['angulo_convergente'], caso['angulo_divergente'],
+                 epsilon=obter_rugosidade_material(caso['material']))
+
+    saidas = {nome: float(getattr(sim, nome)) for nome in SAIDAS}
+    saidas.update(rho=float(rho), mu=float(mu))
+    return saidas
+
+
+def simular_vetorizado(casos):
+    """
+    Caminho vetorizado: uma chamada de `simular_lote` por modo.
+
+    Returns:
+        (saídas, tempos): dict saída → array alinhado a `casos` e
+        dict modo → segundos da chamada
+    """
+    def coluna(nome, selecao):
+        return np.array([casos[i][nome] for i in selecao], dtype=float)
+
+    saidas = {nome: np.full(len(casos), np.nan) for nome in SAIDAS}
+    tempos = {}
+    for mode in ('Ideal', 'Realista'):
+        selecao = [i for i, caso in enumerate(casos) if caso['mode'] == mode]
+        if not selecao:
+            continue
+        propriedades = np.array([propriedades_fluido(casos[i]['fluido'], casos[i]['T_C'] + 273.15,
+                                                     casos[i]['P1'] + 101325.0) for i in selecao])
+        epsilon = np.array([obter_rugosidade_material(casos[i]['material']) for i in selecao])
+
+        inicio = time.perf_counter()
+        resultado = simular_lote(coluna('D1', selecao), coluna('D2', selecao), coluna('L', selecao),
+                                 coluna('Q', selecao), propriedades[:, 0], propriedades[:, 1], epsilon,
+                                 coluna('rho_m', selecao), mode, coluna('P1', selecao),
+                                 coluna('angulo_convergente', selecao),
+                                 coluna('angulo_divergente', selecao))
+        tempos[mode] = time.perf_counter() - inicio
+
+        for nome in SAIDAS:
+            saidas[nome][selecao] = resultado[nome]
+    return saidas, tempos
+
+
+def simular_cenarios(casos):
+    """
+    Caminho da comparação de cenários: todos os casos em um `ComparadorCenarios`,
+    com a tabela de comparação montada (como na aba de cenários).
+
+    Returns:
+        dict saída → array alinhado a `casos` (NaN nos cenários rejeitados)
+    """
+    comparador = ComparadorCenarios()
+    for caso in casos:
+        comparador.definir(caso['id'], {chave: caso[chave] for chave in PARAMETROS})
+    resultados = comparador.avaliar()
+    tabela_comparacao(resultados)
+
+    saidas = {nome: np.full(len(casos), np.nan) for nome in SAIDAS}
+    for i, resultado in enumerate(resultados):
+        if resultado.sim is not None:
+            for nome in SAIDAS:
+                saidas[nome][i] = resultado.sim.calcular_reynolds() if nome == 'Re' else getattr(resultado.sim, nome)
+    return saidas
+
+
+def _tempo_minimo_ms(funcao, *args, repeticoes=REPETICOES):
+    melhor = np.inf
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(*args)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor * 1000
+
+
+def _tempos_vetorizados_ms(casos, repeticoes=REPETICOES):
+    """Tempo por caso do caminho vetorizado (chamada do modo dividida pelos casos)."""
+    melhores = {}
+    for _ in range(repeticoes):
+        _, tempos = simular_vetorizado(casos)
+        for mode, t in tempos.items():
+            melhores[mode] = min(melhores.get(mode, np.inf), t)
+    contagem = {mode: sum(caso['mode'] == mode for caso in casos) for mode in melhores}
+    return [melhores[caso['mode']] * 1000 / contagem[caso['mode']] for caso in casos]
+
+
+def gerar_casos():
+    """
+    Casos válidos do corpus, sem as saídas esperadas.
+
+    Percorre modos × fluidos × materiais × geometrias; temperatura, ângulos,
+    P₁ e comprimento da garganta alternam entre os casos, e a vazão é a
+    primeira (em rodízio) que passa na validação de `main()`.
+    """
+    casos = []
+    combinacoes = itertools.product(('Ideal', 'Realista'), FLUIDOS.values(), MATERIAIS_RUGOSIDADE,
+                                    GEOMETRIAS)
+    for n, (mode, fluido, material, (D1, D2)) in enumerate(combinacoes):
+        angulo_convergente, angulo_divergente = ANGULOS[n % len(ANGULOS)]
+        base = {
+            'mode': mode, 'fluido': fluido, 'material': material,
+            'T_C': TEMPERATURAS[fluido][n % 2], 'D1': D1, 'D2': D2,
+            'L': L_GARGANTA[n % len(L_GARGANTA)], 'P1': PRESSOES[n % len(PRESSOES)],
+            'rho_m': RHO_M, 'angulo_convergente': angulo_convergente,
+            'angulo_divergente': angulo_divergente,
+        }
+        rho, mu = propriedades_fluido(fluido, base['T_C'] + 273.15, base['P1'] + 101325.0)
+        # Vazões em rodízio a partir de n; vale a primeira aceita
+        Q = np.roll(VAZOES, -(n % len(VAZOES)))
+        Re = rho * (Q / (np.pi * (D2 / 2) ** 2)) * D2 / mu
+        aceitas = np.flatnonzero(validar(D1, D2, rho, RHO_M, Re, mode) == VALIDO)
+        if aceitas.size:
+            casos.append({'id': f'{mode}-{fluido}-{material}-{D1:g}-{D2:g}', **base, 'Q': float(Q[aceitas[0]])})
+    return casos
+
+
+def gerar_corpus(caminho=CORPUS_PADRAO):
+    """Calcula saídas esperadas e orçamentos de tempo e grava o corpus em JSON."""
+    casos = gerar_casos()
+    tempos_vetorizados = _tempos_vetorizados_ms(casos)
+    for caso, t_vetorizado in zip(casos, tempos_vetorizados):
+        caso['esperado'] = simular_escalar(caso)
+        caso['orcamento_ms'] = {
+            'escalar': round(max(PISO_ESCALAR_MS, FATOR_ORCAMENTO * _tempo_minimo_ms(simular_escalar, caso)), 3),
+            'vetorizado': round(max(PISO_VETORIZADO_MS, FATOR_ORCAMENTO * t_vetorizado), 4),
+        }
+
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump({'rtol': RTOL, 'atol': ATOL, 'casos': casos}, arquivo, ensure_ascii=False, indent=1)
+    return casos
+
+
+def carregar_corpus(caminho=CORPUS_PADRAO):
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def _desvios(caso_id, caminho, obtido, esperado, rtol, atol):
+    falhas = []
+    for nome in SAIDAS:
+        if not np.isclose(obtido[nome], esperado[nome], rtol=rtol, atol=atol):
+            falhas.append(f"{caso_id} [{caminho}] {nome}: obtido {obtido[nome]!r}, esperado {esperado[nome]!r}")
+    return falhas
+
+
+def verificar(corpus=None, fator_tempo=1.0, tempo=True):
+    """
+    Confere os dois caminhos contra o corpus.
+
+    Args:
+        corpus: dict carregado do JSON (padrão: `CORPUS_PADRAO`)
+        fator_tempo: Multiplicador dos orçamentos (máquinas mais lentas)
+        tempo: Se False, confere apenas os valores
+
+    Returns:
+        Lista de falhas (vazia quando tudo passa)
+    """
+    corpus = corpus or carregar_corpus()
+    casos, rtol, atol = corpus['casos'], corpus['rtol'], corpus['atol']
+    falhas = []
+
+    # Aquece os caches de propriedades antes de medir
+    for caso in casos:
+        propriedades_fluido(caso['fluido'], caso['T_C'] + 273.15, caso['P1'] + 101325.0)
+
+    for caso in casos:
+        falhas += _desvios(caso['id'], 'escalar', simular_escalar(caso), caso['esperado'], rtol, atol)
+        if tempo:
+            gasto = _tempo_minimo_ms(simular_escalar, caso)
+            orcamento = caso['orcamento_ms']['escalar'] * fator_tempo
+            if gasto > orcamento:
+                falhas.append(f"{caso['id']} [escalar] tempo {gasto:.3f} ms > orçamento {orcamento:.3f} ms")
+
+    vetorizado, _ = simular_vetorizado(casos)
+    for i, caso in enumerate(casos):
+        obtido = {nome: float(vetorizado[nome][i]) for nome in SAIDAS}
+        falhas += _desvios(caso['id'], 'vetorizado', obtido, caso['esperado'], rtol, atol)
+
+    cenarios = simular_cenarios(casos)
+    for i, caso in enumerate(casos):
+        obtido = {nome: float(cenarios[nome][i]) for nome in SAIDAS}
+        falhas += _desvios(caso['id'], 'cenarios', obtido, caso['esperado'], rtol, atol)
+
+    if tempo:
+        gastos = _tempos_vetorizados_ms(casos)
+        for caso, gasto in zip(casos, gastos):
+            orcamento = caso['orcamento_ms']['vetorizado'] * fator_tempo
+            if gasto > orcamento:
+                falhas.append(f"{caso['id']} [vetorizado] tempo {gasto:.4f} ms/caso > orçamento {orcamento:.4f} ms")
+    return falhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regressão das saídas do simulador.")
+    parser.add_argument('acao', choices=('verificar', 'gerar'))
+    parser.add_argument('--corpus', default=str(CORPUS_PADRAO), help="Arquivo JSON do corpus")
+    parser.add_argument('--fator-tempo', type=float, default=1.0,
+                        help="Multiplicador dos orçamentos de latência")
+    parser.add_argument('--sem-tempo', action='store_true', help="Confere apenas os valores")
+    args = parser.parse_args()
+
+    if args.acao == 'gerar':
+        casos = gerar_corpus(args.corpus)
+        print(f"{len(casos)} casos gravados em {args.corpus}")
+        return
+
+    corpus = carregar_corpus(args.corpus)
+    falhas = verificar(corpus, args.fator_tempo, tempo=not args.sem_tempo)
+    for falha in falhas:
+        print(falha)
+    print(f"{len(corpus['casos'])} casos, {len(falhas)} falhas")
+    sys.exit(1 if falhas else 0)
+
+
+if __name__ == '__main__':
+    main()
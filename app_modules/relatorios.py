@@ -0,0 +1,240 @@
+"""
+Geração em lote de relatórios de aceitação (sem interface gráfica).
+
+Para cada configuração de medidor são gravados o diagrama, o perfil de
+pressão, o balanço de energia (PNG/SVG) e a tabela da aba "Dados Completos"
+em CSV e JSON. Uso:
+
+    python -m app_modules.relatorios configuracoes.csv pasta_saida --processos 4
+"""
+import argparse
+import csv
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import numpy as np
+
+from app_modules.atrito import obter_rugosidade_material
+from app_modules.fluidos import propriedades_fluido
+from app_modules.lote import PADROES
+from app_modules.plots import FiguraDiagramaVenturi, FiguraLinhasEnergia, FiguraPerfilPressao
+from app_modules.simulator import VenturiSimulator
+from app_modules.validacao import VALIDO, mensagens, validar
+
+
+CAMPOS_TEXTO = ('id', 'mode', 'fluido', 'material')
+
+FIGURAS = ('diagrama', 'perfil_pressao', 'linhas_energia')
+
+
+def simular_configuracao(cfg):
+    """
+    Executa a mesma sequência de cálculo de `main()` para uma configuração.
+
+    Returns:
+        (sim, Re, erro): `erro` é None ou a mensagem de validação violada
+    """
+    cfg = {**PADROES, **cfg}
+    D1, D2, L, Q = (float(cfg[k]) for k in ('D1', 'D2', 'L', 'Q'))
+    P1 = float(cfg['P1'])
+    rho, mu = propriedades_fluido(cfg['fluido'], float(cfg['T_C']) + 273.15, P1 + 101325.0)
+    rho_m = float(cfg['rho_m'])
+    Re = None if rho is None or mu is None else rho * (Q / (np.pi * (D2 / 2) ** 2)) * D2 / mu
+
+    codigo = validar(D1, D2, rho, rho_m, Re, cfg['mode'])
+    if codigo != VALIDO:
+        return None, Re, ' '.join(mensagens(codigo))
+
+    sim = VenturiSimulator()
+    sim.calcular(D1, D2, L, rho, rho_m, Q, 0, None, cfg['mode'], mu, P1,
+                 float(cfg['angulo_convergente']), float(cfg['angulo_divergente']),
+                 epsilon=obter_rugosidade_material(cfg['material']))
+    return sim, sim.Re, None
+
+
+def dados_completos(sim, Re):
+    """Linhas (seção, grandeza, valor, unidade) da aba "Dados Completos"."""
+    linhas = [
+        ('Geometria', 'D1', sim.D1, 'm'),
+        ('Geometria', 'D2', sim.D2, 'm'),
+        ('Geometria', 'A1', sim.A1, 'm²'),
+        ('Geometria', 'A2', sim.A2, 'm²'),
+        ('Geometria', 'D1/D2', sim.D1 / sim.D2, '-'),
+        ('Geometria', 'L_garganta', sim.L_garganta, 'm'),
+        ('Geometria', 'L_entrada', sim.L_entrada, 'm'),
+        ('Geometria', 'L_saida', sim.L_saida, 'm'),
+        ('Geometria', 'L_total', sim.L, 'm'),
+        ('Geometria', 'angulo_convergente', sim.angulo_convergente, '°'),
+        ('Geometria', 'angulo_divergente', sim.angulo_divergente, '°'),
+        ('Fluido', 'rho', sim.rho, 'kg/m³'),
+        ('Fluido', 'mu', sim.mu, 'Pa·s'),
+        ('Fluido', 'rho_m', sim.rho_m, 'kg/m³'),
+        ('Velocidades', 'v1', sim.v1, 'm/s'),
+        ('Velocidades', 'v2', sim.v2, 'm/s'),
+        ('Velocidades', 'v2/v1', sim.v2 / sim.v1, '-'),
+        ('Pressões', 'P1', sim.P1, 'Pa'),
+        ('Pressões', 'P2', sim.P2, 'Pa'),
+        ('Pressões', 'P2_fim', sim.P2_fim, 'Pa'),
+        ('Pressões', 'P3', sim.P3, 'Pa'),
+        ('Pressões', 'delta_P', sim.delta_P, 'Pa'),
+        ('Medições', 'Q', sim.Q, 'm³/s'),
+        ('Medições', 'delta_h', sim.delta_h, 'm'),
+        ('Medições', 'Re', Re, '-'),
+        ('Medições', 'f', sim.f, '-'),
+        ('Energia', 'h_L', sim.h_L, 'm'),
+    ]
+    return [(secao, nome, float(valor), unidade) for secao, nome, valor, unidade in linhas]
+
+
+class RenderizadorRelatorio:
+    """
+    Mantém uma instância de cada figura e apenas atualiza seus dados.
+
+    Um renderizador por processo: as figuras são construídas uma vez e
+    reaproveitadas em todas as configurações atendidas pelo processo.
+    """
+
+    def __init__(self, formatos=('png', 'svg'), dpi=150):
+        self.formatos = formatos
+        self.dpi = dpi
+        self.figuras = {
+            'diagrama': FiguraDiagramaVenturi(),
+            'perfil_pressao': FiguraPerfilPressao(),
+            'linhas_energia': FiguraLinhasEnergia(),
+        }
+
+    def gerar(self, cfg, pasta_saida):
+        identificador = str(cfg['id'])
+        sim, Re, erro = simular_configuracao(cfg)
+        if erro is not None:
+            return {'id': identificador, 'status': 'invalido', 'erro': erro}
+
+        pasta = Path(pasta_saida) / identificador
+        pasta.mkdir(parents=True, exist_ok=True)
+
+        for nome in FIGURAS:
+            fig = self.figuras[nome].atualizar(sim, self.dpi)
+            for formato in self.formatos:
+                fig.savefig(pasta / f'{nome}.{formato}', format=formato,
+                            dpi=self.dpi, bbox_inches='tight')
+
+        linhas = dados_completos(sim, Re)
+        with open(pasta / 'dados.csv', 'w', newline='', encoding='utf-8') as arquivo:
+            escritor = csv.writer(arquivo)
+            escritor.writerow(['secao', 'grandeza', 'valor', 'unidade'])
+            escritor.writerows(linhas)
+
+        resumo = {
+            'configuracao': {**PADROES, **cfg},
+            'resultados': {nome: valor for _, nome, valor, _ in linhas},
+        }
+        with open(pasta / 'dados.json', 'w', encoding='utf-8') as arquivo:
+            json.dump(resumo, arquivo, ensure_ascii=False, indent=2)
+
+        return {'id': identificador, 'status': 'ok', 'erro': '',
+                'delta_h': resumo['resultados']['delta_h'],
+                'h_L': resumo['resultados']['h_L']}
+
+
+# Estado por processo de trabalho
+_renderizador = None
+
+
+def _inicializar_processo(formatos, dpi):
+    global _renderizador
+    import matplotlib
+    matplotlib.use('Agg')
+    _renderizador = RenderizadorRelatorio(formatos, dpi)
+
+
+def _gerar_no_processo(cfg, pasta_saida):
+    try:
+        return _renderizador.gerar(cfg, pasta_saida)
+    except Exception as exc:
+        return {'id': str(cfg.get('id')), 'status': 'erro', 'erro': repr(exc)}
+
+
+def gerar_relatorios(configuracoes, pasta_saida, processos=None,
+                     formatos=('png', 'svg'), dpi=150, max_pendentes=None):
+    """
+    Gera os relatórios de um conjunto de configurações em paralelo.
+
+    `configuracoes` pode ser qualquer iterável (inclusive um gerador); no
+    máximo `max_pendentes` configurações ficam em voo ao mesmo tempo, de
+    modo que a memória não cresce com o tamanho da frota.
+
+    Returns:
+        Lista com o status de cada configuração (também gravada em indice.csv)
+    """
+    processos = processos or os.cpu_count() or 1
+    max_pendentes = max_pendentes or 2 * processos
+    pasta_saida = Path(pasta_saida)
+    pasta_saida.mkdir(parents=True, exist_ok=True)
+
+    campos = ['id', 'status', 'erro', 'delta_h', 'h_L']
+    status = []
+    with open(pasta_saida / 'indice.csv', 'w', newline='', encoding='utf-8') as arquivo_indice, \
+            ProcessPoolExecutor(processos, initializer=_inicializar_processo,
+                                initargs=(formatos, dpi)) as executor:
+        indice = csv.DictWriter(arquivo_indice, fieldnames=campos)
+        indice.writeheader()
+
+        def registrar(concluidos):
+            for futuro in concluidos:
+                linha = futuro.result()
+                indice.writerow(linha)
+                status.append(linha)
+
+        pendentes = set()
+        for cfg in configuracoes:
+            if len(pendentes) >= max_pendentes:
+                concluidos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                registrar(concluidos)
+            pendentes.add(executor.submit(_gerar_no_processo, cfg, str(pasta_saida)))
+        registrar(wait(pendentes).done)
+
+    return status
+
+
+def ler_configuracoes(caminho):
+    """
+    Lê configurações de um arquivo CSV ou JSON (lista de objetos).
+
+    Configurações sem `id` recebem 'medidor_NNNNN' pela posição no arquivo.
+    """
+    caminho = Path(caminho)
+    if caminho.suffix.lower() == '.json':
+        with open(caminho, encoding='utf-8') as arquivo:
+            configuracoes = json.load(arquivo)
+        for n, cfg in enumerate(configuracoes):
+            cfg.setdefault('id', f'medidor_{n:05d}')
+            yield cfg
+        return
+
+    with open(caminho, newline='', encoding='utf-8') as arquivo:
+        for n, linha in enumerate(csv.DictReader(arquivo)):
+            cfg = {k: (v if k in CAMPOS_TEXTO else float(v)) for k, v in linha.items() if v != ''}
+            cfg.setdefault('id', f'medidor_{n:05d}')
+            yield cfg
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera relatórios de aceitação em lote.")
+    parser.add_argument('configuracoes', help="Arquivo CSV ou JSON com as configurações")
+    parser.add_argument('saida', help="Pasta de saída")
+    parser.add_argument('--processos', type=int, default=None)
+    parser.add_argument('--formatos', default='png,svg')
+    parser.add_argument('--dpi', type=int, default=150)
+    args = parser.parse_args()
+
+    status = gerar_relatorios(ler_configuracoes(args.configuracoes), args.saida,
+                              processos=args.processos,
+                              formatos=tuple(args.formatos.split(',')), dpi=args.dpi)
+    falhas = sum(1 for s in status if s['status'] != 'ok')
+    print(f"{len(status)} configurações processadas, {falhas} com erro ou inválidas.")
+
+
+if __name__ == '__main__':
+    main()
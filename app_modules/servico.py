@@ -0,0 +1,424 @@
+"""
+Serviço local de conversões Q ↔ Δh com micro-lotes (asyncio, sem Streamlit).
+
+Outras ferramentas da planta pedem conversões por HTTP em localhost ou em um
+socket Unix. Pedidos que chegam dentro de uma janela curta são agrupados e
+avaliados por uma única chamada vetorizada de `simular_lote` por modo; cada
+pedido recebe a sua fatia do resultado. Uso:
+
+    python -m app_modules.servico --porta 8765 --janela-ms 2
+    python -m app_modules.servico --socket /tmp/venturi.sock
+
+Rotas (JSON):
+
+    POST /delta_h   {"D1": 0.1, "D2": 0.05, "L": 1.0, "Q": 0.02, ...}
+    POST /vazao     {"D1": 0.1, "D2": 0.05, "L": 1.0, "delta_h": 0.4, ...}
+    GET  /metricas
+
+Campos numéricos aceitam número ou lista (broadcasting; listas são a forma
+eficiente de pedir muitas conversões de uma vez). Opcionais como nos
+relatórios: `mode`, `fluido`, `T_C`, `P1`, `rho_m`, `material` e ângulos.
+A resposta traz `Q`, `delta_h`, `delta_P`, `h_L`, `Re` e `status`
+(códigos de `validacao`), com o mesmo formato da entrada.
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+from app_modules.atrito import obter_rugosidade_material
+from app_modules.fluidos import propriedades_fluido, propriedades_por_pressao
+from app_modules.lote import PADROES, simular_lote
+from app_modules.simulator import vazao_de_desnivel
+
+
+JANELA_PADRAO_S = 0.002
+TAMANHO_MAXIMO_LOTE = 65536
+
+# Latências guardadas para os percentis de /metricas
+AMOSTRAS_LATENCIA = 10000
+
+OPERACOES = {'/delta_h': 'Q', '/vazao': 'delta_h'}
+CAMPOS_NUMERICOS = ('D1', 'D2', 'L', 'T_C', 'P1', 'rho_m', 'angulo_convergente', 'angulo_divergente')
+SAIDAS = ('Q', 'delta_h', 'delta_P', 'h_L', 'Re', 'status')
+
+
+class ErroPedido(ValueError):
+    """Pedido malformado (resposta 400)."""
+
+
+class _Pedido:
+    """Entradas de um pedido (floats, se escalar; arrays 1-D, se em lista), com o futuro da resposta."""
+
+    def __init__(self, entrada, colunas, forma, mode, futuro):
+        self.entrada = entrada          # 'Q' ou 'delta_h'
+        self.colunas = colunas
+        self.forma = forma
+        self.n = forma[0] if forma else 1
+        self.mode = mode
+        self.futuro = futuro
+        self.chegada = time.perf_counter()
+
+
+def _propriedades(fluido, T_C, P1):
+    """ρ e μ de um pedido: consulta ao cache para escalares, grade de temperatura por P1 distinto para arrays."""
+    if np.ndim(T_C) == 0 and np.ndim(P1) == 0:
+        rho, mu = propriedades_fluido(fluido, float(T_C) + 273.15, float(P1) + 101325.0)
+        if rho is None or mu is None:
+            return np.nan, np.nan
+        return rho, mu
+    return propriedades_por_pressao(fluido, np.asarray(T_C) + 273.15, np.asarray(P1) + 101325.0,
+                                    origem=273.15)
+
+
+def preparar_pedido(rota, corpo, futuro=None):
+    """
+    Valida o corpo JSON de uma rota e converte os campos em arrays.
+
+    Raises:
+        ErroPedido: Rota desconhecida, campos ausentes, valores inválidos ou
+            fluido/material desconhecido
+    """
+    if rota not in OPERACOES:
+        raise ErroPedido(f"Rota desconhecida: {rota}")
+    if not isinstance(corpo, dict):
+        raise ErroPedido("O corpo deve ser um objeto JSON.")
+    entrada = OPERACOES[rota]
+    faltando = [nome for nome in ('D1', 'D2', 'L', entrada) if nome not in corpo]
+    if faltando:
+        raise ErroPedido(f"Campos ausentes: {faltando}")
+
+    dados = {**PADROES, **corpo}
+    for nome in ('mode', 'fluido', 'material'):
+        if not isinstance(dados[nome], str):
+            raise ErroPedido(f"'{nome}' deve ser um texto único por pedido.")
+    if dados['mode'] not in ('Ideal', 'Realista'):
+        raise ErroPedido("'mode' deve ser 'Ideal' ou 'Realista'.")
+
+    valores = {nome: dados[nome] for nome in (*CAMPOS_NUMERICOS, entrada)}
+    if all(type(valor) in (int, float) for valor in valores.values()):
+        # Caminho comum (uma conversão): floats do Python, sem arrays por pedido
+        colunas, forma = {nome: float(valor) for nome, valor in valores.items()}, ()
+    else:
+        try:
+            colunas = {nome: np.asarray(valor, dtype=float) for nome, valor in valores.items()}
+            forma = np.broadcast_shapes(*(valor.shape for valor in colunas.values()))
+        except (TypeError, ValueError) as erro:
+            raise ErroPedido(f"Valores numéricos inválidos: {erro}") from None
+        if len(forma) > 1:
+            raise ErroPedido("Use números ou listas simples.")
+
+    try:
+        colunas['rho'], colunas['mu'] = _propriedades(dados['fluido'], colunas.pop('T_C'), colunas['P1'])
+        colunas['epsilon'] = obter_rugosidade_material(dados['material'])
+    except (KeyError, TypeError, ValueError) as erro:
+        # Fluido não reconhecido pelo thermo (ou material sem rugosidade)
+        raise ErroPedido(f"Fluido ou material inválido: {erro}") from None
+    if forma:
+        colunas = {nome: np.broadcast_to(valor, forma).ravel() for nome, valor in colunas.items()}
+    return _Pedido(entrada, colunas, forma, dados['mode'], futuro)
+
+
+def avaliar_pedidos(pedidos):
+    """
+    Avalia pedidos com uma chamada vetorizada de `simular_lote` por (modo, entrada).
+
+    Returns:
+        Lista de dicts de resposta, na ordem dos pedidos
+    """
+    respostas = [None] * len(pedidos)
+    grupos = {}
+    for i, pedido in enumerate(pedidos):
+        grupos.setdefault((pedido.mode, pedido.entrada), []).append(i)
+
+    for (mode, entrada), indices in grupos.items():
+        escalares = all(not pedidos[i].forma for i in indices)
+
+        def juntar(nome):
+            valores = [pedidos[i].colunas[nome] for i in indices]
+            if escalares:
+                return np.array(valores, dtype=float)
+            return np.concatenate([np.atleast_1d(valor) for valor in valores])
+
+        colunas = {nome: juntar(nome) for nome in pedidos[indices[0]].colunas}
+        if entrada == 'Q':
+            Q = colunas['Q']
+        else:
+            Q = vazao_de_desnivel(colunas['D1'], colunas['D2'], colunas['delta_h'], colunas['rho'],
+                                  colunas['rho_m'], mode)
+        resultado = simular_lote(colunas['D1'], colunas['D2'], colunas['L'], Q, colunas['rho'], colunas['mu'],
+                                 colunas['epsilon'], colunas['rho_m'], mode, colunas['P1'],
+                                 colunas['angulo_convergente'], colunas['angulo_divergente'])
+        saidas = {nome: resultado[nome] for nome in SAIDAS if nome != 'Q'}
+        saidas['Q'] = np.asarray(Q)
+        if entrada == 'delta_h':
+            saidas['delta_h'] = colunas['delta_h']
+
+        # Conversão para tipos do Python uma vez por grupo; cada pedido leva a sua fatia
+        listas = {nome: _para_lista(saidas[nome]) for nome in SAIDAS}
+        inicio = 0
+        for i in indices:
+            pedido = pedidos[i]
+            if pedido.forma:
+                respostas[i] = {nome: lista[inicio:inicio + pedido.n] for nome, lista in listas.items()}
+            else:
+                respostas[i] = {nome: lista[inicio] for nome, lista in listas.items()}
+            inicio += pedido.n
+    return respostas
+
+
+def _para_lista(valores):
+    """Lista do Python para o JSON; NaN e infinitos viram null."""
+    valores = np.asarray(valores)
+    if valores.dtype.kind == 'f' and not np.isfinite(valores).all():
+        valores = np.where(np.isfinite(valores), valores, None)
+    return valores.tolist()
+
+
+class ServicoMedicao:
+    """
+    Fila de pedidos e laço de micro-lotes.
+
+    Args:
+        janela: Tempo máximo (s) que o primeiro pedido de um lote espera
+            por outros antes da avaliação
+        tamanho_maximo: Conversões por lote; atingido o limite, o lote é
+            avaliado sem esperar a janela
+    """
+
+    def __init__(self, janela=JANELA_PADRAO_S, tamanho_maximo=TAMANHO_MAXIMO_LOTE):
+        self.janela = janela
+        self.tamanho_maximo = tamanho_maximo
+        self.fila = asyncio.Queue()
+        self.conversoes_na_fila = 0
+        self.latencias = deque(maxlen=AMOSTRAS_LATENCIA)
+        self.lotes = 0
+        self.pedidos = 0
+        self.conversoes = 0
+        self.erros = 0
+        self.inicio = time.perf_counter()
+        self._tarefa = None
+
+    def iniciar(self):
+        self._tarefa = asyncio.get_running_loop().create_task(self._laco_lotes())
+
+    async def parar(self):
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+
+    async def converter(self, rota, corpo):
+        """Enfileira um pedido e aguarda a resposta do seu lote."""
+        pedido = preparar_pedido(rota, corpo, asyncio.get_running_loop().create_future())
+        self.conversoes_na_fila += pedido.n
+        self.fila.put_nowait(pedido)
+        return await pedido.futuro
+
+    async def _laco_lotes(self):
+        while True:
+            pedidos = [await self.fila.get()]
+            n = pedidos[0].n
+            limite = pedidos[0].chegada + self.janela
+            while n < self.tamanho_maximo:
+                if self.fila.empty():
+                    restante = limite - time.perf_counter()
+                    if restante <= 0:
+                        break
+                    try:
+                        pedidos.append(await asyncio.wait_for(self.fila.get(), restante))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    pedidos.append(self.fila.get_nowait())
+                n += pedidos[-1].n
+            self.conversoes_na_fila -= n
+            self._responder(pedidos, n)
+
+    def _responder(self, pedidos, n):
+        try:
+            respostas = avaliar_pedidos(pedidos)
+        except Exception as erro:
+            for pedido in pedidos:
+                if not pedido.futuro.done():
+                    pedido.futuro.set_exception(erro)
+            return
+
+        agora = time.perf_counter()
+        for pedido, resposta in zip(pedidos, respostas):
+            if not pedido.futuro.done():
+                pedido.futuro.set_result(resposta)
+            self.latencias.append(agora - pedido.chegada)
+        self.lotes += 1
+        self.pedidos += len(pedidos)
+        self.conversoes += n
+
+    def metricas(self):
+        """Profundidade da fila, vazão de conversões e latências (ms) dos últimos pedidos."""
+        latencias = np.array(self.latencias) * 1000.0
+        decorrido = time.perf_counter() - self.inicio
+        percentis = {f'latencia_p{p}_ms': float(np.percentile(latencias, p)) if latencias.size else None
+                     for p in (50, 95, 99)}
+        return {
+            'pedidos_na_fila': self.fila.qsize(),
+            'conversoes_na_fila': self.conversoes_na_fila,
+            'lotes': self.lotes,
+            'pedidos': self.pedidos,
+            'conversoes': self.conversoes,
+            'erros': self.erros,
+            'conversoes_por_lote': self.conversoes / self.lotes if self.lotes else None,
+            'conversoes_por_segundo': self.conversoes / decorrido if decorrido > 0 else None,
+            'janela_ms': self.janela * 1000.0,
+            **percentis,
+        }
+
+    async def atender(self, leitor, escritor):
+        """Conexão HTTP/1.1 com keep-alive: um pedido por vez, em sequência."""
+        try:
+            while True:
+                linha = await leitor.readline()
+                if not linha:
+                    break
+                try:
+                    metodo, rota, _ = linha.decode('latin-1').split(' ', 2)
+                except ValueError:
+                    await _escrever(escritor, 400, {'erro': "Linha de pedido inválida."}, fechar=True)
+                    break
+
+                cabecalhos = {}
+                while (linha := await leitor.readline()) not in (b'\r\n', b'\n', b''):
+                    nome, _, valor = linha.decode('latin-1').partition(':')
+                    cabecalhos[nome.strip().lower()] = valor.strip()
+                corpo = await leitor.readexactly(int(cabecalhos.get('content-length', 0)))
+                fechar = cabecalhos.get('connection', '').lower() == 'close'
+
+                codigo, resposta = await self._rotear(metodo, rota, corpo)
+                await _escrever(escritor, codigo, resposta, fechar)
+                if fechar:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            escritor.close()
+
+    async def _rotear(self, metodo, rota, corpo):
+        if metodo == 'GET' and rota == '/metricas':
+            return 200, self.metricas()
+        if metodo != 'POST' or rota not in OPERACOES:
+            return 404, {'erro': f"Rota desconhecida: {metodo} {rota}"}
+        try:
+            return 200, await self.converter(rota, json.loads(corpo))
+        except (ErroPedido, json.JSONDecodeError) as erro:
+            self.erros += 1
+            return 400, {'erro': str(erro)}
+        except Exception as erro:
+            # Falha inesperada na avaliação: responde e mantém a conexão
+            self.erros += 1
+            return 500, {'erro': f"{type(erro).__name__}: {erro}"}
+
+
+async def _escrever(escritor, codigo, resposta, fechar=False):
+    corpo = json.dumps(resposta).encode()
+    razao = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error'}[codigo]
+    escritor.write(f"HTTP/1.1 {codigo} {razao}\r\nContent-Type: application/json\r\n"
+                   f"Content-Length: {len(corpo)}\r\nConnection: {'close' if fechar else 'keep-alive'}"
+                   f"\r\n\r\n".encode() + corpo)
+    await escritor.drain()
+
+
+async def iniciar_servidor(host='127.0.0.1', porta=8765, socket=None, janela=JANELA_PADRAO_S,
+                           tamanho_maximo=TAMANHO_MAXIMO_LOTE):
+    """
+    Cria o serviço e o servidor (TCP em `host:porta` ou socket Unix em `socket`).
+
+    Returns:
+        (servico, servidor): feche com `servidor.close()` e `await servico.parar()`
+    """
+    servico = ServicoMedicao(janela, tamanho_maximo)
+    servico.iniciar()
+    if socket is not None:
+        servidor = await asyncio.start_unix_server(servico.atender, path=socket)
+    else:
+        servidor = await asyncio.start_server(servico.atender, host, porta)
+    return servico, servidor
+
+
+class ClienteMedicao:
+    """Cliente HTTP mínimo (uma conexão keep-alive), para ferramentas e testes locais."""
+
+    def __init__(self, host='127.0.0.1', porta=8765, socket=None):
+        self.host, self.porta, self.socket = host, porta, socket
+        self._leitor = self._escritor = None
+
+    async def conectar(self):
+        if self.socket is not None:
+            self._leitor, self._escritor = await asyncio.open_unix_connection(self.socket)
+        else:
+            self._leitor, self._escritor = await asyncio.open_connection(self.host, self.porta)
+        return self
+
+    async def fechar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+            await self._escritor.wait_closed()
+
+    async def pedir(self, metodo, rota, corpo=None):
+        dados = b'' if corpo is None else json.dumps(corpo).encode()
+        self._escritor.write(f"{metodo} {rota} HTTP/1.1\r\nHost: localhost\r\n"
+                             f"Content-Length: {len(dados)}\r\n\r\n".encode() + dados)
+        await self._escritor.drain()
+
+        codigo = int((await self._leitor.readline()).split()[1])
+        tamanho = 0
+        while (linha := await self._leitor.readline()) not in (b'\r\n', b''):
+            nome, _, valor = linha.decode('latin-1').partition(':')
+            if nome.strip().lower() == 'content-length':
+                tamanho = int(valor)
+        resposta = json.loads(await self._leitor.readexactly(tamanho))
+        if codigo != 200:
+            raise ErroPedido(resposta.get('erro', f"HTTP {codigo}"))
+        return resposta
+
+    async def delta_h(self, **campos):
+        return await self.pedir('POST', '/delta_h', campos)
+
+    async def vazao(self, **campos):
+        return await self.pedir('POST', '/vazao', campos)
+
+    async def metricas(self):
+        return await self.pedir('GET', '/metricas')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serviço local de conversões Q ↔ Δh com micro-lotes.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--socket', default=None, help="Caminho de socket Unix (substitui host/porta)")
+    parser.add_argument('--janela-ms', type=float, default=JANELA_PADRAO_S * 1000.0)
+    parser.add_argument('--tamanho-maximo', type=int, default=TAMANHO_MAXIMO_LOTE)
+    args = parser.parse_args()
+
+    async def servir():
+        servico, servidor = await iniciar_servidor(args.host, args.porta, args.socket,
+                                                   args.janela_ms / 1000.0, args.tamanho_maximo)
+        endereco = args.socket or f"http://{args.host}:{args.porta}"
+        print(f"Serviço de medição em {endereco} (janela de {args.janela_ms:g} ms)")
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            await servico.parar()
+
+    try:
+        asyncio.run(servir())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,164 @@
+from dataclasses import dataclass
+
 import numpy as np
 
+from app_modules.atrito import resolver_atrito
+from app_modules.compressivel import estado_garganta
+
+
+K_ENTRADA = 0.04
+
+
+@dataclass(frozen=True)
+class CoeficientesPerda:
+    """Coeficientes do modelo Realista; os padrões são os valores de projeto.
+
+    Podem ser substituídos por valores calibrados em bancada
+    (ver `app_modules.calibracao`) para reproduzir um medidor específico.
+    """
+    k_entrada: float = K_ENTRADA
+    fator_difusor: float = 1.0
+
+
+COEFICIENTES_PADRAO = CoeficientesPerda()
+
+
+ANGULO_CONVERGENTE = 15.0
+ANGULO_DIVERGENTE = 15.0
+
+
+def _k_difusor_15_graus(AR):
+    """Correlação original do difusor cônico de 15° (Fox & McDonald)."""
+    cp_ideal = 1.0 - (1.0 / AR**2)
+
+    cp_real = np.where(
+        AR < 1.2,
+        1.4 * (AR - 1.0),
+        np.where(
+            AR > 4.0,
+            0.64,
+            (0.0394 * AR**3) - (0.3954 * AR**2) + (1.3095 * AR) - 0.7897,
+        ),
+    )
+
+    cp_real = np.maximum(0.0, np.minimum(cp_real, cp_ideal))
+
+    return np.maximum(0.0, cp_ideal - cp_real)
+
+
+def _fator_angulo_crane(angulo):
+    """Dependência angular da perda em expansões graduais (Crane TP-410)."""
+    angulo = np.asarray(angulo, dtype=float)
+    return np.where(angulo <= 45.0, 2.6 * np.sin(np.radians(angulo) / 2), 1.0)
+
+
+def _montar_tabela_difusor():
+    """
+    Tabela K_difusor(ângulo total, AR) pré-calculada na importação.
+
+    A linha de 15° é a correlação original; as demais escalam essa curva pela
+    razão de Crane K(θ)/K(15°), limitando a perda a C_p,ideal (C_p,real ≥ 0).
+    """
+    angulos = np.array([3.0, 5.0, 7.0, 10.0, 15.0, 21.0, 30.0, 45.0, 60.0, 90.0, 180.0])
+    AR = np.linspace(1.0, 9.0, 801)
+
+    razao = _fator_angulo_crane(angulos) / _fator_angulo_crane(15.0)
+    cp_ideal = 1.0 - 1.0 / AR**2
+    tabela = np.minimum(razao[:, None] * _k_difusor_15_graus(AR)[None, :], cp_ideal[None, :])
+    return angulos, AR, tabela
+
+
+_ANGULOS_TABELA, _AR_TABELA, _TABELA_K_DIFUSOR = _montar_tabela_difusor()
+
+# Cópias da tabela por tipo de ponto flutuante (float32 no modo compacto)
+_TABELAS_POR_TIPO = {np.dtype(np.float64): (_ANGULOS_TABELA, _AR_TABELA, _TABELA_K_DIFUSOR)}
+
+
+def _tabelas_difusor(dtype):
+    if dtype not in _TABELAS_POR_TIPO:
+        _TABELAS_POR_TIPO[dtype] = tuple(
+            x.astype(dtype) for x in (_ANGULOS_TABELA, _AR_TABELA, _TABELA_K_DIFUSOR))
+    return _TABELAS_POR_TIPO[dtype]
+
+
+def k_difusor(D1, D2, angulo=ANGULO_DIVERGENTE):
+    """Coeficiente de perda do difusor cônico (referido a v₂²/2g).
+
+    Interpolação bilinear vetorizada na tabela ângulo × razão de áreas;
+    valores fora da tabela são limitados às suas bordas. Aceita escalares
+    ou arrays NumPy; escalares retornam escalares. Diâmetros float32
+    produzem K em float32.
+    """
+    D1 = np.asarray(D1)
+    dtype = np.result_type(D1.dtype, np.asarray(D2).dtype, np.float32)
+    angulos_tabela, AR_tabela, tabela = _tabelas_difusor(dtype)
+
+    AR = (D1.astype(dtype, copy=False) / D2) ** 2
+    angulo = np.asarray(angulo, dtype=dtype)
+
+    # Eixo AR uniforme: índice calculado diretamente
+    passo_AR = AR_tabela[1] - AR_tabela[0]
+    pos_AR = np.clip((AR - AR_tabela[0]) / passo_AR, 0, len(AR_tabela) - 1)
+    j = np.minimum(pos_AR.astype(np.intp), len(AR_tabela) - 2)
+    t = pos_AR - j.astype(dtype)
+
+    # Eixo de ângulos não uniforme: busca binária
+    angulo = np.clip(angulo, angulos_tabela[0], angulos_tabela[-1])
+    i = np.clip(np.searchsorted(angulos_tabela, angulo, side='right') - 1, 0, len(angulos_tabela) - 2)
+    u = (angulo - angulos_tabela[i]) / (angulos_tabela[i + 1] - angulos_tabela[i])
+
+    k = ((1 - u) * ((1 - t) * tabela[i, j] + t * tabela[i, j + 1])
+         + u * ((1 - t) * tabela[i + 1, j] + t * tabela[i + 1, j + 1]))
+    return k[()]
+
+
+def coeficiente_perda_venturi(D1, D2, L_garganta, f, coeficientes=COEFICIENTES_PADRAO,
+                              angulo_divergente=ANGULO_DIVERGENTE):
+    """Coeficiente de perda permanente total do Venturi no modo Realista.
+
+    Soma entrada (K = 0.04), atrito na garganta (f·L/D₂) e difusor, todos
+    referidos à carga dinâmica da garganta, de modo que h_L = K·v₂²/2g.
+    """
+    D2 = np.asarray(D2, dtype=float)
+    K = (coeficientes.k_entrada + f * (L_garganta / D2)
+         + coeficientes.fator_difusor * k_difusor(D1, D2, angulo_divergente))
+    return np.asarray(K)[()]
+
+
+def vazao_de_desnivel(D1, D2, delta_h, rho, rho_m, mode='Realista', coeficientes=COEFICIENTES_PADRAO, g=9.81):
+    """Vazão (m³/s) que produz o desnível Δh no manômetro (inversa de `calcular`).
+
+    ΔP = Δh·(ρₘ − ρ)·g = ½ρQ²·[(1 + K_e)/A₂² − 1/A₁²]; o atrito da garganta
+    age depois da tomada de P₂ e não entra na medição. Vetorizada.
+    """
+    A1 = np.pi * (np.asarray(D1) / 2) ** 2
+    A2 = np.pi * (np.asarray(D2) / 2) ** 2
+    k_entrada = 0.0 if mode == 'Ideal' else coeficientes.k_entrada
+    delta_P = delta_h * (rho_m - rho) * g
+    with np.errstate(invalid='ignore'):
+        return np.sqrt(2 * delta_P / (rho * ((1 + k_entrada) / A2**2 - 1 / A1**2)))[()]
+
 
 class VenturiSimulator:
-    
-    def __init__(self):
-        self.g = 9.81  
-        
-    def calcular(self, D1, D2, L_garganta, rho, rho_m, Q, delta_h, f, mode, mu, P1):
+
+    def __init__(self, coeficientes=COEFICIENTES_PADRAO):
+        self.g = 9.81
+        self.coeficientes = coeficientes
+        # Definidos por `calcular`; simuladores montados atributo a atributo
+        # (fatias de lote) usam os padrões
+        self.Re = None
+        self.gas = None
+
+    def calcular(self, D1, D2, L_garganta, rho, rho_m, Q, delta_h, f, mode, mu, P1,
+                 angulo_convergente=ANGULO_CONVERGENTE, angulo_divergente=ANGULO_DIVERGENTE,
+                 epsilon=None, gas=None):
+        # Todos os parâmetros numéricos aceitam escalares ou arrays NumPy
+        # (com broadcasting), permitindo avaliar lotes em uma única chamada.
+        # Com f=None, o atrito é resolvido junto com o Reynolds da garganta
+        # (ε/D₂, a rugosidade relativa da seção onde o atrito atua), como em
+        # `main()` e nos lotes; `epsilon` é então obrigatório.
+        # Com gas (compressivel.EstadoGas), Q é a vazão nas condições de
+        # entrada e ΔP, ρ₂, T₂ e μ₂ seguem a expansão isentrópica na garganta.
         self.D1 = D1
         self.D2 = D2
         self.L_garganta = L_garganta
@@ -18,14 +170,71 @@ class VenturiSimulator:
         self.mode = mode
         self.mu=mu
         self.P1 = P1
-        
+        self.angulo_convergente = angulo_convergente
+        self.angulo_divergente = angulo_divergente
+
         self.A1 = np.pi * (self.D1 / 2) ** 2
         self.A2 = np.pi * (self.D2 / 2) ** 2
 
+        self.gas = gas
+        if gas is None:
+            v2, rho2, mu2 = self.Q / self.A2, self.rho, self.mu
+        else:
+            self._calcular_estado_garganta()
+            v2, rho2, mu2 = self.v2, self.rho2, self.mu2
+
+        self.epsilon = epsilon
+        if f is None:
+            if epsilon is None:
+                raise ValueError("Informe f ou a rugosidade epsilon para resolver o atrito.")
+            self.Re, self.f, self.iteracoes_atrito = resolver_atrito(v2, self.D2, rho2, mu2, epsilon)
+        else:
+            self.Re = None
+            self.iteracoes_atrito = None
+
         self._calcular_geometria_automatica()
-        
-        self._calcular_desnivel_de_vazao()
-     
+
+        if gas is None:
+            self._calcular_desnivel_de_vazao()
+        else:
+            self._calcular_desnivel_compressivel()
+
+    def _k_entrada(self):
+        return 0.0 if self.mode == 'Ideal' else self.coeficientes.k_entrada
+
+    def _calcular_estado_garganta(self):
+        estado = estado_garganta(self.Q, self.rho, self.D1, self.D2, self.P1, self.gas, self._k_entrada())
+        self.razao_pressoes = estado['tau']
+        self.expansibilidade = estado['expansibilidade']
+        self.delta_P = estado['delta_P']
+        self.rho2 = estado['rho2']
+        self.T2 = estado['T2']
+        self.v2 = estado['v2']
+        self.Mach2 = estado['Mach2']
+        self.mu2 = estado['mu2']
+
+    def _calcular_desnivel_compressivel(self):
+        # Mesmo balanço do modo incompressível, com as cargas dinâmicas da
+        # garganta em ρ₂ (ΔP e v₂ já vêm de `_calcular_estado_garganta`)
+        self.v1 = self.Q / self.A1
+        self.P2 = self.P1 - self.delta_P
+        carga_garganta = 0.5 * self.rho2 * self.v2**2
+
+        if self.mode == 'Ideal':
+            self.P2_fim = self.P2
+            self.P3 = self.P1
+            self.h_L = 0.0
+        else:
+            perda_garganta_Pa = self.f * (self.L_garganta / self.D2) * carga_garganta
+            self.P2_fim = self.P2 - perda_garganta_Pa
+            perda_entrada_Pa = self._k_entrada() * carga_garganta
+            perda_difusor_Pa = self._obter_k_difusor() * carga_garganta
+            self.P3 = self.P2_fim + (self.delta_P - perda_entrada_Pa) - perda_difusor_Pa
+            perda_total_Pa = perda_entrada_Pa + perda_garganta_Pa + perda_difusor_Pa
+            self.h_L = perda_total_Pa / (self.rho * self.g)
+
+        self.delta_h = self.delta_P / ((self.rho_m - self.rho) * self.g)
+
     def _calcular_desnivel_de_vazao(self):
         self.v1 = self.Q / self.A1
         self.v2 = self.Q / self.A2
@@ -33,9 +242,11 @@ class VenturiSimulator:
         if self.mode == 'Ideal':
             k_entrada = 0.0
         else:
-            k_entrada = 0.04
+            k_entrada = self.coeficientes.k_entrada
 
-        self.P2 = self.P1 - 0.5 * self.rho * ((self.v2**2 * (1 + k_entrada)) - self.v1**2)
+        # ΔP calculado diretamente (sem cancelamento P₁ - P₂ quando |P₁| ≫ ΔP)
+        self.delta_P = 0.5 * self.rho * ((self.v2**2 * (1 + k_entrada)) - self.v1**2)
+        self.P2 = self.P1 - self.delta_P
 
         if self.mode == 'Ideal':
             perda_garganta_Pa = 0.0
@@ -45,14 +256,12 @@ class VenturiSimulator:
 
         self.P2_fim = self.P2 - perda_garganta_Pa
 
-        self.delta_P = self.P1 - self.P2
-
         if self.mode == 'Ideal':
-            self.P3 = self.P1 
+            self.P3 = self.P1
             self.h_L = 0.0
         else:
             recuperacao_dinamica = 0.5 * self.rho * (self.v2**2 - self.v1**2)
-            K_difusor = self._obter_k_difusor_15_graus()
+            K_difusor = self._obter_k_difusor()
             perda_difusor_Pa = K_difusor * (0.5 * self.rho * self.v2**2)
             self.P3 = self.P2_fim + recuperacao_dinamica - perda_difusor_Pa
             perda_entrada_Pa = k_entrada * (0.5 * self.rho * self.v2**2)
@@ -60,67 +269,32 @@ class VenturiSimulator:
             self.h_L = perda_total_Pa / (self.rho * self.g)
 
         self.delta_h = self.delta_P / ((self.rho_m - self.rho) * self.g)
-    
+
     def _calcular_perda_carga_garganta(self):
         h_f_garganta = self.f * (self.L_garganta / self.D2) * (self.v2**2 / (2 * self.g))
-        
+
         return h_f_garganta
-    
+
     def calcular_reynolds(self):
+        if self.Re is not None:
+            return self.Re
+        if self.gas is not None:
+            return (self.rho2 * self.v2 * self.D2) / self.mu2
         Re = (self.rho * self.v2 * self.D2) / self.mu
         return Re
 
     def _calcular_geometria_automatica(self):
-        angulo_graus = 15.0
-        angulo_rad = np.radians(angulo_graus)
-        
-        delta_raio = (self.D1 - self.D2) / 2
-        
-        if delta_raio <= 0:
-            self.L_entrada = 0
-            self.L_saida = 0
-        else:
-            comprimento_cone = delta_raio / np.tan(angulo_rad / 2)
-            
-            self.L_entrada = comprimento_cone
-            self.L_saida = comprimento_cone
-        
-        self.L = self.L_entrada + self.L_garganta + self.L_saida
+        # Ângulos totais dos cones convergente e divergente
+        angulo_entrada_rad = np.radians(self.angulo_convergente)
+        angulo_saida_rad = np.radians(self.angulo_divergente)
 
-    def _obter_k_difusor_15_graus(self):
+        # Sem redução de diâmetro (delta_raio <= 0) os cones têm comprimento nulo
+        delta_raio = np.maximum((np.asarray(self.D1) - self.D2) / 2, 0.0)[()]
 
-        AR = (self.D1 / self.D2) ** 2
- 
-        cp_ideal = 1.0 - (1.0 / AR**2)
+        self.L_entrada = delta_raio / np.tan(angulo_entrada_rad / 2)
+        self.L_saida = delta_raio / np.tan(angulo_saida_rad / 2)
 
-        if AR < 1.2:
-            cp_real = 1.4 * (AR - 1.0)
-        elif AR > 4.0:
-            cp_real = 0.64
-        else:
-            cp_real = (0.0394 * AR**3) - (0.3954 * AR**2) + (1.3095 * AR) - 0.7897
-            
-        cp_real = max(0.0, min(cp_real, cp_ideal))
-        
-        k_difusor = cp_ideal - cp_real
-        
-        return max(0.0, k_difusor)
-    
-    def _obter_k_difusor_15_graus(self):
-
-        AR = (self.D1 / self.D2) ** 2
- 
-        cp_ideal = 1.0 - (1.0 / AR**2)
-
-        if AR < 1.2:
-            cp_real = 1.4 * (AR - 1.0)
-        elif AR > 4.0:
-            cp_real = 0.64
-        else:
-            cp_real = (0.0394 * AR**3) - (0.3954 * AR**2) + (1.3095 * AR) - 0.7897
-            
-        cp_real = max(0.0, min(cp_real, cp_ideal))
-        
-        k_difusor = cp_ideal - cp_real
-        
-        return max(0.0, k_difusor)
+        self.L = self.L_entrada + self.L_garganta + self.L_saida
+
+    def _obter_k_difusor(self):
+        return self.coeficientes.fator_difusor * k_difusor(self.D1, self.D2, self.angulo_divergente)
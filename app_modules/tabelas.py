@@ -0,0 +1,180 @@
+"""
+Interface de DataFrames: pontos de operação em colunas, resultados em colunas.
+
+Ferramentas externas entregam configurações como DataFrame do pandas (ou
+tabela do Arrow, sem importar o pyarrow aqui). As colunas numéricas seguem
+para `simular_lote` sem cópia quando já estão no tipo de trabalho; colunas
+de texto (modo, fluido, material) são codificadas uma vez e resolvidas por
+grupo, nunca por linha. O resultado é um DataFrame alinhado ao índice da
+entrada. Uso:
+
+    resultados = simular_dataframe(configuracoes)
+    configuracoes.join(resultados)
+"""
+import numpy as np
+import pandas as pd
+
+from app_modules.atrito import obter_rugosidade_material
+from app_modules.fluidos import (
+    pressao_vapor, pressao_vapor_interpolada, propriedades_fluido, propriedades_por_pressao,
+)
+from app_modules.lote import COLUNAS_CAVITACAO, COLUNAS_SAIDA, PADROES, simular_lote
+
+
+COLUNAS_OBRIGATORIAS = ('D1', 'D2', 'L', 'Q')
+
+# Colunas numéricas opcionais (ausentes = valor de PADROES)
+COLUNAS_NUMERICAS = ('T_C', 'P1', 'rho_m', 'angulo_convergente', 'angulo_divergente')
+
+COLUNAS_RESULTADO = COLUNAS_SAIDA + ('status',)
+
+
+def _eh_arrow(tabela):
+    return hasattr(tabela, 'schema') and hasattr(tabela, 'column_names')
+
+
+def _tem_coluna(tabela, nome):
+    return nome in (tabela.column_names if _eh_arrow(tabela) else tabela.columns)
+
+
+def _coluna_numerica(tabela, nome, tipo):
+    """Array da coluna no tipo de trabalho; visão sem cópia quando o tipo já coincide."""
+    if _eh_arrow(tabela):
+        # Um único bloco sem nulos é lido sem cópia; vários blocos são concatenados
+        valores = tabela.column(nome).to_numpy()
+    else:
+        valores = tabela[nome].to_numpy(dtype=tipo, copy=False, na_value=np.nan)
+    return np.asarray(valores, dtype=tipo)
+
+
+def _coluna_categorica(tabela, nome):
+    """(categorias, códigos) de uma coluna de texto; nulos recebem o valor padrão."""
+    if _eh_arrow(tabela):
+        coluna = tabela.column(nome).fill_null(PADROES[nome])
+        codificada = coluna.dictionary_encode().combine_chunks()
+        return codificada.dictionary.to_pylist(), codificada.indices.to_numpy()
+
+    coluna = tabela[nome]
+    if coluna.hasnans:
+        coluna = coluna.fillna(PADROES[nome])
+    if isinstance(coluna.dtype, pd.CategoricalDtype):
+        return list(coluna.cat.categories), coluna.cat.codes.to_numpy()
+    codigos, categorias = pd.factorize(coluna)
+    return list(categorias), codigos
+
+
+def _categorias(tabela, nome, n):
+    """Como `_coluna_categorica`, com o padrão como categoria única se a coluna não existe."""
+    if _tem_coluna(tabela, nome):
+        return _coluna_categorica(tabela, nome)
+    return [PADROES[nome]], np.zeros(n, dtype=np.intp)
+
+
+def _propriedades(tabela, n, T_C, P1, tipo):
+    """
+    ρ, μ e pressão de vapor: colunas `rho`/`mu`/`P_vapor` da entrada ou o
+    thermo por fluido (grade interpolada). Com `rho`/`mu` e sem `P_vapor`,
+    a pressão de vapor é None (sem análise de cavitação).
+    """
+    if _tem_coluna(tabela, 'rho') and _tem_coluna(tabela, 'mu'):
+        P_vapor = _coluna_numerica(tabela, 'P_vapor', tipo) if _tem_coluna(tabela, 'P_vapor') else None
+        return _coluna_numerica(tabela, 'rho', tipo), _coluna_numerica(tabela, 'mu', tipo), P_vapor
+
+    fluidos, codigos = _categorias(tabela, 'fluido', n)
+    if np.ndim(T_C) == 0 and np.ndim(P1) == 0:
+        propriedades = np.array([(*propriedades_fluido(f, T_C + 273.15, P1 + 101325.0),
+                                  pressao_vapor(f, T_C + 273.15)) for f in fluidos], dtype=tipo)
+        if len(fluidos) == 1:
+            return tuple(propriedades[0])
+        return propriedades[codigos, 0], propriedades[codigos, 1], propriedades[codigos, 2]
+
+    # Como nas varreduras, uma grade de temperatura por (fluido, P₁ distinto);
+    # a grade fica nos °C inteiros, exatos para as temperaturas mais comuns
+    T = np.broadcast_to(T_C, (n,)) + 273.15
+    P1 = np.broadcast_to(P1, (n,))
+    rho, mu, P_vapor = (np.empty(n, dtype=tipo) for _ in range(3))
+    for codigo, fluido in enumerate(fluidos):
+        sel = codigos == codigo if len(fluidos) > 1 else slice(None)
+        rho[sel], mu[sel] = propriedades_por_pressao(fluido, T[sel], P1[sel] + 101325.0, origem=273.15)
+        P_vapor[sel] = pressao_vapor_interpolada(fluido, T[sel], origem=273.15)
+    return rho, mu, P_vapor
+
+
+def simular_dataframe(tabela, mode=None, colunas=None, dtype=np.float64):
+    """
+    Simula cada linha de um DataFrame (ou tabela do Arrow) de pontos de operação.
+
+    Colunas obrigatórias: D1, D2, L, Q. Opcionais: `mode`, `fluido`, `T_C`,
+    `P1`, `rho_m`, `material`, `angulo_convergente`, `angulo_divergente`
+    (padrões de `lote.PADROES`), `rho` e `mu` (dispensam o thermo) e
+    `epsilon` (dispensa `material`). Sem `rho`/`mu`, as propriedades vêm de
+    uma grade de temperatura por fluido e P₁ distinto (como nas varreduras),
+    assim como a pressão de vapor da análise de cavitação
+    (ou coluna `P_vapor`, em Pa absolutos).
+
+    Args:
+        tabela: pandas.DataFrame ou pyarrow.Table
+        mode: 'Ideal' ou 'Realista' para todas as linhas (padrão: coluna
+            `mode`, ou 'Realista')
+        colunas: Colunas do resultado (saídas do lote, `status`, `rho`, `mu`, ...);
+            padrão: `COLUNAS_RESULTADO` mais as de cavitação, quando há
+            pressão de vapor
+        dtype: Tipo de trabalho (np.float32 para o modo compacto)
+
+    Returns:
+        DataFrame com `colunas`, indexado como a entrada (RangeIndex para Arrow)
+    """
+    faltando = [nome for nome in COLUNAS_OBRIGATORIAS if not _tem_coluna(tabela, nome)]
+    if faltando:
+        raise ValueError(f"Colunas ausentes: {faltando}")
+
+    tipo = np.dtype(dtype)
+    n = len(tabela)
+    indice = pd.RangeIndex(n) if _eh_arrow(tabela) else tabela.index
+
+    entradas = {nome: _coluna_numerica(tabela, nome, tipo) for nome in COLUNAS_OBRIGATORIAS}
+    for nome in COLUNAS_NUMERICAS:
+        entradas[nome] = (_coluna_numerica(tabela, nome, tipo) if _tem_coluna(tabela, nome)
+                          else tipo.type(PADROES[nome]))
+    entradas['rho'], entradas['mu'], entradas['P_vapor'] = _propriedades(
+        tabela, n, entradas.pop('T_C'), entradas['P1'], tipo)
+    if colunas is None:
+        colunas = COLUNAS_RESULTADO + (COLUNAS_CAVITACAO if entradas['P_vapor'] is not None else ())
+
+    if _tem_coluna(tabela, 'epsilon'):
+        entradas['epsilon'] = _coluna_numerica(tabela, 'epsilon', tipo)
+    else:
+        materiais, codigos = _categorias(tabela, 'material', n)
+        rugosidades = np.array([obter_rugosidade_material(m) for m in materiais], dtype=tipo)
+        entradas['epsilon'] = rugosidades[0] if len(materiais) == 1 else rugosidades[codigos]
+
+    if mode is not None:
+        modos, codigos_modo = [mode], None
+    else:
+        modos, codigos_modo = _categorias(tabela, 'mode', n)
+        if len(modos) == 1:
+            codigos_modo = None
+
+    def simular(valores, modo):
+        return simular_lote(valores['D1'], valores['D2'], valores['L'], valores['Q'], valores['rho'],
+                            valores['mu'], valores['epsilon'], valores['rho_m'], modo, valores['P1'],
+                            valores['angulo_convergente'], valores['angulo_divergente'], dtype=tipo,
+                            P_vapor=valores['P_vapor'])
+
+    if codigos_modo is None:
+        # Caminho comum: um modo só, colunas inteiras sem cópia
+        resultado = simular(entradas, modos[0])
+        dados = {nome: np.broadcast_to(resultado[nome], (n,)) for nome in colunas}
+    else:
+        dados = {}
+        for codigo, modo in enumerate(modos):
+            sel = np.flatnonzero(codigos_modo == codigo)
+            resultado = simular({nome: valor[sel] if np.ndim(valor) and valor is not None else valor
+                                 for nome, valor in entradas.items()}, modo)
+            for nome in colunas:
+                valor = np.broadcast_to(resultado[nome], sel.shape)
+                if nome not in dados:
+                    dados[nome] = np.empty(n, dtype=valor.dtype)
+                dados[nome][sel] = valor
+
+    return pd.DataFrame(dados, index=indice, columns=list(colunas), copy=False)
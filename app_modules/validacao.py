@@ -0,0 +1,113 @@
+"""
+Validação das entradas do simulador como máscara de bits por ponto.
+
+As mesmas regras da interface (`main()`) valem para lotes, varreduras,
+relatórios e cenários: `validar` aceita escalares ou arrays e devolve um
+código inteiro por ponto, 0 quando válido ou a soma (OU bit a bit) dos
+motivos violados. Lotes filtram com `codigo == VALIDO`, sem desvios em
+Python por ponto; a interface mostra as mensagens de cada bit.
+"""
+import numpy as np
+
+
+VALIDO = 0
+D2_MAIOR_QUE_D1 = 1
+RAZAO_DIAMETROS_ALTA = 2
+RHO_M_PROXIMA = 4
+REYNOLDS_BAIXO = 8
+PROPRIEDADES_INDISPONIVEIS = 16
+
+RAZAO_MAXIMA = 2.0
+MARGEM_RHO_M = 0.05
+RE_MINIMO_REALISTA = 75000
+
+# bit → (mensagem curta, mensagem da interface); a da interface é formatada
+# com razao, rho e rho_m
+MENSAGENS = {
+    D2_MAIOR_QUE_D1: (
+        "D₂ precisa ser menor que D₁.",
+        "⚠️ Ajuste necessário: D₂ precisa ser menor que D₁ para garantir aceleração do escoamento.",
+    ),
+    RAZAO_DIAMETROS_ALTA: (
+        "Razão D₁/D₂ acima de 2.",
+        "⚠️ Ajuste necessário: Razão entre os diâmetros está muito alta, D₁/D₂ = {razao:.3f} "
+        "(máximo recomendado: 2.0). D₂ está muito pequeno em relação a D₁.",
+    ),
+    RHO_M_PROXIMA: (
+        "ρₘ menor ou muito próxima de ρ.",
+        "⚠️ Ajuste necessário: Densidade do fluido manométrico ρₘ {rho_m:.1f} kg/m³ menor ou muito "
+        "próxima da densidade do fluido ρ {rho:.1f} kg/m³.",
+    ),
+    REYNOLDS_BAIXO: (
+        "Re < 75000 no modo Realista.",
+        "⚠️ Ajuste necessário: Para melhor análise das perdas de carga, mantenha o regime como "
+        "turbulento, Re > 75000.",
+    ),
+    PROPRIEDADES_INDISPONIVEIS: (
+        "Propriedades do fluido indisponíveis nesta temperatura.",
+        "⚠️ Erro: Não foi possível calcular as propriedades para esta temperatura. "
+        "Tente aumentar a temperatura.",
+    ),
+}
+
+
+def validar(D1, D2, rho, rho_m, Re, mode='Realista'):
+    """
+    Códigos de validação por ponto.
+
+    Args:
+        D1, D2: Diâmetros (m)
+        rho: Massa específica do fluido (kg/m³); NaN/None = indisponível
+        rho_m: Massa específica do fluido manométrico (kg/m³)
+        Re: Reynolds na garganta; NaN = indisponível
+        mode: 'Ideal' ou 'Realista', único ou um por ponto
+
+    Returns:
+        np.uint8 (escalar) ou array de códigos com o formato do broadcasting
+        das entradas; VALIDO (0) quando todas as regras passam
+    """
+    D1, D2, rho_m = (np.asarray(x, dtype=float) for x in (D1, D2, rho_m))
+    rho = np.asarray(np.nan if rho is None else rho, dtype=float)
+    Re = np.asarray(np.nan if Re is None else Re, dtype=float)
+    realista = np.asarray(mode) == 'Realista'
+
+    forma = np.broadcast_shapes(*(np.shape(x) for x in (D1, D2, rho, rho_m, Re, realista)))
+    codigo = np.zeros(forma, dtype=np.uint8)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        codigo |= np.where(D2 >= D1, D2_MAIOR_QUE_D1, VALIDO).astype(np.uint8)
+        codigo |= np.where(D1 / D2 > RAZAO_MAXIMA, RAZAO_DIAMETROS_ALTA, VALIDO).astype(np.uint8)
+        codigo |= np.where(rho_m < rho + rho*MARGEM_RHO_M, RHO_M_PROXIMA, VALIDO).astype(np.uint8)
+        codigo |= np.where(realista & (Re < RE_MINIMO_REALISTA), REYNOLDS_BAIXO, VALIDO).astype(np.uint8)
+    codigo |= np.where(np.isfinite(rho) & np.isfinite(Re), VALIDO,
+                       PROPRIEDADES_INDISPONIVEIS).astype(np.uint8)
+    return codigo[()]
+
+
+def motivos(codigo):
+    """Bits presentes em um código escalar, na ordem das verificações de `main()`."""
+    codigo = int(codigo)
+    if codigo & PROPRIEDADES_INDISPONIVEIS:
+        # Sem ρ e μ, as demais regras não significam nada
+        return [PROPRIEDADES_INDISPONIVEIS]
+    return [bit for bit in MENSAGENS if codigo & bit]
+
+
+def mensagens(codigo, detalhada=False, **valores):
+    """
+    Mensagens dos motivos de um código escalar.
+
+    Args:
+        codigo: Código de `validar`
+        detalhada: Texto da interface (formatado com `valores`: razao, rho, rho_m)
+
+    Returns:
+        Lista de textos (vazia para VALIDO)
+    """
+    return [MENSAGENS[bit][1].format(**valores) if detalhada else MENSAGENS[bit][0]
+            for bit in motivos(codigo)]
+
+
+def contar_motivos(codigos):
+    """Quantidade de pontos com cada motivo (dict mensagem curta → contagem)."""
+    codigos = np.asarray(codigos)
+    return {MENSAGENS[bit][0]: int(np.count_nonzero(codigos & bit)) for bit in MENSAGENS}
@@ -0,0 +1,249 @@
+"""
+Varreduras cartesianas fora da memória, processadas em blocos.
+
+O espaço de projeto (produto cartesiano dos eixos) nunca é materializado:
+os pontos são enumerados por índice linear em blocos de tamanho fixo, cada
+bloco é simulado de forma vetorizada e entregue aos sumidouros (arquivos,
+redutores online, histogramas). O pico de memória depende só do bloco.
+"""
+import math
+
+import numpy as np
+
+from app_modules.atrito import obter_rugosidade_material
+from app_modules.fluidos import pressao_vapor_interpolada, propriedades_por_pressao
+from app_modules.lote import simular_lote
+from app_modules.validacao import VALIDO, validar
+
+
+EIXOS_CATEGORICOS = ('fluido', 'material')
+
+PADROES = {
+    'D1': 0.10,
+    'D2': 0.05,
+    'L': 1.0,
+    'Q': 0.01,
+    'T_C': 20.0,
+    'fluido': 'water',
+    'material': 'Steel, commercial',
+    'rho_m': 13600.0,
+    'P1': 0.0,
+    'angulo_convergente': 15.0,
+    'angulo_divergente': 15.0,
+}
+
+
+class Varredura:
+    """
+    Produto cartesiano de eixos de projeto.
+
+    Args:
+        eixos: Dicionário nome → sequência de valores a varrer
+        fixos: Valores fixos para os parâmetros que não são varridos
+        mode: 'Ideal' ou 'Realista'
+        dtype: np.float32 ativa o modo compacto de `simular_lote` (metade da
+            memória por ponto, permitindo blocos maiores); os eixos e a
+            validação geométrica continuam em float64, para que pontos na
+            fronteira (D₂ = D₁, D₁/D₂ = 2) sejam classificados igualmente
+    """
+
+    def __init__(self, eixos, fixos=None, mode='Realista', dtype=np.float64):
+        desconhecidos = set(eixos) - set(PADROES)
+        if desconhecidos:
+            raise ValueError(f"Eixos desconhecidos: {sorted(desconhecidos)}")
+
+        self.mode = mode
+        self.dtype = np.dtype(dtype)
+        self.nomes = list(eixos)
+        self.valores = {
+            nome: (list(v) if nome in EIXOS_CATEGORICOS else np.asarray(v, dtype=float))
+            for nome, v in eixos.items()
+        }
+        self.forma = tuple(len(self.valores[nome]) for nome in self.nomes)
+        self.fixos = {**PADROES, **(fixos or {})}
+        for nome in self.nomes:
+            self.fixos.pop(nome)
+
+    def __len__(self):
+        return math.prod(self.forma)
+
+    def ponto(self, indice):
+        """Parâmetros do ponto de índice linear `indice`."""
+        multi = np.unravel_index(indice, self.forma)
+        ponto = dict(self.fixos)
+        for nome, i in zip(self.nomes, multi):
+            valor = self.valores[nome][int(i)]
+            ponto[nome] = valor if nome in EIXOS_CATEGORICOS else float(valor)
+        return ponto
+
+    def blocos(self, tamanho):
+        """
+        Gera blocos (início, colunas) com no máximo `tamanho` pontos.
+
+        Eixos categóricos são entregues como códigos inteiros (índices em
+        `self.valores[nome]`), evitando arrays de strings.
+        """
+        total = len(self)
+        for inicio in range(0, total, tamanho):
+            indices = np.arange(inicio, min(inicio + tamanho, total), dtype=np.int64)
+            multi = np.unravel_index(indices, self.forma)
+            colunas = {}
+            for nome, idx in zip(self.nomes, multi):
+                colunas[nome] = idx if nome in EIXOS_CATEGORICOS else self.valores[nome][idx]
+            yield inicio, colunas
+
+    def _categoria(self, colunas, nome):
+        """(categorias, códigos) de um parâmetro categórico, varrido ou fixo."""
+        if nome in colunas:
+            return self.valores[nome], colunas[nome]
+        return [self.fixos[nome]], None
+
+    def avaliar(self, colunas):
+        """Simula um bloco; retorna o ResultadoLote com as colunas `status` e `valido`."""
+        def coluna(nome):
+            return colunas[nome] if nome in colunas else self.fixos[nome]
+
+        n = len(next(iter(colunas.values())))
+        # Parâmetros fixos permanecem escalares até o simulador
+        T = np.asarray(coluna('T_C'), dtype=self.dtype) + 273.15
+        P1 = coluna('P1')
+
+        # Propriedades por fluido e por P1 distinto (P1 varrido muda ρ e μ dos gases)
+        P_abs = np.asarray(P1, dtype=float) + 101325.0
+        fluidos, codigos_fluido = self._categoria(colunas, 'fluido')
+        if codigos_fluido is None:
+            rho, mu = propriedades_por_pressao(fluidos[0], T, P_abs)
+            P_vapor = pressao_vapor_interpolada(fluidos[0], T)
+        else:
+            rho, mu = np.empty(n, dtype=self.dtype), np.empty(n, dtype=self.dtype)
+            P_vapor = np.empty(n, dtype=self.dtype)
+            for codigo, fluido in enumerate(fluidos):
+                sel = codigos_fluido == codigo
+                if sel.any():
+                    T_sel = T if T.ndim == 0 else T[sel]
+                    P_sel = P_abs if P_abs.ndim == 0 else P_abs[sel]
+                    rho[sel], mu[sel] = propriedades_por_pressao(fluido, T_sel, P_sel)
+                    P_vapor[sel] = pressao_vapor_interpolada(fluido, T_sel)
+
+        materiais, codigos_material = self._categoria(colunas, 'material')
+        rugosidades = np.array([obter_rugosidade_material(m) for m in materiais])
+        epsilon = rugosidades[0] if codigos_material is None else rugosidades[codigos_material]
+
+        D1, D2, Q, rho_m = coluna('D1'), coluna('D2'), coluna('Q'), coluna('rho_m')
+        resultado = simular_lote(D1, D2, coluna('L'), Q, rho, mu, epsilon, rho_m,
+                                 self.mode, P1, coluna('angulo_convergente'),
+                                 coluna('angulo_divergente'), dtype=self.dtype, P_vapor=P_vapor)
+
+        # Mesmas regras de validação de main(), sobre os eixos em float64
+        status = np.broadcast_to(validar(D1, D2, rho, rho_m, resultado['Re'], self.mode), (n,))
+        resultado.saidas['status'] = status
+        resultado.saidas['valido'] = status == VALIDO
+        resultado.entradas.update(colunas)
+        return resultado
+
+
+class SumidouroCSV:
+    """Grava as colunas escolhidas de cada bloco em um CSV, bloco a bloco.
+
+    Os eixos categóricos são gravados como códigos (índices em `valores`).
+    """
+
+    def __init__(self, caminho, colunas=('delta_h', 'h_L'), somente_validos=True):
+        self.caminho = caminho
+        self.colunas = tuple(colunas)
+        self.somente_validos = somente_validos
+        self._arquivo = None
+
+    def consumir(self, varredura, inicio, resultado):
+        if self._arquivo is None:
+            self._arquivo = open(self.caminho, 'w', encoding='utf-8')
+            cabecalho = ['indice'] + varredura.nomes + list(self.colunas)
+            self._arquivo.write(','.join(cabecalho) + '\n')
+
+        n = len(resultado)
+        indices = np.arange(inicio, inicio + n)
+        dados = [indices] + [resultado[c] for c in varredura.nomes]
+        dados += [resultado[c] for c in self.colunas]
+        tabela = np.column_stack(dados)
+        if self.somente_validos:
+            tabela = tabela[resultado['valido']]
+        np.savetxt(self._arquivo, tabela, delimiter=',', fmt='%.10g')
+
+    def finalizar(self):
+        if self._arquivo is not None:
+            self._arquivo.close()
+        return self.caminho
+
+
+class RedutorExtremos:
+    """Mínimo, máximo e seus índices (argmin/argmax) de uma coluna."""
+
+    def __init__(self, coluna='h_L'):
+        self.coluna = coluna
+        self.minimo = np.inf
+        self.maximo = -np.inf
+        self.indice_minimo = None
+        self.indice_maximo = None
+        self.n_validos = 0
+        self._varredura = None
+
+    def consumir(self, varredura, inicio, resultado):
+        self._varredura = varredura
+        valores = np.where(resultado['valido'], resultado[self.coluna], np.nan)
+        if np.isnan(valores).all():
+            return
+        self.n_validos += int(np.count_nonzero(resultado['valido']))
+
+        i_min = int(np.nanargmin(valores))
+        if valores[i_min] < self.minimo:
+            self.minimo, self.indice_minimo = float(valores[i_min]), inicio + i_min
+        i_max = int(np.nanargmax(valores))
+        if valores[i_max] > self.maximo:
+            self.maximo, self.indice_maximo = float(valores[i_max]), inicio + i_max
+
+    def finalizar(self):
+        resumo = {'coluna': self.coluna, 'n_validos': self.n_validos,
+                  'minimo': self.minimo, 'maximo': self.maximo,
+                  'indice_minimo': self.indice_minimo, 'indice_maximo': self.indice_maximo}
+        if self.indice_minimo is not None:
+            resumo['ponto_minimo'] = self._varredura.ponto(self.indice_minimo)
+            resumo['ponto_maximo'] = self._varredura.ponto(self.indice_maximo)
+        return resumo
+
+
+class Histograma:
+    """Histograma acumulado de uma coluna com bordas fixas."""
+
+    def __init__(self, coluna, bordas):
+        self.coluna = coluna
+        self.bordas = np.asarray(bordas, dtype=float)
+        self.contagens = np.zeros(len(self.bordas) - 1, dtype=np.int64)
+        self.abaixo = 0
+        self.acima = 0
+
+    def consumir(self, varredura, inicio, resultado):
+        valores = np.asarray(resultado[self.coluna])[resultado['valido']]
+        self.contagens += np.histogram(valores, self.bordas)[0]
+        self.abaixo += int(np.count_nonzero(valores < self.bordas[0]))
+        self.acima += int(np.count_nonzero(valores > self.bordas[-1]))
+
+    def finalizar(self):
+        return {'bordas': self.bordas, 'contagens': self.contagens,
+                'abaixo': self.abaixo, 'acima': self.acima}
+
+
+def executar_varredura(varredura, sumidouros, tamanho_bloco=1_000_000):
+    """
+    Percorre a varredura bloco a bloco, entregando cada resultado aos sumidouros.
+
+    Cada sumidouro implementa `consumir(varredura, inicio, resultado)` e
+    `finalizar()`; o retorno é a lista dos valores de `finalizar()`.
+    """
+    try:
+        for inicio, colunas in varredura.blocos(tamanho_bloco):
+            resultado = varredura.avaliar(colunas)
+            for sumidouro in sumidouros:
+                sumidouro.consumir(varredura, inicio, resultado)
+    finally:
+        finais = [sumidouro.finalizar() for sumidouro in sumidouros]
+    return finais